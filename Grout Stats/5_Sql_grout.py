@@ -1,22 +1,28 @@
 import sqlite3
+from contextlib import closing
+
 import pandas as pd
 
+from grout_pipeline import PROJECT_ROOT, persist_to_database
+from master_store import MASTER_STORE_NAME, open_master_store
+
 # 1. CONEXIÓN (Si no existe, SQL lo crea automáticamente)
-# Imagina que estás abriendo un nuevo cuaderno de bitácora
-conexion = sqlite3.connect("BlueTech_Grout.db")
+# Imagina que estás abriendo un nuevo cuaderno de bitácora: el mismo que usa el pipeline
+db_path = PROJECT_ROOT / "BlueTech_Grout.db"
 
 # 2. CARGAR TUS DATOS DE INGENIERÍA
-df = pd.read_csv("master_data_grout.csv")
+# El maestro se guarda en columnas .npy: se abre sin parsear texto
+df = open_master_store(MASTER_STORE_NAME).to_frame()
 
-# 3. CREAR LA TABLA SQL
-# Aquí pasamos los datos del "papel" (CSV) al "sistema" (SQL)
-df.to_sql("Roturas", conexion, if_exists="replace", index=False)
+# 3. GUARDAR EN LA TABLA SQL
+# Aquí pasamos los datos del "papel" (maestro) al "sistema" (SQL). La tabla
+# 'Roturas' es tipada y con clave primaria: cada probeta se inserta o actualiza
+persist_to_database(df, db_path)
 
 # 4. TU PRIMERA CONSULTA SQL (Día 1)
 query = "SELECT Estructura, Resistencia_MPa FROM Roturas WHERE Edad_Dias = 28"
-resultados = pd.read_sql(query, conexion)
+with closing(sqlite3.connect(db_path)) as conexion:
+    resultados = pd.read_sql(query, conexion)
 
 print("--- RESULTADOS EXTRAÍDOS CON SQL ---")
 print(resultados.head())
-
-conexion.close()
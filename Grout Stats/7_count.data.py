@@ -1,5 +1,8 @@
-from pandas import read_csv
+from master_store import MASTER_STORE_NAME, open_master_store
 
-df = read_csv("master_data_grout.csv")
+# Las columnas se abren mapeadas en memoria: contar no copia ni parsea datos
+store = open_master_store(MASTER_STORE_NAME)
 
-print(df.count())
+print(f"Registros: {len(store)}")
+for name in store.columns:
+    print(f"{name:<20} {store.count(name)}")
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+bench_grout_pipeline.py — Benchmarks por etapa del pipeline de grout
+=====================================================================
+Blue Tech | SikaGrout 9400 BR
+
+Mide tiempo y memoria pico de las etapas de grout_pipeline.py sobre datos
+sintéticos de distintos tamaños y guarda los resultados en JSON para
+comparar ejecuciones y detectar regresiones.
+
+Etapas: load_files, compute_inference, perform_anova, generate_plots,
+generate_pdf_report, generate_structure_reports.
+
+Uso:
+  python bench_grout_pipeline.py                                  # 1k, 10k, 100k
+  python bench_grout_pipeline.py --sizes 1000 1000000 -o run.json
+  python bench_grout_pipeline.py --stages perform_anova --repeat 5
+  python bench_grout_pipeline.py -o nuevo.json --baseline run.json  # exit 1 si hay regresión
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+import grout_pipeline as gp  # noqa: E402
+
+DEFAULT_SIZES  = [1_000, 10_000, 100_000]
+STRUCTURES     = ["Pilar", "Viga", "Losa", "Muro", "Zapata"]
+AGE_MEANS      = {1.0: 55.0, 3.0: 75.0, 7.0: 95.0, 14.0: 108.0, 28.0: 118.0}
+ROWS_PER_FILE  = 50_000  # Tamaño de cada libro sintético para load_files
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GENERADORES SINTÉTICOS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def make_frame(n: int, seed: int = 42) -> pd.DataFrame:
+    """DataFrame consolidado sintético con el esquema de `load_files()`."""
+    rng   = np.random.default_rng(seed)
+    ages  = rng.choice(list(AGE_MEANS), size=n)
+    means = np.vectorize(AGE_MEANS.get)(ages)
+    rotura  = pd.Timestamp.today().normalize() - pd.to_timedelta(rng.integers(1, 720, n), unit="D")
+    vaciado = rotura - pd.to_timedelta(ages, unit="D")
+    return pd.DataFrame({
+        "ID_Probeta":      np.char.add("P", np.arange(n).astype(str)),
+        "Estructura":      rng.choice(STRUCTURES, size=n),
+        "Fecha_Vaciado":   vaciado.strftime("%Y-%m-%d"),
+        "Fecha_Rotura":    rotura.strftime("%Y-%m-%d"),
+        "Edad_Dias":       ages,
+        "Resistencia_MPa": rng.normal(means, 0.06 * means),
+        "Origen_Archivo":  "bench.csv",
+        "Origen_Hoja":     "Sheet1",
+    })
+
+
+def write_workbooks(
+    df: pd.DataFrame,
+    out_dir: Path,
+    rows_per_file: int = ROWS_PER_FILE,
+    fmt: str = "csv",
+) -> list[Path]:
+    """
+    Escribe `df` en el formato crudo de laboratorio que lee `_parse_file()`:
+    5 filas de cabecera libres, fila de títulos y 14 columnas (COL_INDICES).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    header = [f"col{i}" for i in range(14)]
+    for idx, name in zip(gp.COL_INDICES, gp.COL_NAMES):
+        header[idx] = name
+
+    files: list[Path] = []
+    for start in range(0, len(df), rows_per_file):
+        chunk = df.iloc[start:start + rows_per_file]
+        raw = pd.DataFrame("", index=range(len(chunk)), columns=header)
+        for name in gp.COL_NAMES:
+            raw[name] = chunk[name].to_numpy()
+        path = out_dir / f"bench_{start // rows_per_file:03d}.{fmt}"
+        if fmt == "csv":
+            with open(path, "w", encoding="utf-8", newline="") as fh:
+                fh.write(("," * 13 + "\n") * 5)
+                raw.to_csv(fh, index=False)
+        else:
+            with pd.ExcelWriter(path) as writer:
+                raw.to_excel(writer, index=False, startrow=5)
+        files.append(path)
+    return files
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ETAPAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _Context:
+    """Entradas de cada etapa para un tamaño; se calculan una vez, fuera de la medición."""
+
+    def __init__(self, n: int, work_dir: Path, fmt: str):
+        self.n, self.work_dir, self.fmt = n, work_dir, fmt
+        self._cache: dict[str, Any] = {}
+
+    def get(self, name: str) -> Any:
+        if name not in self._cache:
+            self._cache[name] = getattr(self, f"_make_{name}")()
+        return self._cache[name]
+
+    def _make_df(self) -> pd.DataFrame:
+        return make_frame(self.n)
+
+    def _make_files(self) -> list[Path]:
+        return write_workbooks(self.get("df"), self.work_dir / "input", fmt=self.fmt)
+
+    def _make_inference(self) -> gp.InferenceResults:
+        return gp.compute_inference(self.get("df"))
+
+    def _make_anovas(self) -> tuple[gp.AnovaResults, gp.AnovaResults]:
+        df = self.get("df")
+        return gp.perform_anova(df, "Edad_Dias"), gp.perform_anova(df, "Estructura")
+
+    def _make_model(self) -> gp.PredictiveModel:
+        model = gp.PredictiveModel()
+        model.train(self.get("df"))
+        return model
+
+    def _make_plot_paths(self) -> dict[str, Path]:
+        return gp.generate_plots(self.get("df"), self.get("model"), *self.get("anovas"), self._out())
+
+    def _make_text_report(self) -> Path:
+        path = self._out() / "reporte.txt"
+        gp.generate_text_report(self.get("inference"), *self.get("anovas"), self.get("model"), path)
+        return path
+
+    def _out(self) -> Path:
+        out = self.work_dir / "output"
+        out.mkdir(parents=True, exist_ok=True)
+        return out
+
+
+def _stage_load_files(ctx: _Context) -> Callable[[], Any]:
+    files = ctx.get("files")
+    return lambda: gp.load_files(files)
+
+
+def _stage_compute_inference(ctx: _Context) -> Callable[[], Any]:
+    df = ctx.get("df")
+    return lambda: gp.compute_inference(df)
+
+
+def _stage_bootstrap_28d(ctx: _Context) -> Callable[[], Any]:
+    df = ctx.get("df")
+    return lambda: gp.bootstrap_28d(df)
+
+
+def _stage_perform_anova(ctx: _Context) -> Callable[[], Any]:
+    df = ctx.get("df")
+    return lambda: (gp.perform_anova(df, "Edad_Dias"), gp.perform_anova(df, "Estructura"))
+
+
+def _stage_generate_plots(ctx: _Context) -> Callable[[], Any]:
+    df, model, anovas, out = ctx.get("df"), ctx.get("model"), ctx.get("anovas"), ctx._out()
+    return lambda: gp.generate_plots(df, model, *anovas, out)
+
+
+def _stage_generate_pdf_report(ctx: _Context) -> Callable[[], Any]:
+    args = (
+        ctx.get("inference"), *ctx.get("anovas"), ctx.get("model"),
+        ctx.get("plot_paths"), ctx.get("text_report"), ctx._out() / "reporte.pdf",
+    )
+    return lambda: gp.generate_pdf_report(*args)
+
+
+def _stage_generate_structure_reports(ctx: _Context) -> Callable[[], Any]:
+    df, out = ctx.get("df"), ctx._out() / "estructuras"
+    return lambda: gp.generate_structure_reports(df, out)
+
+
+STAGES: dict[str, Callable[[_Context], Callable[[], Any]]] = {
+    "load_files":          _stage_load_files,
+    "compute_inference":   _stage_compute_inference,
+    "bootstrap_28d":       _stage_bootstrap_28d,
+    "perform_anova":       _stage_perform_anova,
+    "generate_plots":      _stage_generate_plots,
+    "generate_pdf_report": _stage_generate_pdf_report,
+    "generate_structure_reports": _stage_generate_structure_reports,
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MEDICIÓN
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class BenchResult:
+    stage:   str
+    n:       int
+    seconds: float            # Mejor tiempo de `repeat` ejecuciones
+    peak_mb: Optional[float]  # Memoria pico (tracemalloc) de una ejecución extra
+    repeat:  int
+
+
+def measure(func: Callable[[], Any], repeat: int = 3, memory: bool = True) -> tuple[float, Optional[float]]:
+    """
+    Devuelve (mejor tiempo en s, memoria pico en MB).
+
+    El tiempo se toma sin tracemalloc (que ralentiza la ejecución); la
+    memoria pico se mide en una ejecución adicional.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return best, peak_mb
+
+
+def run_benchmarks(
+    sizes:  list[int] = DEFAULT_SIZES,
+    stages: Optional[list[str]] = None,
+    repeat: int = 3,
+    memory: bool = True,
+    fmt:    str = "csv",
+) -> dict:
+    """
+    Ejecuta las etapas pedidas para cada tamaño.
+
+    Returns:
+        {"meta": {...}, "results": [BenchResult como dict, ...]}
+    """
+    stages = list(STAGES) if stages is None else stages
+    unknown = set(stages) - STAGES.keys()
+    if unknown:
+        raise ValueError(f"Etapas desconocidas: {sorted(unknown)}")
+
+    results: list[BenchResult] = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory(prefix="grout-bench-") as tmp:
+            ctx = _Context(n, Path(tmp), fmt)
+            for stage in stages:
+                func = STAGES[stage](ctx)
+                seconds, peak_mb = measure(func, repeat=repeat, memory=memory)
+                results.append(BenchResult(stage, n, seconds, peak_mb, repeat))
+                print(
+                    f"  {stage:<20} n={n:>9,}  {seconds:>9.3f} s"
+                    + (f"  {peak_mb:>9.1f} MB" if peak_mb is not None else ""),
+                    flush=True,
+                )
+
+    import matplotlib
+    import scipy
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "numpy":     np.__version__,
+            "pandas":    pd.__version__,
+            "scipy":     scipy.__version__,
+            "matplotlib": matplotlib.__version__,
+            "format":    fmt,
+        },
+        "results": [asdict(r) for r in results],
+    }
+
+
+def compare_results(
+    current:   dict,
+    baseline:  dict,
+    threshold: float = 1.25,
+    min_delta_s: float = 0.05,
+) -> list[str]:
+    """
+    Compara dos ejecuciones por (etapa, n).
+
+    Una etapa es regresión si su tiempo supera `threshold` veces el de la
+    línea base (y la diferencia absoluta es mayor que `min_delta_s`, para
+    ignorar ruido en etapas muy rápidas) o si su memoria pico supera
+    `threshold` veces la de la línea base.
+
+    Returns:
+        Lista de mensajes, uno por regresión detectada.
+    """
+    base = {(r["stage"], r["n"]): r for r in baseline["results"]}
+    regressions: list[str] = []
+    for r in current["results"]:
+        ref = base.get((r["stage"], r["n"]))
+        if ref is None:
+            continue
+        if r["seconds"] > ref["seconds"] * threshold and r["seconds"] - ref["seconds"] > min_delta_s:
+            regressions.append(
+                f"{r['stage']} n={r['n']}: tiempo {ref['seconds']:.3f} s -> {r['seconds']:.3f} s "
+                f"(x{r['seconds'] / ref['seconds']:.2f})"
+            )
+        if r["peak_mb"] and ref["peak_mb"] and r["peak_mb"] > ref["peak_mb"] * threshold:
+            regressions.append(
+                f"{r['stage']} n={r['n']}: memoria {ref['peak_mb']:.1f} MB -> {r['peak_mb']:.1f} MB "
+                f"(x{r['peak_mb'] / ref['peak_mb']:.2f})"
+            )
+    return regressions
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ENTRY POINT — CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks por etapa del pipeline de grout.",
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=DEFAULT_SIZES, metavar="N",
+        help="Numero de probetas sinteticas por corrida (default: 1000 10000 100000).",
+    )
+    parser.add_argument(
+        "--stages", nargs="+", choices=list(STAGES), default=None, metavar="ETAPA",
+        help=f"Etapas a medir (default: todas): {', '.join(STAGES)}.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por etapa (default: 3).")
+    parser.add_argument("--no-memory", action="store_true", help="No medir memoria pico.")
+    parser.add_argument(
+        "--format", choices=("csv", "xlsx"), default="csv",
+        help="Formato de los libros sinteticos para load_files (default: csv).",
+    )
+    parser.add_argument("-o", "--output", metavar="JSON", help="Guardar resultados en JSON.")
+    parser.add_argument("--baseline", metavar="JSON", help="Resultados previos con los que comparar.")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25,
+        help="Factor de tiempo/memoria sobre la linea base considerado regresion (default: 1.25).",
+    )
+    args = parser.parse_args()
+
+    # El log INFO del pipeline (y de matplotlib) distorsiona los tiempos
+    logging.getLogger().setLevel(logging.WARNING)
+    report = run_benchmarks(
+        sizes=args.sizes, stages=args.stages, repeat=args.repeat,
+        memory=not args.no_memory, fmt=args.format,
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_results(report, baseline, threshold=args.threshold)
+        if regressions:
+            print("\nREGRESIONES respecto de la linea base:")
+            for msg in regressions:
+                print(f"  - {msg}")
+            sys.exit(1)
+        print("\nSin regresiones respecto de la linea base.")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,19 +21,47 @@ Uso:
   python grout_pipeline.py -f e1.xlsx e2.xlsx           # Múltiples archivos
   python grout_pipeline.py -f datos.xlsx --no-pdf       # Sin PDF
   python grout_pipeline.py -f datos.xlsx --predict 92 7 # Predicción 28d
+  python grout_pipeline.py -f *.xlsx --workers 4        # Lectura en paralelo
+  python grout_pipeline.py -f *.xlsx --rebuild-cache    # Re-parsear todo
+  python grout_pipeline.py -f nuevo.xlsx --incremental  # Solo probetas nuevas
+  python grout_pipeline.py --predict-file roturas_7d.csv --db BlueTech_Grout.db
+      Proyecta a 28d cada fila (Resistencia_MPa, Edad_Dias) del CSV con el
+      modelo de la BD, por bloques, sin ejecutar el pipeline. Con
+      --predict-by Estructura cada fila usa la curva de su estructura.
+
+  python grout_pipeline.py -f *.xlsx --stage-workers 4  # Etapas en paralelo
+  python grout_pipeline.py -f *.xlsx --plot-workers 5   # Graficos en paralelo
+  python grout_pipeline.py -f *.xlsx --trace t.json --trace-format chrome
+  python grout_pipeline.py -f *.xlsx --csv              # Exportar tambien el CSV
+  python grout_pipeline.py -f *.xlsx --por-estructura   # Un PDF por estructura
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import importlib.util
+import io
+import json
 import logging
 import os
+import shutil
 import sqlite3
 import sys
+import tempfile
+import threading
+import time
+import tracemalloc
 import warnings
-from dataclasses import dataclass, field
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+)
+from contextlib import closing, contextmanager
+from dataclasses import asdict, dataclass, field, fields, replace
+from datetime import datetime
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 import matplotlib
 matplotlib.use("Agg")  # Sin ventanas de GUI para matplotlib
@@ -47,6 +75,9 @@ from sklearn.linear_model import LinearRegression
 from statsmodels.formula.api import ols
 from statsmodels.stats.multicomp import pairwise_tukeyhsd
 
+# Paso 1c — almacén columnar del maestro (módulo aparte, ver master_store.py)
+from master_store import MASTER_STORE_NAME, write_master_store
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CONFIGURACIÓN Y CONSTANTES
 # ─────────────────────────────────────────────────────────────────────────────
@@ -96,49 +127,321 @@ log = _setup_logging()
 # PASO 1 — CARGA Y CONSOLIDACIÓN DE ARCHIVOS
 # ─────────────────────────────────────────────────────────────────────────────
 
-def load_files(files: list[str | Path]) -> pd.DataFrame:
+def _parse_file(file: Path) -> tuple[list[tuple[str, pd.DataFrame]], list[tuple[str, int]]]:
+    """
+    Lee un archivo Excel/CSV y limpia cada hoja según COL_INDICES / COL_NAMES.
+
+    Es una función de nivel de módulo (y sin logging) para que pueda
+    ejecutarse en un proceso trabajador; el proceso principal registra los
+    mensajes en el orden original de los archivos.
+
+    Returns:
+        (hojas_validas, hojas_saltadas) donde hojas_validas es una lista de
+        (nombre_hoja, df_limpio) y hojas_saltadas una lista de
+        (nombre_hoja, n_columnas) para hojas con menos de 14 columnas.
+    """
+    if file.suffix.lower() == ".csv":
+        raw_dfs: dict[str, pd.DataFrame] = {
+            file.name: pd.read_csv(file, skiprows=5)
+        }
+    else:
+        raw_dfs = pd.read_excel(file, skiprows=5, sheet_name=None)
+
+    sheets:  list[tuple[str, pd.DataFrame]] = []
+    skipped: list[tuple[str, int]] = []
+    for sheet_name, df in raw_dfs.items():
+        if df.shape[1] < 14:
+            skipped.append((sheet_name, df.shape[1]))
+            continue
+
+        df_clean = df.iloc[:, COL_INDICES].copy()
+        df_clean.columns = COL_NAMES
+        df_clean = df_clean.dropna(subset=["ID_Probeta", "Resistencia_MPa"])
+        df_clean["Origen_Archivo"] = file.name
+        df_clean["Origen_Hoja"] = sheet_name
+        sheets.append((sheet_name, df_clean))
+
+    return sheets, skipped
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PASO 1a — CACHÉ DE PARSEO (hojas limpias en formato Feather)
+# ─────────────────────────────────────────────────────────────────────────────
+
+PARSE_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512 MB por directorio de caché
+_PARSE_CACHE_VERSION  = 1                  # Incrementar si cambia _parse_file()
+
+
+def _file_digest(file: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 del contenido binario de un archivo (lectura por bloques)."""
+    h = hashlib.sha256()
+    with open(file, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    """Tamaño en bytes de un archivo o de un directorio (recursivo)."""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _evict_cache_dir(
+    root: Path,
+    max_bytes: int,
+    max_age_s: Optional[float] = None,
+) -> int:
+    """
+    Elimina entradas de un directorio de caché (archivos o subdirectorios).
+
+    Primero descarta las entradas más antiguas que `max_age_s` y luego las
+    menos usadas recientemente (por mtime) hasta que el total quede por
+    debajo de `max_bytes`.
+
+    Returns:
+        Número de entradas eliminadas.
+    """
+    if not root.is_dir():
+        return 0
+
+    now = time.time()
+    entries = sorted(
+        ((p.stat().st_mtime, _dir_size(p), p) for p in root.iterdir() if not p.name.startswith(".")),
+        key=lambda e: e[0],
+    )
+    total   = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, path in entries:
+        too_old = max_age_s is not None and now - mtime > max_age_s
+        if not too_old and total <= max_bytes:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        total   -= size
+        removed += 1
+    return removed
+
+
+@dataclass
+class ParseCache:
+    """
+    Caché en disco de las hojas ya limpiadas por `_parse_file()`.
+
+    Cada archivo fuente se indexa por el hash SHA-256 de su contenido más el
+    esquema de extracción (COL_INDICES / COL_NAMES), de modo que un libro sin
+    cambios se recupera desde Feather sin pasar por openpyxl. Si el esquema
+    cambia, las entradas antiguas dejan de coincidir y se eliminan por LRU.
+
+    Requiere pyarrow. Con `enabled=None` (default) la caché se activa solo si
+    pyarrow está instalado; con `enabled=True` sin pyarrow se avisa y queda
+    desactivada.
+    """
+    root:      Path
+    max_bytes: int  = PARSE_CACHE_MAX_BYTES
+    enabled:   Optional[bool] = None
+    hits:      int  = 0
+    misses:    int  = 0
+
+    def __post_init__(self) -> None:
+        self.root = Path(self.root)
+        if self.enabled is False:
+            return
+        if importlib.util.find_spec("pyarrow") is None:
+            if self.enabled:
+                log.warning("pyarrow no esta instalado: cache de parseo desactivada.")
+            self.enabled = False
+        else:
+            self.enabled = True
+
+    def key_for(self, file: Path) -> str:
+        schema = json.dumps([_PARSE_CACHE_VERSION, COL_INDICES, COL_NAMES])
+        return hashlib.sha256(f"{_file_digest(file)}|{schema}".encode()).hexdigest()
+
+    def get(
+        self, key: str, file: Path,
+    ) -> Optional[tuple[list[tuple[str, pd.DataFrame]], list[tuple[str, int]]]]:
+        """
+        Devuelve el resultado de `_parse_file(file)` desde la caché, o None.
+        `key` es `key_for(file)`, calculada una sola vez por quien llama.
+        """
+        if not self.enabled:
+            return None
+        entry = self.root / key
+        manifest_path = entry / "manifest.json"
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            # El contenido puede venir de un archivo con otro nombre; la hoja
+            # de un CSV lleva el nombre del archivo (ver _parse_file())
+            rename = {}
+            if file.suffix.lower() == ".csv":
+                rename[manifest["file"]] = file.name
+            sheets = []
+            for i, sheet_name in enumerate(manifest["sheets"]):
+                df_sheet = pd.read_feather(entry / f"{i}.feather")
+                # Feather convierte columnas object homogéneas (p. ej. fechas)
+                # a tipos nativos; se restauran para igualar a _parse_file()
+                object_cols = manifest["object_cols"][i]
+                df_sheet[object_cols] = df_sheet[object_cols].astype(object)
+                sheet_name = rename.get(sheet_name, sheet_name)
+                df_sheet["Origen_Archivo"] = file.name
+                df_sheet["Origen_Hoja"] = sheet_name
+                sheets.append((sheet_name, df_sheet))
+            skipped = [(rename.get(name, name), n_cols) for name, n_cols in manifest["skipped"]]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        os.utime(manifest_path)  # Marca de uso para la expulsión LRU
+        self.hits += 1
+        return sheets, skipped
+
+    def put(
+        self,
+        key: str,
+        file: Path,
+        sheets: list[tuple[str, pd.DataFrame]],
+        skipped: list[tuple[str, int]],
+    ) -> bool:
+        """
+        Guarda las hojas limpias de `file` bajo `key`. Escribe en un directorio temporal
+        y lo renombra al final para que una ejecución concurrente nunca lea
+        una entrada a medio escribir.
+
+        Returns:
+            True si la entrada se guardó; False si alguna hoja no es
+            serializable a Feather (p. ej. columnas con tipos mezclados).
+        """
+        if not self.enabled:
+            return False
+        entry = self.root / key
+        tmp: Optional[Path] = None
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.root))
+            for i, (_, df_sheet) in enumerate(sheets):
+                df_sheet.reset_index(drop=True).to_feather(tmp / f"{i}.feather")
+            (tmp / "manifest.json").write_text(
+                json.dumps({
+                    "file":    file.name,
+                    "sheets":  [name for name, _ in sheets],
+                    "object_cols": [
+                        [c for c in df_sheet.columns if df_sheet[c].dtype == object]
+                        for _, df_sheet in sheets
+                    ],
+                    "skipped": [[name, n_cols] for name, n_cols in skipped],
+                }),
+                encoding="utf-8",
+            )
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except Exception as exc:
+            log.warning("No se pudo guardar %s en cache de parseo: %s", file.name, exc)
+            if tmp is not None:
+                shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        return True
+
+    def evict(self) -> int:
+        """Aplica el límite de tamaño (LRU). Devuelve entradas eliminadas."""
+        return _evict_cache_dir(self.root, self.max_bytes)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas de la caché."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _coerce_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Convierte Edad_Dias / Resistencia_MPa a número y descarta filas inválidas."""
+    df["Edad_Dias"]       = pd.to_numeric(df["Edad_Dias"], errors="coerce")
+    df["Resistencia_MPa"] = pd.to_numeric(df["Resistencia_MPa"], errors="coerce")
+    return df.dropna(subset=["Edad_Dias", "Resistencia_MPa"])
+
+
+def load_files(
+    files:   list[str | Path],
+    workers: int = 1,
+    cache:   Optional[ParseCache] = None,
+) -> pd.DataFrame:
     """
     Carga y consolida múltiples archivos Excel/CSV.
 
     Espera datos a partir de la fila 6 (skiprows=5) con las columnas
     definidas en COL_INDICES. Soporta múltiples hojas por archivo Excel.
 
+    Args:
+        files:   Lista de rutas a archivos Excel/CSV.
+        workers: Número de procesos para leer archivos en paralelo. Con 1
+                 (default) la lectura es secuencial en el proceso actual.
+                 Cada archivo (con todas sus hojas) se procesa en un solo
+                 trabajador; el resultado se fusiona en el orden de `files`.
+        cache:   ParseCache opcional. Los archivos cuyo contenido ya está en
+                 caché no se vuelven a leer; los nuevos se guardan al final.
+
     Returns:
         DataFrame unificado con columnas estándar + Origen_Archivo / Origen_Hoja.
 
     Raises:
         ValueError: Si ningún archivo produce datos válidos.
     """
+    paths = [Path(f) for f in files]
     all_data: list[pd.DataFrame] = []
 
-    for raw_file in files:
-        file = Path(raw_file)
-        try:
-            if file.suffix.lower() == ".csv":
-                raw_dfs: dict[str, pd.DataFrame] = {
-                    file.name: pd.read_csv(file, skiprows=5)
-                }
-            else:
-                raw_dfs = pd.read_excel(file, skiprows=5, sheet_name=None)
-
-            for sheet_name, df in raw_dfs.items():
-                if df.shape[1] < 14:
-                    log.warning(
-                        "Hoja '%s' en %s: solo %d columnas (mínimo 14). Saltando.",
-                        sheet_name, file.name, df.shape[1],
-                    )
-                    continue
-
-                df_clean = df.iloc[:, COL_INDICES].copy()
-                df_clean.columns = COL_NAMES
-                df_clean = df_clean.dropna(subset=["ID_Probeta", "Resistencia_MPa"])
-                df_clean["Origen_Archivo"] = file.name
-                df_clean["Origen_Hoja"] = sheet_name
+    if cache is not None and not cache.enabled:
+        cache = None
+    cached: dict[int, tuple] = {}
+    keys:   dict[int, str]   = {}
+    if cache is not None:
+        for i, file in enumerate(paths):
+            try:
+                keys[i] = cache.key_for(file)
+            except OSError:
+                continue  # Archivo ilegible: el error se reporta al parsear
+            hit = cache.get(keys[i], file)
+            if hit is not None:
+                cached[i] = hit
+    pending = [i for i in range(len(paths)) if i not in cached]
+
+    if workers > 1 and len(pending) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(pending)))
+        futures = {i: pool.submit(_parse_file, paths[i]) for i in pending}
+    else:
+        pool, futures = None, {}
+
+    try:
+        for i, file in enumerate(paths):
+            try:
+                if i in cached:
+                    sheets, skipped = cached[i]
+                else:
+                    sheets, skipped = futures[i].result() if futures else _parse_file(file)
+            except Exception as exc:
+                log.error("Error procesando %s: %s", file.name, exc)
+                continue
+            if i in keys and i not in cached:
+                cache.put(keys[i], file, sheets, skipped)
+
+            for sheet_name, n_cols in skipped:
+                log.warning(
+                    "Hoja '%s' en %s: solo %d columnas (mínimo 14). Saltando.",
+                    sheet_name, file.name, n_cols,
+                )
+            for sheet_name, df_clean in sheets:
                 all_data.append(df_clean)
                 log.info("  %s / %s → %d probetas.", file.name, sheet_name, len(df_clean))
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
-        except Exception as exc:
-            log.error("Error procesando %s: %s", file.name, exc)
+    if cache is not None:
+        cache.evict()
+        log.info(
+            "Cache de parseo: %d archivo(s) reutilizados, %d leidos.",
+            len(cached), len(pending),
+        )
 
     if not all_data:
         raise ValueError(
@@ -146,10 +449,7 @@ def load_files(files: list[str | Path]) -> pd.DataFrame:
             "Verifique que los archivos tengan el formato correcto (14+ columnas, skiprows=5)."
         )
 
-    master = pd.concat(all_data, ignore_index=True)
-    master["Edad_Dias"]       = pd.to_numeric(master["Edad_Dias"], errors="coerce")
-    master["Resistencia_MPa"] = pd.to_numeric(master["Resistencia_MPa"], errors="coerce")
-    master = master.dropna(subset=["Edad_Dias", "Resistencia_MPa"])
+    master = _coerce_numeric(pd.concat(all_data, ignore_index=True))
 
     log.info(
         "Consolidación completa: %d probetas válidas de %d archivo(s).",
@@ -162,67 +462,334 @@ def load_files(files: list[str | Path]) -> pd.DataFrame:
 # PASO 1b — VALIDACIÓN DE FECHAS
 # ─────────────────────────────────────────────────────────────────────────────
 
-def validate_dates(df: pd.DataFrame) -> int:
-    """
-    Detecta y alerta sobre filas con fechas futuras en Fecha_Vaciado o Fecha_Rotura.
+# Reglas de validación de fechas: nombre → descripción para el log
+DATE_RULES: dict[str, str] = {
+    "fecha_invalida":          "fecha no interpretable",
+    "vaciado_futuro":          "Fecha_Vaciado en el futuro",
+    "rotura_futura":           "Fecha_Rotura en el futuro",
+    "rotura_antes_de_vaciado": "Fecha_Rotura anterior a Fecha_Vaciado",
+    "edad_inconsistente":      "Edad_Dias no coincide con Fecha_Rotura - Fecha_Vaciado",
+}
+EDAD_TOLERANCIA_DIAS = 1.0   # holgura entre la edad nominal y la diferencia de fechas
+ANOMALY_COLUMNS = [
+    "Fila", "ID_Probeta", "Origen_Archivo", "Origen_Hoja", "Regla", "Columna", "Valor", "Detalle",
+]
 
-    Una fecha futura indica un error de ingreso de datos (la probeta no puede
-    haberse vaciado o roto en el futuro).
 
-    Args:
-        df: DataFrame con columnas Fecha_Vaciado y/o Fecha_Rotura.
+def _parse_date_column(col: pd.Series) -> pd.Series:
+    """Fechas como datetime64 (NaT si no se pueden interpretar), sin avisos por fila."""
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)   # "Could not infer format": se reporta como regla
+        return pd.to_datetime(col, errors="coerce")
+
+
+def find_date_anomalies(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Evalúa todas las reglas de DATE_RULES en una pasada vectorizada.
 
     Returns:
-        Número de filas con al menos una fecha futura detectada.
+        Tabla larga (columnas ANOMALY_COLUMNS) con una fila por (fila de
+        `df`, regla incumplida); vacía si los datos están limpios.
     """
     today = pd.Timestamp.today().normalize()
-    warnings_count = 0
-
-    for col in ("Fecha_Vaciado", "Fecha_Rotura"):
-        if col not in df.columns:
+    missing = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    raw = {c: df[c] for c in ("Fecha_Vaciado", "Fecha_Rotura") if c in df.columns}
+    parsed = {c: _parse_date_column(v) for c, v in raw.items()}
+    vac = parsed.get("Fecha_Vaciado", missing)
+    rot = parsed.get("Fecha_Rotura", missing)
+
+    # (regla, columna, máscara, detalle); el detalle por fila solo se formatea
+    # para las filas marcadas
+    checks: list[tuple[str, str, pd.Series, str | Callable[[pd.Series], pd.Series]]] = []
+    for col, values in raw.items():
+        bad = parsed[col].isna() & values.notna()
+        if bad.any():  # solo se pasan a texto las celdas que no se pudieron interpretar
+            bad[bad] = values[bad].astype("string").str.strip() != ""
+        checks.append(("fecha_invalida", col, bad, "no interpretable"))
+    checks.append(("vaciado_futuro", "Fecha_Vaciado", vac.dt.normalize() > today, f"posterior a {today.date()}"))
+    checks.append(("rotura_futura", "Fecha_Rotura", rot.dt.normalize() > today, f"posterior a {today.date()}"))
+
+    elapsed = (rot.dt.normalize() - vac.dt.normalize()).dt.days
+    before  = elapsed < 0
+    checks.append((
+        "rotura_antes_de_vaciado", "Fecha_Rotura", before,
+        lambda m: "Fecha_Vaciado=" + vac[m].dt.strftime("%Y-%m-%d").astype("string"),
+    ))
+    if "Edad_Dias" in df.columns:
+        edad = pd.to_numeric(df["Edad_Dias"], errors="coerce")
+        checks.append((
+            "edad_inconsistente", "Edad_Dias",
+            ~before & ((edad - elapsed).abs() > EDAD_TOLERANCIA_DIAS),
+            lambda m: elapsed[m].astype("Int64").astype("string") + " dias entre vaciado y rotura",
+        ))
+
+    frames = []
+    for rule, col, mask, detail in checks:
+        mask = mask.fillna(False).astype(bool)
+        if not mask.any():
             continue
-        try:
-            parsed = pd.to_datetime(df[col], errors="coerce")
-            future_mask = parsed > today
-            n_future = int(future_mask.sum())
-            if n_future > 0:
-                warnings_count += n_future
-                log.warning(
-                    "VALIDACION DE FECHAS: %d fila(s) con %s en el futuro. "
-                    "Verifique los datos de entrada.",
-                    n_future, col,
-                )
-                for idx in df[future_mask].index:
-                    log.warning(
-                        "  → Fila %d | ID_Probeta=%s | %s=%s",
-                        idx,
-                        df.loc[idx, "ID_Probeta"] if "ID_Probeta" in df.columns else "?",
-                        col,
-                        df.loc[idx, col],
-                    )
-        except Exception as exc:
-            log.warning("No se pudo validar columna %s: %s", col, exc)
+        frames.append(pd.DataFrame({
+            "Fila":    df.index[mask.to_numpy()],
+            **{
+                c: df.loc[mask, c].astype("string").to_numpy() if c in df.columns else pd.NA
+                for c in ("ID_Probeta", "Origen_Archivo", "Origen_Hoja")
+            },
+            "Regla":   rule,
+            "Columna": col,
+            "Valor":   df.loc[mask, col].astype("string").to_numpy(),
+            "Detalle": detail if isinstance(detail, str) else detail(mask).to_numpy(),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[ANOMALY_COLUMNS]
+
+
+def log_date_anomalies(anomalies: pd.DataFrame, examples: int = 3) -> None:
+    """Una línea de log por regla incumplida con su conteo y algunos ID de ejemplo."""
+    for rule, group in anomalies.groupby("Regla", sort=False):
+        sample = ", ".join(group["ID_Probeta"].fillna("?").head(examples))
+        more   = f" (+{len(group) - examples})" if len(group) > examples else ""
+        log.warning(
+            "VALIDACION DE FECHAS [%s]: %d fila(s): %s. Ej.: %s%s",
+            rule, len(group), DATE_RULES[rule], sample, more,
+        )
 
-    return warnings_count
+
+def save_date_anomalies(
+    anomalies: pd.DataFrame,
+    db_path:   Optional[Path] = None,
+    csv_path:  Optional[Path] = None,
+    table:     str = "Anomalias_Fechas",
+) -> None:
+    """
+    Guarda la tabla de anomalías de la última importación en SQLite (reemplaza
+    `table`) y/o en CSV.
+    """
+    stamped = anomalies.assign(Detectado=pd.Timestamp.now().strftime(_SQL_DATETIME_FMT))
+    if db_path is not None:
+        conn = connect_db(db_path)
+        with closing(conn), conn:
+            stamped.to_sql(table, conn, if_exists="replace", index=False)
+    if csv_path is not None:
+        stamped.to_csv(csv_path, index=False, encoding="utf-8-sig")
+
+
+def validate_dates(df: pd.DataFrame) -> int:
+    """
+    Valida las fechas de `df` (reglas DATE_RULES) y registra un resumen por
+    regla en el log.
+
+    Una fecha futura, una rotura anterior al vaciado o una edad que no
+    coincide con las fechas indican un error de ingreso de datos. Para la
+    tabla completa de anomalías use `find_date_anomalies()`.
+
+    Args:
+        df: DataFrame con columnas Fecha_Vaciado, Fecha_Rotura y Edad_Dias.
+
+    Returns:
+        Número de filas con al menos una anomalía.
+    """
+    anomalies = find_date_anomalies(df)
+    log_date_anomalies(anomalies)
+    return int(anomalies["Fila"].nunique())
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PASO 2 — ESTADÍSTICA DESCRIPTIVA
 # ─────────────────────────────────────────────────────────────────────────────
 
-def compute_descriptive_stats(df: pd.DataFrame) -> pd.DataFrame:
-    """Estadística descriptiva agrupada por edad (días)."""
-    stats_df = (
-        df.groupby("Edad_Dias")["Resistencia_MPa"]
-        .agg(["count", "mean", "std", "min", "max"])
-        .reset_index()
-    )
-    stats_df["CV_%"] = (stats_df["std"] / stats_df["mean"]) * 100
-    stats_df.rename(
-        columns={"count": "N", "mean": "Media", "std": "Desv", "min": "Min", "max": "Max"},
-        inplace=True,
+_MOMENT_COLS = ["n", "mean", "m2", "min", "max"]
+
+
+@dataclass
+class StatsAccumulator:
+    """
+    Momentos suficientes de Resistencia_MPa por grupo (Welford / Chan).
+
+    Por cada grupo de `by` (una columna, p. ej. "Edad_Dias" o "Estructura",
+    o una lista de columnas) guarda n, media, M2 (suma de cuadrados
+    centrada), mínimo y máximo. Con eso se reconstruye la tabla
+    N/Media/Desv/Min/Max/CV_% sin conservar las filas.
+
+    Se alimenta por bloques con `update()` y dos acumuladores (p. ej. de
+    procesos distintos) se combinan con `merge()` usando la fórmula de Chan;
+    el resultado no depende del orden ni del tamaño de los bloques.
+    """
+    by:     str | list[str] = "Edad_Dias"
+    groups: pd.DataFrame = field(
+        default_factory=lambda: pd.DataFrame(columns=_MOMENT_COLS, dtype=float)
     )
-    return stats_df
+
+    @property
+    def keys(self) -> list[str]:
+        return [self.by] if isinstance(self.by, str) else list(self.by)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, by: str | list[str] = "Edad_Dias") -> "StatsAccumulator":
+        """Calcula los momentos de un lote de filas."""
+        g = df.groupby(by)["Resistencia_MPa"]
+        groups = pd.DataFrame({
+            "n":    g.count().astype(float),
+            "mean": g.mean(),
+            "m2":   g.var(ddof=0) * g.count(),
+            "min":  g.min(),
+            "max":  g.max(),
+        })
+        groups = groups[groups["n"] > 0]
+        return cls(by=by, groups=groups)
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Iterable[pd.DataFrame], by: str | list[str] = "Edad_Dias",
+    ) -> "StatsAccumulator":
+        """Acumula un iterable de bloques sin retener más de uno en memoria."""
+        acc = cls(by=by)
+        for chunk in chunks:
+            acc.update(chunk)
+        return acc
+
+    def update(self, chunk: pd.DataFrame) -> "StatsAccumulator":
+        """Incorpora un bloque de filas. Devuelve self."""
+        return self.merge(StatsAccumulator.from_frame(chunk, self.by))
+
+    def merge(self, other: "StatsAccumulator") -> "StatsAccumulator":
+        """Incorpora los momentos de `other` (fórmula de Chan). Devuelve self."""
+        if other.groups.empty:
+            return self
+        if self.groups.empty:
+            self.groups = other.groups.copy()
+            return self
+        idx = self.groups.index.union(other.groups.index)
+        a = self.groups.reindex(idx)
+        b = other.groups.reindex(idx)
+        na, nb = a["n"].fillna(0.0), b["n"].fillna(0.0)
+        ma, mb = a["mean"].fillna(0.0), b["mean"].fillna(0.0)
+        n = na + nb
+        delta = mb - ma
+        merged = pd.DataFrame({
+            "n":    n,
+            "mean": ma + delta * nb / n,
+            "m2":   a["m2"].fillna(0.0) + b["m2"].fillna(0.0) + delta ** 2 * na * nb / n,
+            "min":  np.fmin(a["min"], b["min"]),
+            "max":  np.fmax(a["max"], b["max"]),
+        }, index=idx)
+        self.groups = merged.rename_axis(self.keys)
+        return self
+
+    def remove(self, other: "StatsAccumulator") -> "StatsAccumulator":
+        """
+        Retira los momentos de `other` (inversa de Chan). Devuelve self.
+
+        El mínimo y el máximo no son reversibles: los grupos afectados deben
+        actualizarse después con `set_extremes()`.
+        """
+        b = other.groups.reindex(self.groups.index)
+        n, mean, m2 = self.groups["n"], self.groups["mean"], self.groups["m2"]
+        nb, mb = b["n"].fillna(0.0), b["mean"].fillna(0.0)
+        na = n - nb
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ma = (n * mean - nb * mb) / na
+            delta = mb - ma
+            m2a = m2 - b["m2"].fillna(0.0) - delta ** 2 * na * nb / n
+        groups = self.groups.assign(n=na, mean=ma, m2=m2a.clip(lower=0.0))
+        self.groups = groups[groups["n"] > 0]
+        return self
+
+    def set_extremes(self, extremes: pd.DataFrame) -> None:
+        """Sobrescribe min/max de los grupos presentes en `extremes`."""
+        common = extremes.index.intersection(self.groups.index)
+        self.groups.loc[common, ["min", "max"]] = extremes.loc[common, ["min", "max"]].values
+
+    @property
+    def n_total(self) -> int:
+        return int(self.groups["n"].sum())
+
+    def to_frame(self) -> pd.DataFrame:
+        """Tabla N/Media/Desv/Min/Max/CV_% (formato de `compute_descriptive_stats()`)."""
+        g = self.groups.sort_index()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            desv = np.sqrt(g["m2"] / (g["n"] - 1)).where(g["n"] > 1)
+        stats_df = g.index.set_names(self.keys).to_frame(index=False)
+        stats_df["N"]     = g["n"].round().astype("int64").values
+        stats_df["Media"] = g["mean"].values
+        stats_df["Desv"]  = desv.values
+        stats_df["Min"]   = g["min"].values
+        stats_df["Max"]   = g["max"].values
+        stats_df["CV_%"]  = (stats_df["Desv"] / stats_df["Media"]) * 100
+        return stats_df
+
+    def to_sql(self, conn: sqlite3.Connection, table: str) -> None:
+        self.groups.rename_axis(self.keys).reset_index().to_sql(
+            table, conn, if_exists="replace", index=False,
+        )
+
+    @classmethod
+    def from_sql(
+        cls, conn: sqlite3.Connection, table: str, by: str | list[str] = "Edad_Dias",
+    ) -> "StatsAccumulator":
+        groups = pd.read_sql(f"SELECT * FROM {table}", conn).set_index(by)
+        return cls(by=by, groups=groups[_MOMENT_COLS].astype(float))
+
+
+def compute_descriptive_stats(df: pd.DataFrame, by: str | list[str] = "Edad_Dias") -> pd.DataFrame:
+    """Estadística descriptiva agrupada por edad (días) u otra(s) columna(s)."""
+    return StatsAccumulator.from_frame(df, by).to_frame()
+
+
+def iter_file_chunks(files: list[str | Path]) -> Iterator[pd.DataFrame]:
+    """
+    Produce las hojas limpias de `files` una a una (mismo formato que
+    `load_files()`), sin consolidarlas en un único DataFrame.
+    """
+    for raw_file in files:
+        file = Path(raw_file)
+        try:
+            sheets, _ = _parse_file(file)
+        except Exception as exc:
+            log.error("Error procesando %s: %s", file.name, exc)
+            continue
+        for _, df_clean in sheets:
+            yield _coerce_numeric(df_clean)
+
+
+def iter_db_chunks(
+    db_path: Path,
+    chunksize: int = 50_000,
+    columns: Iterable[str] = ("Edad_Dias", "Estructura", "Resistencia_MPa"),
+) -> Iterator[pd.DataFrame]:
+    """Lee la tabla 'Roturas' por bloques de `chunksize` filas."""
+    cols = ", ".join(columns)
+    with closing(sqlite3.connect(db_path)) as conn:
+        yield from pd.read_sql(f"SELECT {cols} FROM Roturas", conn, chunksize=chunksize)
+
+
+def _file_accumulator(file: Path, by: str | list[str]) -> StatsAccumulator:
+    """Momentos de un solo archivo (función de nivel de módulo para procesos)."""
+    return StatsAccumulator.from_chunks(iter_file_chunks([file]), by)
+
+
+def accumulate_files(
+    files: list[str | Path],
+    by: str | list[str] = "Edad_Dias",
+    workers: int = 1,
+) -> StatsAccumulator:
+    """
+    Estadística descriptiva de `files` sin materializar el dataset completo.
+
+    Con workers > 1 cada archivo se resume en un proceso distinto y los
+    acumuladores parciales se combinan en el proceso principal.
+    """
+    paths = [Path(f) for f in files]
+    if workers <= 1 or len(paths) <= 1:
+        return StatsAccumulator.from_chunks(iter_file_chunks(paths), by)
+
+    acc = StatsAccumulator(by=by)
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        for part in pool.map(_file_accumulator, paths, [by] * len(paths)):
+            acc.merge(part)
+    return acc
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -239,6 +806,7 @@ class InferenceResults:
     fck_project:   float = 0.0
     fck_required:  float = FCK_REQUIRED
     target_28d:    float = TARGETS[28.0]
+    bootstrap:     Optional["BootstrapResults"] = None
 
     @property
     def passes_ttest(self) -> bool:
@@ -255,18 +823,32 @@ def compute_inference(df: pd.DataFrame) -> InferenceResults:
       - T-test de una muestra a 28 días vs. target del fabricante.
       - Resistencia característica f'ck (percentil 5, método ACI 318).
     """
-    stats_summary = compute_descriptive_stats(df)
-    data_28 = df[df["Edad_Dias"] == 28.0]["Resistencia_MPa"]
+    return inference_from_summary(compute_descriptive_stats(df), n_total=len(df))
+
+
+def inference_from_summary(stats_summary: pd.DataFrame, n_total: int) -> InferenceResults:
+    """
+    Inferencia a partir de la tabla descriptiva (N, Media, Desv por edad).
 
-    if len(data_28) >= 2:
-        t_stat, p_val = stats.ttest_1samp(data_28, TARGETS[28.0])
-        fck = data_28.mean() - 1.645 * data_28.std(ddof=1)
+    El t-test de una muestra y f'ck solo dependen de n, media y desviación
+    del grupo de 28 días, por lo que pueden obtenerse desde momentos
+    almacenados (modo incremental) sin volver a leer las filas.
+    """
+    row_28 = stats_summary[stats_summary["Edad_Dias"] == 28.0]
+    n_28 = int(row_28["N"].iloc[0]) if not row_28.empty else 0
+
+    if n_28 >= 2:
+        mean_28 = float(row_28["Media"].iloc[0])
+        std_28  = float(row_28["Desv"].iloc[0])
+        t_stat  = (mean_28 - TARGETS[28.0]) / (std_28 / np.sqrt(n_28))
+        p_val   = 2 * stats.t.sf(abs(t_stat), df=n_28 - 1)
+        fck     = mean_28 - 1.645 * std_28
     else:
-        log.warning("Datos insuficientes a 28 días (n=%d). Inferencia no calculada.", len(data_28))
+        log.warning("Datos insuficientes a 28 días (n=%d). Inferencia no calculada.", n_28)
         t_stat, p_val, fck = 0.0, 1.0, 0.0
 
     return InferenceResults(
-        n_total=len(df),
+        n_total=n_total,
         stats_summary=stats_summary,
         t_stat_28d=float(t_stat),
         p_value_28d=float(p_val),
@@ -274,6 +856,91 @@ def compute_inference(df: pd.DataFrame) -> InferenceResults:
     )
 
 
+# Remuestreo bootstrap de la población de 28 días
+BOOTSTRAP_RESAMPLES = 10_000
+BOOTSTRAP_SEED      = 9400
+_BOOTSTRAP_BLOCK    = 1_000_000  # índices por bloque (~8 MB): cabe en caché y acota la RAM
+
+
+@dataclass
+class BootstrapResults:
+    """
+    Intervalos bootstrap (percentil) de la población de 28 días.
+
+    `pass_rate` es la fracción de probetas con MPa >= f'ck requerido y
+    `prob_fck_pass` la fracción de remuestras cuyo f'ck alcanza el requerido.
+    """
+    n:             int
+    n_resamples:   int
+    level:         float
+    seed:          Optional[int]
+    mean_ci:       tuple[float, float]
+    fck_ci:        tuple[float, float]
+    pass_rate:     float
+    pass_rate_ci:  tuple[float, float]
+    prob_fck_pass: float
+
+
+def bootstrap_28d(
+    df:          pd.DataFrame,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    level:       float = 0.95,
+    seed:        Optional[int] = BOOTSTRAP_SEED,
+) -> BootstrapResults:
+    """
+    Bootstrap no paramétrico de media, f'ck y tasa de aprobación a 28 días.
+
+    Las remuestras se generan como matrices de índices (remuestras x n) por
+    bloques de ~1M celdas; de cada bloque salen Σy, Σy² y el conteo de
+    aprobadas en una sola pasada. Con la misma semilla el resultado es
+    reproducible.
+
+    Raises:
+        ValueError: Si hay menos de 2 probetas de 28 días.
+    """
+    y = np.sort(df.loc[df["Edad_Dias"] == 28.0, "Resistencia_MPa"].dropna().to_numpy(dtype=float))
+    n = len(y)
+    if n < 2:
+        raise ValueError(f"Bootstrap no calculable: {n} probeta(s) de 28 dias.")
+
+    rng    = np.random.default_rng(seed)
+    center = float(y.mean())
+    yc     = y - center                         # centrado: Σy² sin cancelación
+    first_pass = int(np.searchsorted(y, FCK_REQUIRED))  # y ordenado: aprueba idx >= first_pass
+    sums   = np.empty(n_resamples)
+    sumsq  = np.empty(n_resamples)
+    passed = np.empty(n_resamples)
+    block  = max(1, _BOOTSTRAP_BLOCK // n)
+    for start in range(0, n_resamples, block):
+        stop = min(start + block, n_resamples)
+        idx  = rng.integers(0, n, size=(stop - start, n))
+        vals = yc[idx]
+        sums[start:stop]   = vals.sum(axis=1)
+        sumsq[start:stop]  = np.einsum("ij,ij->i", vals, vals)
+        passed[start:stop] = np.count_nonzero(idx >= first_pass, axis=1)
+
+    means = center + sums / n
+    stds  = np.sqrt(np.clip(sumsq - sums ** 2 / n, 0.0, None) / (n - 1))
+    fcks  = means - 1.645 * stds
+    q = [(1 - level) / 2, (1 + level) / 2]
+
+    def ci(values: np.ndarray) -> tuple[float, float]:
+        lo, hi = np.quantile(values, q)
+        return float(lo), float(hi)
+
+    return BootstrapResults(
+        n=n,
+        n_resamples=n_resamples,
+        level=level,
+        seed=seed,
+        mean_ci=ci(means),
+        fck_ci=ci(fcks),
+        pass_rate=float(n - first_pass) / n,
+        pass_rate_ci=ci(passed / n),
+        prob_fck_pass=float(np.mean(fcks >= FCK_REQUIRED)),
+    )
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PASO 4 — ANÁLISIS ANOVA
 # ─────────────────────────────────────────────────────────────────────────────
@@ -301,37 +968,114 @@ class AnovaResults:
         return self.levene_p >= 0.05
 
 
-def perform_anova(df: pd.DataFrame, factor: str) -> AnovaResults:
+def anova_table_from_ss(
+    ss_between: float, ss_within: float, k: int, n: int, factor: str,
+) -> pd.DataFrame:
+    """
+    Tabla ANOVA de un factor (formato de `sm.stats.anova_lm(..., typ=2)`)
+    a partir de las sumas de cuadrados, k grupos y n observaciones.
+    """
+    df_between = float(k - 1)
+    df_within  = float(n - k)
+    f_stat = (ss_between / df_between) / (ss_within / df_within)
+    p_val  = float(stats.f.sf(f_stat, df_between, df_within))
+    return pd.DataFrame(
+        {
+            "sum_sq": [ss_between, ss_within],
+            "df":     [df_between, df_within],
+            "F":      [f_stat, np.nan],
+            "PR(>F)": [p_val, np.nan],
+        },
+        index=[f"C({factor})", "Residual"],
+    )
+
+
+def _oneway_anova(
+    y: np.ndarray, codes: np.ndarray, factor: str,
+) -> tuple[pd.DataFrame, np.ndarray, list[np.ndarray]]:
+    """
+    ANOVA de un factor a partir de sumas por grupo (np.bincount).
+
+    Args:
+        y:      Respuesta (Resistencia_MPa) sin NaN.
+        codes:  Código entero 0..k-1 del grupo de cada fila.
+        factor: Nombre del factor, para el índice de la tabla.
+
+    Returns:
+        (tabla, residuos, grupos) donde la tabla tiene el mismo formato que
+        `sm.stats.anova_lm(..., typ=2)` para un modelo de un factor, los
+        residuos son y - media_del_grupo y grupos es la lista de arrays de y
+        por grupo (para Levene).
+    """
+    k = int(codes.max()) + 1
+    counts = np.bincount(codes, minlength=k)
+    sums   = np.bincount(codes, weights=y, minlength=k)
+    means  = sums / counts
+
+    resid      = y - means[codes]
+    ss_within  = float(resid @ resid)
+    ss_between = float(counts @ (means - y.mean()) ** 2)
+    table = anova_table_from_ss(ss_between, ss_within, k, len(y), factor)
+
+    order  = np.argsort(codes, kind="stable")
+    groups = np.split(y[order], np.cumsum(counts)[:-1])
+    return table, resid, groups
+
+
+def _statsmodels_anova(
+    df: pd.DataFrame, factor: str,
+) -> tuple[pd.DataFrame, np.ndarray, list[np.ndarray]]:
+    """Misma salida que `_oneway_anova()` usando la API de fórmulas de statsmodels."""
+    df_anova = df[["Resistencia_MPa", factor]].copy()
+    df_anova[factor] = df_anova[factor].astype(str)
+
+    model = ols(f"Resistencia_MPa ~ C({factor})", data=df_anova).fit()
+    anova_table = sm.stats.anova_lm(model, typ=2)
+    groups = [g["Resistencia_MPa"].values for _, g in df_anova.groupby(factor)]
+    return anova_table, np.asarray(model.resid), groups
+
+
+def perform_anova(df: pd.DataFrame, factor: str, engine: str = "numpy") -> AnovaResults:
     """
     ANOVA de un factor con validación de supuestos y post-hoc Tukey HSD.
 
     Args:
         df:     DataFrame con columnas Resistencia_MPa y la columna `factor`.
         factor: Nombre de la columna categórica ("Edad_Dias" o "Estructura").
+        engine: "numpy" (default) calcula SS entre/dentro, F, p y residuos
+                directamente de los códigos de grupo; "statsmodels" ajusta el
+                modelo OLS completo. El motor numpy recurre a statsmodels si
+                hay menos de dos grupos o no quedan grados de libertad.
 
     Returns:
         AnovaResults con tabla ANOVA, estadísticas de supuestos y Tukey.
     """
-    df_anova = df.copy()
-    df_anova[factor] = df_anova[factor].astype(str)
+    if engine not in ("numpy", "statsmodels"):
+        raise ValueError(f"Motor ANOVA desconocido: {engine!r}")
 
-    model = ols(f"Resistencia_MPa ~ C({factor})", data=df_anova).fit()
-    anova_table = sm.stats.anova_lm(model, typ=2)
+    # Igual que patsy (missing="drop"): se descartan filas sin respuesta o sin factor
+    valid = (df["Resistencia_MPa"].notna() & df[factor].notna()).to_numpy()
+    y = df["Resistencia_MPa"].to_numpy(dtype=float)[valid]
+    codes, levels = pd.factorize(df[factor].to_numpy()[valid], sort=True)
+
+    if engine == "numpy" and 2 <= len(levels) < len(y):
+        anova_table, resid, groups = _oneway_anova(y, codes, factor)
+    else:
+        anova_table, resid, groups = _statsmodels_anova(df, factor)
     is_significant = bool(anova_table["PR(>F)"].iloc[0] < 0.05)
 
     # Supuesto de normalidad
-    shapiro_stat, shapiro_p = stats.shapiro(model.resid)
+    shapiro_stat, shapiro_p = stats.shapiro(resid)
 
     # Supuesto de homogeneidad de varianzas
-    groups = [g["Resistencia_MPa"].values for _, g in df_anova.groupby(factor)]
     levene_stat, levene_p = stats.levene(*groups)
 
     # Post-hoc Tukey HSD (solo si ANOVA es significativo)
     tukey = None
     if is_significant:
         tukey = pairwise_tukeyhsd(
-            endog=df_anova["Resistencia_MPa"],
-            groups=df_anova[factor],
+            endog=y,
+            groups=df[factor].to_numpy()[valid].astype(str),
             alpha=0.05,
         )
         log.info("ANOVA [%s]: SIGNIFICATIVO → Post-hoc Tukey aplicado.", factor)
@@ -355,6 +1099,155 @@ def perform_anova(df: pd.DataFrame, factor: str) -> AnovaResults:
 # PASO 5 — MODELO PREDICTIVO LOGARÍTMICO
 # ─────────────────────────────────────────────────────────────────────────────
 
+@dataclass
+class LogModelSums:
+    """
+    Sumas suficientes de la regresión MPa = a + b·ln(Edad_Dias).
+
+    Con n, Σx, Σy, Σx², Σxy y Σy² (x = ln(edad), y = MPa) se obtienen
+    intercepto, pendiente y R² sin recorrer el historial; añadir o retirar
+    un lote cuesta O(lote).
+    """
+    n:   int   = 0
+    sx:  float = 0.0
+    sy:  float = 0.0
+    sxx: float = 0.0
+    sxy: float = 0.0
+    syy: float = 0.0
+
+    def update(self, df: pd.DataFrame, sign: int = 1) -> None:
+        """
+        Suma (sign=1) o resta (sign=-1) la contribución de las filas de `df`.
+        Las filas sin edad positiva o sin resistencia no cuentan.
+        """
+        age = df["Edad_Dias"].to_numpy(dtype=float)
+        y   = df["Resistencia_MPa"].to_numpy(dtype=float)
+        ok  = (age > 0) & np.isfinite(y)
+        x, y = np.log(age[ok]), y[ok]
+        self.n   += sign * len(x)
+        self.sx  += sign * float(x.sum())
+        self.sy  += sign * float(y.sum())
+        self.sxx += sign * float(x @ x)
+        self.sxy += sign * float(x @ y)
+        self.syy += sign * float(y @ y)
+
+    def fit(self) -> tuple[float, float, float]:
+        """
+        Returns:
+            (intercepto, pendiente, R²) por mínimos cuadrados ordinarios.
+
+        Raises:
+            ValueError: Si hay menos de 2 muestras o una sola edad distinta.
+        """
+        sxx_c = self.sxx - self.sx ** 2 / self.n if self.n else 0.0
+        if self.n < 2 or sxx_c <= 0:
+            raise ValueError("Datos insuficientes para ajustar el modelo logaritmico.")
+        sxy_c = self.sxy - self.sx * self.sy / self.n
+        syy_c = self.syy - self.sy ** 2 / self.n
+        slope     = sxy_c / sxx_c
+        intercept = (self.sy - slope * self.sx) / self.n
+        r2        = slope * sxy_c / syy_c if syy_c > 0 else 1.0
+        return intercept, slope, r2
+
+    def dispersion(self) -> tuple[float, float]:
+        """
+        Returns:
+            (Σ(x - x̄)², varianza residual s² = SSE / (n - 2)); s² es NaN con
+            n <= 2. Ambos alimentan los intervalos de predicción.
+        """
+        _, slope, _ = self.fit()
+        sxx_c = self.sxx - self.sx ** 2 / self.n
+        sxy_c = self.sxy - self.sx * self.sy / self.n
+        syy_c = self.syy - self.sy ** 2 / self.n
+        sse   = max(syy_c - slope * sxy_c, 0.0)
+        return sxx_c, sse / (self.n - 2) if self.n > 2 else float("nan")
+
+    @classmethod
+    def from_group_sums(cls, sums: pd.DataFrame) -> "LogModelSums":
+        """
+        Sumas suficientes desde `query_group_sums(by="Edad_Dias")`: dentro de
+        cada edad x = ln(edad) es constante, así que basta n, Σy y Σy² por grupo.
+        """
+        sums = sums[sums.index.notna() & (sums["n"] > 0)]
+        x    = np.log(sums.index.to_numpy(dtype=float))
+        n_i  = sums["n"].to_numpy(dtype=float)
+        s_i  = sums["sum"].to_numpy(dtype=float)
+        return cls(
+            n=int(n_i.sum()),
+            sx=float(n_i @ x),
+            sy=float(s_i.sum()),
+            sxx=float(n_i @ (x * x)),
+            sxy=float(s_i @ x),
+            syy=float(sums["sumsq"].sum()),
+        )
+
+    def to_sql(self, conn: sqlite3.Connection, table: str = "Modelo_Sumas") -> None:
+        pd.DataFrame([asdict(self)]).to_sql(table, conn, if_exists="replace", index=False)
+
+    @classmethod
+    def from_sql(cls, conn: sqlite3.Connection, table: str = "Modelo_Sumas") -> "LogModelSums":
+        row = pd.read_sql(f"SELECT * FROM {table}", conn).iloc[0]
+        return cls(n=int(row["n"]), **{k: float(row[k]) for k in ("sx", "sy", "sxx", "sxy", "syy")})
+
+
+def _prediction_frame(
+    data:     pd.DataFrame | str | Path | Iterable[float],
+    age_days: Optional[float | Iterable[float]] = None,
+) -> pd.DataFrame:
+    """Normaliza la entrada de `predict_many` a un DataFrame con Resistencia_MPa y Edad_Dias."""
+    if isinstance(data, (str, Path)):
+        data = pd.read_csv(data)
+    if isinstance(data, pd.DataFrame):
+        if age_days is not None:
+            raise ValueError("age_days solo se usa con arreglos; el DataFrame ya trae Edad_Dias.")
+        return data.copy()
+    if age_days is None:
+        raise ValueError("Indique age_days para un arreglo de resistencias.")
+    mpa = np.asarray(data, dtype=float).ravel()
+    return pd.DataFrame({
+        "Resistencia_MPa": mpa,
+        "Edad_Dias":       np.broadcast_to(np.asarray(age_days, dtype=float), mpa.shape),
+    })
+
+
+def _project_28d(
+    out:       pd.DataFrame,
+    slope:     float | np.ndarray,
+    resid_var: float | np.ndarray,
+    sxx_c:     float | np.ndarray,
+    n:         int | np.ndarray,
+    level:     float,
+) -> pd.DataFrame:
+    """
+    Añade a `out` la proyección a 28 días y su intervalo de predicción.
+    Los parámetros del modelo pueden ser escalares o un arreglo por fila.
+    """
+    mpa = pd.to_numeric(out["Resistencia_MPa"], errors="coerce").to_numpy(dtype=float)
+    age = pd.to_numeric(out["Edad_Dias"], errors="coerce").to_numpy(dtype=float)
+    dof = np.asarray(n, dtype=float) - 2
+    dof = np.where(dof > 0, dof, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = np.log(28.0) - np.log(np.where(age > 0, age, np.nan))
+        pred  = mpa + slope * delta
+        se    = np.sqrt(resid_var * (1.0 + delta ** 2 / sxx_c))
+        half      = stats.t.ppf(0.5 + level / 2, dof) * se
+        prob_pass = stats.t.sf((TARGETS[28.0] - pred) / se, dof)
+
+    valid  = ~np.isnan(pred)
+    target = pd.Series(age).map(TARGETS).to_numpy(dtype=float)
+    out["MPa_28d"]     = pred
+    out["PI_Inf"]      = pred - half
+    out["PI_Sup"]      = pred + half
+    out["Prob_Cumple"] = prob_pass
+    out["Estado"]      = pd.Series(
+        np.where(pred >= TARGETS[28.0], "CUMPLE", "RIESGO"), index=out.index, dtype="string",
+    ).where(valid)
+    out["Cumple_Edad"] = pd.Series(mpa >= target, index=out.index, dtype="boolean").where(
+        ~np.isnan(target) & ~np.isnan(mpa)
+    )
+    return out
+
+
 @dataclass
 class PredictiveModel:
     """
@@ -367,6 +1260,9 @@ class PredictiveModel:
     slope:      float = 0.0
     n_samples:  int   = 0
     is_trained: bool  = False
+    sxx_c:      float = 0.0           # Σ(ln edad - media)²
+    resid_var:  float = float("nan")  # s² = SSE / (n - 2)
+    sums:       LogModelSums = field(default_factory=LogModelSums)
 
     def train(self, df: pd.DataFrame) -> None:
         """Entrena el modelo sobre el DataFrame consolidado."""
@@ -380,11 +1276,51 @@ class PredictiveModel:
         self.n_samples = len(df)
         self.is_trained = True
 
+        resid = y - self.model.predict(X)
+        self.sxx_c     = float(((X[:, 0] - X[:, 0].mean()) ** 2).sum())
+        self.resid_var = float(resid @ resid) / (len(df) - 2) if len(df) > 2 else float("nan")
+        self.sums = LogModelSums()
+        self.sums.update(df)
+
         log.info(
             "Modelo logaritmico entrenado: R2=%.4f | %s",
             self.r2_score, self.equation_str,
         )
 
+    def train_from_sums(self, sums: LogModelSums) -> None:
+        """
+        Ajusta el modelo desde sumas suficientes (modo incremental).
+
+        Produce los mismos coeficientes que `train()` sobre las mismas filas;
+        el estimador sklearn interno no se reentrena.
+        """
+        self._fit_sums(sums)
+        log.info(
+            "Modelo logaritmico actualizado desde sumas: R2=%.4f | %s",
+            self.r2_score, self.equation_str,
+        )
+
+    def partial_fit(self, df: pd.DataFrame, sign: int = 1) -> None:
+        """
+        Entrenamiento en línea: añade (sign=1) o retira (sign=-1) las filas
+        de `df` y reajusta en O(lote), sin volver a recorrer el historial.
+        Mientras las sumas no admitan un ajuste (menos de 2 edades distintas)
+        solo se acumulan y el modelo queda sin entrenar.
+        """
+        sums = replace(self.sums)
+        sums.update(df, sign=sign)
+        try:
+            self._fit_sums(sums)
+        except ValueError:
+            self.sums, self.is_trained = sums, False
+
+    def _fit_sums(self, sums: LogModelSums) -> None:
+        self.intercept, self.slope, self.r2_score = (float(v) for v in sums.fit())
+        self.sxx_c, self.resid_var = sums.dispersion()
+        self.sums       = replace(sums)
+        self.n_samples  = sums.n
+        self.is_trained = True
+
     def predict_at_28d(self, mpa_at_age: float, age_days: float) -> float:
         """
         Proyecta la resistencia a 28 días usando la pendiente del modelo.
@@ -395,171 +1331,1429 @@ class PredictiveModel:
             raise RuntimeError("Modelo no entrenado. Llame a train() primero.")
         return mpa_at_age + self.slope * (np.log(28) - np.log(age_days))
 
+    def predict_many(
+        self,
+        data:     pd.DataFrame | str | Path | Iterable[float],
+        age_days: Optional[float | Iterable[float]] = None,
+        level:    float = 0.95,
+    ) -> pd.DataFrame:
+        """
+        Proyección vectorizada a 28 días de muchas roturas tempranas.
+
+        Args:
+            data:     DataFrame (o ruta a CSV) con Resistencia_MPa y Edad_Dias,
+                      o un arreglo de resistencias junto con `age_days`.
+            age_days: Edades de cada resistencia (o una sola edad para todas);
+                      solo cuando `data` es un arreglo.
+            level:    Nivel de confianza del intervalo de predicción.
+
+        Returns:
+            Las columnas de entrada más MPa_28d, PI_Inf / PI_Sup (intervalo
+            t de Student con n-2 gl y varianza s²·(1 + Δ²/Sxx), Δ = ln 28 -
+            ln edad), Prob_Cumple = P(MPa_28 >= meta), Estado (CUMPLE /
+            RIESGO frente a TARGETS[28.0]) y Cumple_Edad (medición frente a la
+            meta de su propia edad, vacío si la edad no tiene meta). Edades
+            no positivas producen NaN y Estado vacío.
+        """
+        if not self.is_trained:
+            raise RuntimeError("Modelo no entrenado. Llame a train() primero.")
+        return _project_28d(
+            _prediction_frame(data, age_days),
+            self.slope, self.resid_var, self.sxx_c, self.n_samples, level,
+        )
+
     @property
     def equation_str(self) -> str:
         return f"Resistencia = {self.intercept:.2f} + {self.slope:.2f} x ln(Edad)"
 
 
+# Probetas mínimas para que un grupo tenga curva propia en ModelBank
+MODEL_BANK_MIN_SAMPLES = 10
+
+_SUM_COLS = ["n", "sx", "sy", "sxx", "sxy", "syy"]
+
+
+def _log_sum_terms(df: pd.DataFrame) -> pd.DataFrame:
+    """Términos n, x, y, x², xy, y² por fila (x = ln edad) de las filas válidas de `df`."""
+    age = pd.to_numeric(df["Edad_Dias"], errors="coerce").to_numpy(dtype=float)
+    y   = pd.to_numeric(df["Resistencia_MPa"], errors="coerce").to_numpy(dtype=float)
+    ok  = (age > 0) & np.isfinite(y)
+    x, y = np.log(age[ok]), y[ok]
+    return pd.DataFrame(
+        {"n": 1.0, "sx": x, "sy": y, "sxx": x * x, "sxy": x * y, "syy": y * y},
+        index=df.index[ok],
+    )
+
+
+@dataclass
+class ModelBank:
+    """
+    Banco de modelos logarítmicos, uno por grupo de `by` (p. ej. Estructura
+    u Origen_Archivo), mantenido como sumas suficientes por grupo.
+
+    Los coeficientes de todos los grupos se resuelven juntos, en forma
+    cerrada y vectorizada, la primera vez que se piden, y se cachean hasta
+    el siguiente `update()`. Los grupos con menos de `min_samples` probetas
+    o una sola edad usan el modelo global.
+    """
+    by:          list[str]
+    sums:        pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=_SUM_COLS))
+    global_sums: LogModelSums = field(default_factory=LogModelSums)
+    min_samples: int = MODEL_BANK_MIN_SAMPLES
+    _fits:       Optional[pd.DataFrame] = field(default=None, init=False, repr=False)
+    _models:     dict[Any, PredictiveModel] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if isinstance(self.by, str):
+            self.by = [self.by]
+
+    @classmethod
+    def from_frame(
+        cls,
+        df:          pd.DataFrame,
+        by:          str | list[str] = "Estructura",
+        min_samples: int = MODEL_BANK_MIN_SAMPLES,
+    ) -> "ModelBank":
+        """Banco ajustado a las filas de `df`."""
+        bank = cls(by=by, min_samples=min_samples)
+        bank.update(df)
+        return bank
+
+    @classmethod
+    def from_db(
+        cls,
+        db_path:     Path,
+        by:          str | list[str] = "Estructura",
+        min_samples: int = MODEL_BANK_MIN_SAMPLES,
+        filt:        Optional[RoturasFilter] = None,
+    ) -> "ModelBank":
+        """
+        Banco desde la BD sin leer filas: SQLite agrega n, Σy y Σy² por
+        (grupo, edad) y, como x = ln(edad) es constante en cada celda, de ahí
+        salen las sumas del modelo de cada grupo.
+        """
+        bank = cls(by=by, min_samples=min_samples)
+        with closing(_connect_readonly(db_path)) as conn:
+            cells = _group_sums(conn, [*bank.by, "Edad_Dias"], filt).reset_index()
+        cells = cells[(cells["Edad_Dias"] > 0) & (cells["n"] > 0)]
+        x = np.log(cells["Edad_Dias"].to_numpy(dtype=float))
+        terms = pd.DataFrame({
+            "n":   cells["n"].to_numpy(),
+            "sx":  cells["n"].to_numpy() * x,
+            "sy":  cells["sum"].to_numpy(),
+            "sxx": cells["n"].to_numpy() * x * x,
+            "sxy": cells["sum"].to_numpy() * x,
+            "syy": cells["sumsq"].to_numpy(),
+        }, index=cells.index)
+        bank._add_terms(cells[bank.by], terms, sign=1)
+        return bank
+
+    def update(self, df: pd.DataFrame, sign: int = 1) -> None:
+        """Suma (sign=1) o resta (sign=-1) las filas de `df` en O(lote)."""
+        terms = _log_sum_terms(df)
+        self._add_terms(df.loc[terms.index, self.by], terms, sign)
+
+    def _add_terms(self, keys: pd.DataFrame, terms: pd.DataFrame, sign: int) -> None:
+        totals = terms.sum()
+        self.global_sums = LogModelSums(
+            n=self.global_sums.n + sign * int(totals.get("n", 0)),
+            **{c: getattr(self.global_sums, c) + sign * float(totals.get(c, 0.0)) for c in _SUM_COLS[1:]},
+        )
+        batch = pd.concat([keys, terms], axis=1).groupby(self.by).sum()
+        batch = sign * batch
+        sums = batch if self.sums.empty else self.sums.add(batch, fill_value=0.0)
+        self.sums = sums[sums["n"] > 0]
+        self._fits = None
+        self._models.clear()
+
+    @property
+    def global_model(self) -> PredictiveModel:
+        model = PredictiveModel()
+        model._fit_sums(self.global_sums)
+        return model
+
+    @property
+    def fits(self) -> pd.DataFrame:
+        """
+        Coeficientes de cada grupo (intercept, slope, r2, sxx_c, resid_var,
+        n y Global = usa el modelo global), calculados una vez para todos.
+        """
+        if self._fits is not None:
+            return self._fits
+        g  = self.sums
+        n  = g["n"].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sxx_c = g["sxx"].to_numpy() - g["sx"].to_numpy() ** 2 / n
+            sxy_c = g["sxy"].to_numpy() - g["sx"].to_numpy() * g["sy"].to_numpy() / n
+            syy_c = g["syy"].to_numpy() - g["sy"].to_numpy() ** 2 / n
+            slope = sxy_c / sxx_c
+            intercept = (g["sy"].to_numpy() - slope * g["sx"].to_numpy()) / n
+            r2 = np.where(syy_c > 0, slope * sxy_c / syy_c, 1.0)
+            resid_var = np.clip(syy_c - slope * sxy_c, 0.0, None) / (n - 2)
+        # sxx_c relativo: con una sola edad la resta deja solo ruido de redondeo
+        own = (n >= max(self.min_samples, 3)) & (sxx_c > 1e-9 * np.maximum(g["sxx"].to_numpy(), 1.0))
+
+        glob = self.global_model
+        self._fits = pd.DataFrame({
+            "intercept": np.where(own, intercept, glob.intercept),
+            "slope":     np.where(own, slope, glob.slope),
+            "r2":        np.where(own, r2, glob.r2_score),
+            "sxx_c":     np.where(own, sxx_c, glob.sxx_c),
+            "resid_var": np.where(own, resid_var, glob.resid_var),
+            "n":         np.where(own, n, glob.n_samples).astype(int),
+            "Global":    ~own,
+        }, index=g.index)
+        return self._fits
+
+    def model_for(self, key: Any) -> PredictiveModel:
+        """Modelo del grupo `key` (el global si el grupo es escaso o no existe)."""
+        if key not in self._models:
+            row = self.fits.loc[key] if key in self.fits.index else None
+            if row is None or row["Global"]:
+                self._models[key] = self.global_model
+            else:
+                group_sums = self.sums.loc[key]
+                self._models[key] = PredictiveModel()
+                self._models[key]._fit_sums(LogModelSums(
+                    n=int(group_sums["n"]), **{c: float(group_sums[c]) for c in _SUM_COLS[1:]},
+                ))
+        return self._models[key]
+
+    def predict_many(
+        self,
+        data:  pd.DataFrame | str | Path,
+        level: float = 0.95,
+    ) -> pd.DataFrame:
+        """
+        Como `PredictiveModel.predict_many`, pero cada fila usa el modelo de
+        su grupo según las columnas `by`; la columna Modelo_Global indica las
+        filas resueltas con el modelo global.
+        """
+        out = _prediction_frame(data)
+        missing = [c for c in self.by if c not in out.columns]
+        if missing:
+            raise ValueError(f"Faltan columnas de agrupacion: {', '.join(missing)}")
+        routed = out[self.by].merge(
+            self.fits, left_on=self.by, right_index=True, how="left",
+        ).set_index(out.index)
+        glob = self.global_model
+        fill = {
+            "slope": glob.slope, "resid_var": glob.resid_var,
+            "sxx_c": glob.sxx_c, "n": glob.n_samples, "Global": True,
+        }
+        routed = routed.fillna(fill) if len(routed) else routed
+        out = _project_28d(
+            out,
+            routed["slope"].to_numpy(dtype=float),
+            routed["resid_var"].to_numpy(dtype=float),
+            routed["sxx_c"].to_numpy(dtype=float),
+            routed["n"].to_numpy(dtype=float),
+            level,
+        )
+        out["Modelo_Global"] = routed["Global"].astype(bool).to_numpy()
+        return out
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PASO 6 — PERSISTENCIA EN SQLITE
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Identidad de una probeta: archivo + hoja de origen + ID de la probeta
+KEY_COLS = ["Origen_Archivo", "Origen_Hoja", "ID_Probeta"]
+
+# Esquema tipado de 'Roturas' (orden = orden de columnas de la tabla)
+ROTURAS_COLUMNS: dict[str, str] = {
+    "ID_Probeta":      "TEXT NOT NULL",
+    "Estructura":      "TEXT",
+    "Fecha_Vaciado":   "TEXT",
+    "Fecha_Rotura":    "TEXT",
+    "Edad_Dias":       "REAL",
+    "Resistencia_MPa": "REAL",
+    "Origen_Archivo":  "TEXT NOT NULL",
+    "Origen_Hoja":     "TEXT NOT NULL",
+}
+ROTURAS_INDEXES: dict[str, str] = {
+    "idx_roturas_edad":       "Edad_Dias",
+    "idx_roturas_estructura": "Estructura",
+}
+UPSERT_BATCH_SIZE = 10_000
+
+_SQL_DATETIME_FMT = "%Y-%m-%d %H:%M:%S"  # Formato de fechas de DataFrame.to_sql
+
+
+def connect_db(db_path: Path) -> sqlite3.Connection:
+    """Abre la BD en modo WAL (lectores concurrentes durante las escrituras)."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def ensure_roturas_schema(conn: sqlite3.Connection) -> None:
+    """
+    Crea la tabla 'Roturas' tipada con clave primaria KEY_COLS y sus índices.
+
+    Una tabla antigua sin clave primaria (creada con `DataFrame.to_sql`) se
+    migra una sola vez; si tenía claves repetidas se conserva la última fila.
+    """
+    info = conn.execute("PRAGMA table_info(Roturas)").fetchall()
+    legacy = bool(info) and not any(col[5] for col in info)  # col[5] = posición en la PK
+    if legacy:
+        log.info("Migrando tabla 'Roturas' al esquema tipado con clave primaria...")
+        conn.execute("ALTER TABLE Roturas RENAME TO _Roturas_legacy")
+        for name in ROTURAS_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    columns = ", ".join(f"{name} {sql_type}" for name, sql_type in ROTURAS_COLUMNS.items())
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS Roturas ({columns}, PRIMARY KEY ({', '.join(KEY_COLS)}))"
+    )
+    for name, column in ROTURAS_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON Roturas ({column})")
+
+    if legacy:
+        legacy_cols = {col[1] for col in info}
+        select = ", ".join(
+            (f"CAST({c} AS TEXT)" if ROTURAS_COLUMNS[c].startswith("TEXT") else c)
+            if c in legacy_cols else "NULL"
+            for c in ROTURAS_COLUMNS
+        )
+        conn.execute(
+            f"INSERT OR REPLACE INTO Roturas ({', '.join(ROTURAS_COLUMNS)}) "
+            f"SELECT {select} FROM _Roturas_legacy ORDER BY rowid"
+        )
+        conn.execute("DROP TABLE _Roturas_legacy")
+
+
+def _sql_column(col: pd.Series, sql_type: str) -> list:
+    """Valores de una columna convertidos a tipos nativos de SQLite (NULL para nulos)."""
+    if sql_type.startswith("REAL"):
+        values = pd.to_numeric(col, errors="coerce").astype(object)
+    elif pd.api.types.is_datetime64_any_dtype(col):
+        values = col.dt.strftime(_SQL_DATETIME_FMT).astype(object)
+    else:
+        values = col.map(
+            lambda v: v.strftime(_SQL_DATETIME_FMT) if isinstance(v, datetime) else str(v)
+        ).astype(object)
+    return values.where(col.notna(), None).tolist()
+
+
+def upsert_roturas(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """
+    Inserta o actualiza filas de 'Roturas' por clave primaria (KEY_COLS).
+
+    Las filas se envían con `executemany` en lotes de UPSERT_BATCH_SIZE; el
+    llamador controla la transacción (un `with conn:` las agrupa en una sola).
+    Las columnas de `df` fuera de ROTURAS_COLUMNS se ignoran.
+
+    Returns:
+        Número de filas escritas.
+    """
+    names   = list(ROTURAS_COLUMNS)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in names if c not in KEY_COLS)
+    sql = (
+        f"INSERT INTO Roturas ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+        f"ON CONFLICT ({', '.join(KEY_COLS)}) DO UPDATE SET {updates}"
+    )
+    for start in range(0, len(df), UPSERT_BATCH_SIZE):
+        chunk = df.iloc[start:start + UPSERT_BATCH_SIZE]
+        columns = [
+            _sql_column(chunk[c], t) if c in chunk.columns else [None] * len(chunk)
+            for c, t in ROTURAS_COLUMNS.items()
+        ]
+        conn.executemany(sql, zip(*columns))
+    return len(df)
+
+
 def persist_to_database(df: pd.DataFrame, db_path: Path) -> int:
     """
-    Guarda el DataFrame en la tabla 'Roturas' de la base de datos SQLite.
-    Reemplaza los datos anteriores (if_exists='replace').
+    Inserta o actualiza las probetas de `df` en la tabla 'Roturas'.
+
+    Las probetas ya guardadas (misma clave KEY_COLS) se sobrescriben y las
+    de ejecuciones anteriores que no aparecen en `df` se conservan. Es
+    `update_incremental()`: solo se escriben las probetas nuevas o
+    modificadas, en una sola transacción, y huellas, momentos por edad y
+    sumas del modelo (INCREMENTAL_TABLES) se mantienen al día en O(lote).
+
+    Returns:
+        Número de registros escritos (nuevos + modificados).
+    """
+    update = update_incremental(df, db_path)
+    return len(update.new_rows) + len(update.changed_rows)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PASO 6b — MODO INCREMENTAL (solo probetas nuevas o modificadas)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Tablas auxiliares que update_incremental() mantiene junto a 'Roturas'
+INCREMENTAL_TABLES = ("Roturas_Huellas", "Estadisticos_Edad", "Modelo_Sumas")
+
+
+@dataclass
+class IncrementalUpdate:
+    """Resultado de aplicar un lote incremental sobre la base de datos."""
+    new_rows:     pd.DataFrame
+    changed_rows: pd.DataFrame
+    accumulator:  StatsAccumulator
+    sums:         LogModelSums
+
+    @property
+    def has_changes(self) -> bool:
+        return not (self.new_rows.empty and self.changed_rows.empty)
+
+
+def _key_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnas clave normalizadas a texto para comparar con SQLite."""
+    return df[KEY_COLS].astype(str)
+
+
+def _canonical_text(col: pd.Series) -> pd.Series:
+    """
+    Texto estable de una columna, igual antes y después de pasar por SQLite
+    (las fechas se guardan como 'YYYY-MM-DD HH:MM:SS' y los nulos como NULL).
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        text = col.dt.strftime(_SQL_DATETIME_FMT)
+    elif col.dtype == object:
+        text = col.map(lambda v: v.strftime(_SQL_DATETIME_FMT) if isinstance(v, datetime) else str(v))
+    else:
+        text = col.astype(str)
+    return text.where(col.notna(), "")
+
+
+def _row_fingerprints(df: pd.DataFrame) -> pd.Series:
+    """Huella hexadecimal (64 bits) de los valores de cada fila en COL_NAMES."""
+    canonical = pd.DataFrame({c: _canonical_text(df[c]) for c in COL_NAMES})
+    hashes = pd.util.hash_pandas_object(canonical, index=False)
+    return pd.Series([f"{h:016x}" for h in hashes.to_numpy()], index=df.index)
+
+
+def _write_fingerprints(conn: sqlite3.Connection, df: pd.DataFrame) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS Roturas_Huellas ("
+        " Origen_Archivo TEXT, Origen_Hoja TEXT, ID_Probeta TEXT, Huella TEXT,"
+        " PRIMARY KEY (Origen_Archivo, Origen_Hoja, ID_Probeta))"
+    )
+    rows = _key_frame(df).assign(Huella=_row_fingerprints(df))
+    conn.executemany(
+        "INSERT OR REPLACE INTO Roturas_Huellas VALUES (?, ?, ?, ?)",
+        rows.itertuples(index=False, name=None),
+    )
+
+
+def _bootstrap_incremental_state(conn: sqlite3.Connection) -> None:
+    """
+    Construye huellas, momentos y sumas desde la tabla 'Roturas' (que
+    `ensure_roturas_schema()` ya creó, quizá vacía). Solo se ejecuta una vez
+    por base de datos.
+    """
+    history = pd.read_sql("SELECT * FROM Roturas", conn)
+    log.info("BD: inicializando huellas y momentos desde %d registros.", len(history))
+
+    sums = LogModelSums()
+    sums.update(history)
+    _write_fingerprints(conn, history)
+    StatsAccumulator.from_frame(history).to_sql(conn, "Estadisticos_Edad")
+    sums.to_sql(conn)
+
+
+def _stored_model_sums(conn: sqlite3.Connection) -> LogModelSums:
+    """Sumas guardadas en 'Modelo_Sumas' o, si no existen, agregadas desde 'Roturas'."""
+    has_sums = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='Modelo_Sumas'"
+    ).fetchone()[0]
+    if has_sums:
+        return LogModelSums.from_sql(conn)
+    has_roturas = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='Roturas'"
+    ).fetchone()[0]
+    if not has_roturas:
+        return LogModelSums()
+    return LogModelSums.from_group_sums(_group_sums(conn, "Edad_Dias"))
+
+
+def _select_by_keys(conn: sqlite3.Connection, keys: pd.DataFrame) -> pd.DataFrame:
+    """Lee las filas de Roturas con las claves dadas (búsqueda por clave primaria)."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _claves (a TEXT, h TEXT, p TEXT)")
+    conn.execute("DELETE FROM _claves")
+    conn.executemany("INSERT INTO _claves VALUES (?, ?, ?)", keys.itertuples(index=False, name=None))
+    return pd.read_sql(
+        "SELECT * FROM Roturas WHERE (Origen_Archivo, Origen_Hoja, ID_Probeta)"
+        " IN (SELECT a, h, p FROM _claves)",
+        conn,
+    )
+
+
+def update_incremental(df: pd.DataFrame, db_path: Path) -> IncrementalUpdate:
+    """
+    Detecta probetas nuevas o modificadas respecto de la última ejecución y
+    aplica solo ese lote sobre la base de datos. Ambos modos de
+    `run_pipeline()` persisten por aquí.
+
+    Cada probeta se identifica por KEY_COLS y su contenido por una huella de
+    los valores de COL_NAMES. Las filas nuevas y modificadas se escriben en
+    'Roturas' con `upsert_roturas()` en una sola transacción. Los momentos por edad
+    (StatsAccumulator) y las sumas del modelo (LogModelSums) se actualizan
+    restando la versión anterior y sumando la nueva, en O(lote).
+
+    Returns:
+        IncrementalUpdate con el lote detectado y el estado actualizado.
+    """
+    n_dup = int(df.duplicated(KEY_COLS, keep="last").sum())
+    if n_dup:
+        log.warning(
+            "BD: %d probeta(s) con clave repetida (%s). Se conserva la ultima.",
+            n_dup, " + ".join(KEY_COLS),
+        )
+        df = df.drop_duplicates(KEY_COLS, keep="last")
+
+    conn = connect_db(db_path)
+    with closing(conn), conn:
+        ensure_roturas_schema(conn)
+        has_state = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name IN (?, ?, ?)",
+            INCREMENTAL_TABLES,
+        ).fetchone()[0] == len(INCREMENTAL_TABLES)
+        if not has_state:
+            _bootstrap_incremental_state(conn)
+
+        stored = pd.read_sql("SELECT * FROM Roturas_Huellas", conn)
+        keys   = _key_frame(df)
+        merged = keys.merge(stored, on=KEY_COLS, how="left")
+        merged.index = df.index
+        fingerprints = _row_fingerprints(df)
+
+        new_rows     = df[merged["Huella"].isna()]
+        changed_rows = df[merged["Huella"].notna() & (merged["Huella"] != fingerprints)]
+
+        accumulator = StatsAccumulator.from_sql(conn, "Estadisticos_Edad")
+        sums        = LogModelSums.from_sql(conn)
+        update = IncrementalUpdate(new_rows, changed_rows, accumulator, sums)
+        if not update.has_changes:
+            log.info("BD: sin probetas nuevas ni modificadas.")
+            return update
+
+        batch = pd.concat([new_rows, changed_rows])
+        if not changed_rows.empty:
+            previous = _select_by_keys(conn, _key_frame(changed_rows))
+            accumulator.remove(StatsAccumulator.from_frame(previous))
+            sums.update(previous, sign=-1)
+        upsert_roturas(conn, batch)
+
+        accumulator.merge(StatsAccumulator.from_frame(batch))
+        if not changed_rows.empty:
+            # min/max no son reversibles: se releen solo los grupos afectados
+            ages = previous["Edad_Dias"].unique().tolist()
+            extremes = pd.read_sql(
+                "SELECT Edad_Dias, MIN(Resistencia_MPa) AS min, MAX(Resistencia_MPa) AS max "
+                f"FROM Roturas WHERE Edad_Dias IN ({','.join('?' * len(ages))}) GROUP BY Edad_Dias",
+                conn, params=ages,
+            ).set_index("Edad_Dias")
+            accumulator.set_extremes(extremes)
+        sums.update(batch)
+
+        _write_fingerprints(conn, batch)
+        accumulator.to_sql(conn, "Estadisticos_Edad")
+        sums.to_sql(conn)
+
+    log.info(
+        "BD actualizada: %d probeta(s) nuevas, %d modificadas → %s.",
+        len(new_rows), len(changed_rows), db_path.name,
+    )
+    return update
+
+
+def load_history(db_path: Path) -> pd.DataFrame:
+    """Lee el historial completo de la tabla 'Roturas'."""
+    with closing(sqlite3.connect(db_path)) as conn:
+        return pd.read_sql("SELECT * FROM Roturas", conn)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PASO 6c — CONSULTAS AGREGADAS SOBRE 'Roturas'
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class RoturasFilter:
+    """
+    Filtro de consulta sobre 'Roturas'. Los campos en None no filtran.
+
+    Las fechas se comparan sobre `date(Fecha_Rotura)`, así que solo cuentan
+    las fechas guardadas en formato ISO ('YYYY-MM-DD[ HH:MM:SS]').
+    """
+    desde:       Optional[str] = None   # Fecha_Rotura >= desde (inclusive)
+    hasta:       Optional[str] = None   # Fecha_Rotura <= hasta (inclusive)
+    estructuras: Optional[list[str]] = None
+    archivos:    Optional[list[str]] = None
+    edades:      Optional[list[float]] = None
+
+    def where(self) -> tuple[str, list]:
+        """Cláusula WHERE (siempre excluye resistencias nulas) y sus parámetros."""
+        clauses: list[str] = ["Resistencia_MPa IS NOT NULL"]
+        params:  list      = []
+        if self.desde is not None:
+            clauses.append("date(Fecha_Rotura) >= date(?)")
+            params.append(str(self.desde))
+        if self.hasta is not None:
+            clauses.append("date(Fecha_Rotura) <= date(?)")
+            params.append(str(self.hasta))
+        for column, values in (
+            ("Estructura",     self.estructuras),
+            ("Origen_Archivo", self.archivos),
+            ("Edad_Dias",      self.edades),
+        ):
+            if values is not None:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        return "WHERE " + " AND ".join(clauses), params
+
+
+def _connect_readonly(db_path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def query_group_sums(
+    db_path: Path,
+    by:      str = "Edad_Dias",
+    filt:    Optional[RoturasFilter] = None,
+) -> pd.DataFrame:
+    """
+    Sumas de Resistencia_MPa por grupo calculadas en SQLite.
+
+    Returns:
+        DataFrame indexado por `by` con columnas n, sum, sumsq, min, max.
+    """
+    with closing(_connect_readonly(db_path)) as conn:
+        return _group_sums(conn, by, filt)
+
+
+def _group_sums(
+    conn: sqlite3.Connection,
+    by:   str | list[str],
+    filt: Optional[RoturasFilter] = None,
+) -> pd.DataFrame:
+    cols = [by] if isinstance(by, str) else list(by)
+    unknown = [c for c in cols if c not in ROTURAS_COLUMNS]
+    if unknown:
+        raise ValueError(f"Columna de agrupacion desconocida: {unknown[0]!r}")
+    group = ", ".join(cols)
+    where, params = (filt or RoturasFilter()).where()
+    sql = (
+        f"SELECT {group}, COUNT(Resistencia_MPa) AS n, SUM(Resistencia_MPa) AS sum, "
+        "SUM(Resistencia_MPa * Resistencia_MPa) AS sumsq, "
+        "MIN(Resistencia_MPa) AS min, MAX(Resistencia_MPa) AS max "
+        f"FROM Roturas {where} GROUP BY {group} ORDER BY {group}"
+    )
+    return pd.read_sql(sql, conn, params=params).set_index(by).astype(float)
+
+
+def query_moments(
+    db_path: Path,
+    by:      str = "Edad_Dias",
+    filt:    Optional[RoturasFilter] = None,
+) -> StatsAccumulator:
+    """
+    StatsAccumulator de los grupos filtrados, sin leer filas a pandas.
+
+    M2 se obtiene como sumsq - sum²/n; con valores de MPa (~1e2) la
+    cancelación numérica es despreciable frente a la precisión de ensayo.
+    """
+    sums = query_group_sums(db_path, by, filt)
+    n = sums["n"].to_numpy()
+    mean = sums["sum"].to_numpy() / n
+    m2 = np.clip(sums["sumsq"].to_numpy() - sums["sum"].to_numpy() * mean, 0.0, None)
+    groups = pd.DataFrame(
+        {"n": n, "mean": mean, "m2": m2, "min": sums["min"], "max": sums["max"]},
+        index=sums.index,
+    )
+    return StatsAccumulator(by=by, groups=groups)
+
+
+def query_descriptive_stats(
+    db_path: Path,
+    by:      str = "Edad_Dias",
+    filt:    Optional[RoturasFilter] = None,
+) -> pd.DataFrame:
+    """Tabla N/Media/Desv/Min/Max/CV_% (como `compute_descriptive_stats()`) desde la BD."""
+    return query_moments(db_path, by, filt).to_frame()
+
+
+def query_inference(db_path: Path, filt: Optional[RoturasFilter] = None) -> InferenceResults:
+    """T-test a 28 días y f'ck (como `compute_inference()`) desde la BD."""
+    acc = query_moments(db_path, "Edad_Dias", filt)
+    return inference_from_summary(acc.to_frame(), n_total=acc.n_total)
+
+
+def query_anova(
+    db_path: Path,
+    factor:  str,
+    filt:    Optional[RoturasFilter] = None,
+) -> pd.DataFrame:
+    """
+    Tabla ANOVA de un factor desde las sumas por grupo de la BD.
+
+    Devuelve la misma tabla que `perform_anova(...).anova_table`; los
+    supuestos (Shapiro, Levene) y Tukey necesitan las filas y no se calculan.
+    """
+    sums = query_group_sums(db_path, factor, filt)
+    sums = sums[sums.index.notna()]
+    n_i, s_i = sums["n"].to_numpy(), sums["sum"].to_numpy()
+    if len(sums) < 2 or n_i.sum() <= len(sums):
+        raise ValueError(f"ANOVA no calculable para {factor}: se necesitan 2+ grupos y residuos.")
+    between_raw = float(s_i @ (s_i / n_i))  # Σ sum_i² / n_i
+    ss_between  = between_raw - s_i.sum() ** 2 / n_i.sum()
+    ss_within   = float(sums["sumsq"].sum()) - between_raw
+    return anova_table_from_ss(ss_between, max(ss_within, 0.0), len(sums), int(n_i.sum()), factor)
+
+
+def query_model(
+    db_path: Path,
+    filt:    Optional[RoturasFilter] = None,
+) -> PredictiveModel:
+    """Modelo logarítmico ajustado con las sumas por edad de la BD (sin leer filas)."""
+    pred_model = PredictiveModel()
+    pred_model.train_from_sums(LogModelSums.from_group_sums(query_group_sums(db_path, "Edad_Dias", filt)))
+    return pred_model
+
+
+def load_model(db_path: Path) -> PredictiveModel:
+    """
+    Modelo logarítmico de todo el historial desde las sumas guardadas en
+    'Modelo_Sumas' (O(1)); si la BD aún no las tiene se agregan por edad.
+    """
+    pred_model = PredictiveModel()
+    with closing(_connect_readonly(db_path)) as conn:
+        pred_model.train_from_sums(_stored_model_sums(conn))
+    return pred_model
+
+
+def predict_file(
+    pred_model: PredictiveModel | ModelBank,
+    src:        str | Path,
+    dest:       str | Path,
+    chunksize:  int = 50_000,
+    level:      float = 0.95,
+) -> int:
+    """
+    Proyecta a 28 días un CSV de roturas tempranas bloque a bloque.
+
+    Lee `src` en bloques de `chunksize` filas, aplica `predict_many` (de un
+    modelo único o de un ModelBank por grupo) y añade cada bloque a `dest`,
+    de modo que la memoria no depende del tamaño del archivo. El CSV se
+    escribe en un temporal y se renombra al terminar.
+
+    Returns:
+        Número de filas proyectadas.
+    """
+    dest = Path(dest)
+    tmp  = dest.with_name(dest.name + ".tmp")
+    n_rows = 0
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8") as fh:
+            for chunk in pd.read_csv(src, chunksize=chunksize):
+                pred_model.predict_many(chunk, level=level).to_csv(fh, header=n_rows == 0, index=False)
+                n_rows += len(chunk)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+    log.info("Proyeccion por lotes: %d fila(s) -> %s", n_rows, dest)
+    return n_rows
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PASO 6d — CONTROL ESTADÍSTICO DE PROCESOS (SPC)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Una carta por (edad, estructura); el subgrupo racional es el vaciado del día
+SPC_GROUP_COLS  = ["Edad_Dias", "Estructura"]
+SPC_BASELINE    = 20     # subgrupos de fase I para fijar línea central y sigma
+SPC_EWMA_LAMBDA = 0.2
+SPC_EWMA_L      = 3.0
+SPC_CUSUM_K     = 0.5    # holgura (en sigmas de la media del subgrupo)
+SPC_CUSUM_H     = 5.0    # intervalo de decisión
+SPC_MAX_CHARTS  = 12     # cartas que se dibujan en el PDF
+SPC_MAX_POINTS  = 60     # últimos subgrupos por carta
+SPC_SKIPPED_EXAMPLES = 10  # subgrupos omitidos que se nombran en el aviso
+
+# Constantes d2 y d3 del rango (n = 2..10); subgrupos mayores usan n = 10
+_SPC_D2 = {2: 1.128, 3: 1.693, 4: 2.059, 5: 2.326, 6: 2.534, 7: 2.704, 8: 2.847, 9: 2.970, 10: 3.078}
+_SPC_D3 = {2: 0.853, 3: 0.888, 4: 0.880, 5: 0.864, 6: 0.848, 7: 0.833, 8: 0.820, 9: 0.808, 10: 0.797}
+
+
+@dataclass
+class SPCChart:
+    """
+    Estado de las cartas X̄/R, EWMA y CUSUM de un grupo.
+
+    Los primeros SPC_BASELINE subgrupos (fase I) estiman la línea central y
+    sigma (R̄/d2, o rango móvil si los vaciados tienen una sola probeta);
+    después los límites quedan fijos y cada subgrupo nuevo se evalúa en O(1).
+    """
+    edad:        float
+    estructura:  str
+    k:           int   = 0              # subgrupos registrados
+    base_sum:    float = 0.0            # Σ n·x̄ de fase I
+    base_n:      int   = 0
+    sum_r_d2:    float = 0.0            # Σ R/d2 de fase I
+    count_r:     int   = 0
+    sum_mr:      float = 0.0            # Σ |x̄ - x̄ anterior| de fase I
+    count_mr:    int   = 0
+    mu0:         float = float("nan")
+    sigma:       float = float("nan")
+    last_xbar:   float = float("nan")
+    last_fecha:  str   = ""
+    t:           int   = 0              # subgrupos de fase II
+    ewma:        float = float("nan")
+    cusum_pos:   float = 0.0
+    cusum_neg:   float = 0.0
+
+    @property
+    def frozen(self) -> bool:
+        return not np.isnan(self.sigma)
+
+    def add(self, fecha: str, n: int, xbar: float, rango: float) -> dict[str, Any]:
+        """Registra un subgrupo y devuelve su punto en las cartas."""
+        self.k += 1
+        point: dict[str, Any] = {
+            "Edad_Dias": self.edad, "Estructura": self.estructura, "Fecha_Vaciado": fecha,
+            "Subgrupo": self.k, "n": n, "Media": xbar, "Rango": rango if n > 1 else np.nan,
+            "Fase": "II" if self.frozen else "I",
+        }
+        if not self.frozen:
+            self._add_baseline(n, xbar, rango)
+        else:
+            point.update(self._evaluate(n, xbar))
+        self.last_xbar, self.last_fecha = xbar, fecha
+        return point
+
+    def _add_baseline(self, n: int, xbar: float, rango: float) -> None:
+        self.base_sum += n * xbar
+        self.base_n   += n
+        if n > 1:
+            self.sum_r_d2 += rango / _SPC_D2[min(n, 10)]
+            self.count_r  += 1
+        if not np.isnan(self.last_xbar):
+            self.sum_mr   += abs(xbar - self.last_xbar)
+            self.count_mr += 1
+        if self.k >= SPC_BASELINE:
+            self.mu0 = self.base_sum / self.base_n
+            if self.count_r:
+                self.sigma = self.sum_r_d2 / self.count_r
+            elif self.count_mr:
+                self.sigma = self.sum_mr / self.count_mr / _SPC_D2[2]
+            self.ewma = self.mu0
+
+    def _evaluate(self, n: int, xbar: float) -> dict[str, Any]:
+        se = self.sigma / np.sqrt(n)
+        self.t += 1
+        lam = SPC_EWMA_LAMBDA
+        self.ewma = lam * xbar + (1 - lam) * self.ewma
+        ewma_w = SPC_EWMA_L * se * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * self.t)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (xbar - self.mu0) / se
+        self.cusum_pos = max(0.0, self.cusum_pos + z - SPC_CUSUM_K)
+        self.cusum_neg = max(0.0, self.cusum_neg - z - SPC_CUSUM_K)
+
+        point: dict[str, Any] = {
+            "LC_X": self.mu0, "LCI_X": self.mu0 - 3 * se, "LCS_X": self.mu0 + 3 * se,
+            "EWMA": self.ewma, "LCI_EWMA": self.mu0 - ewma_w, "LCS_EWMA": self.mu0 + ewma_w,
+            "CUSUM_Pos": self.cusum_pos, "CUSUM_Neg": self.cusum_neg,
+        }
+        if n > 1:
+            d2, d3 = _SPC_D2[min(n, 10)], _SPC_D3[min(n, 10)]
+            point.update({
+                "LC_R": d2 * self.sigma,
+                "LCI_R": max(0.0, (d2 - 3 * d3) * self.sigma),
+                "LCS_R": (d2 + 3 * d3) * self.sigma,
+            })
+        return point
+
+
+# Columnas de la tabla SPC_Puntos (una fila por subgrupo)
+SPC_POINT_COLUMNS = [
+    "Edad_Dias", "Estructura", "Fecha_Vaciado", "Subgrupo", "n", "Media", "Rango", "Fase",
+    "LC_X", "LCI_X", "LCS_X", "LC_R", "LCI_R", "LCS_R",
+    "EWMA", "LCI_EWMA", "LCS_EWMA", "CUSUM_Pos", "CUSUM_Neg",
+    "Fuera_X", "Fuera_R", "Fuera_EWMA", "Fuera_CUSUM", "Fuera_Control",
+]
+
+
+def _spc_flags(points: pd.DataFrame) -> pd.DataFrame:
+    """Marca los puntos fuera de control (los de fase I nunca se marcan)."""
+    points["Fuera_X"]     = (points["Media"] < points["LCI_X"]) | (points["Media"] > points["LCS_X"])
+    points["Fuera_R"]     = (points["Rango"] < points["LCI_R"]) | (points["Rango"] > points["LCS_R"])
+    points["Fuera_EWMA"]  = (points["EWMA"] < points["LCI_EWMA"]) | (points["EWMA"] > points["LCS_EWMA"])
+    points["Fuera_CUSUM"] = (points["CUSUM_Pos"] > SPC_CUSUM_H) | (points["CUSUM_Neg"] > SPC_CUSUM_H)
+    points["Fuera_Control"] = points[["Fuera_X", "Fuera_R", "Fuera_EWMA", "Fuera_CUSUM"]].any(axis=1)
+    return points
+
+
+@dataclass
+class SPCEngine:
+    """Cartas de control de todos los grupos; se actualiza en O(filas nuevas)."""
+    charts: dict[tuple[float, str], SPCChart] = field(default_factory=dict)
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Añade las roturas de `df` agrupadas en subgrupos (edad, estructura,
+        día de vaciado), en orden de Fecha_Vaciado.
+
+        Los subgrupos con fecha igual o anterior a la última registrada en su
+        carta (roturas tardías) se omiten con un aviso que los nombra: las
+        cartas nunca se recalculan sobre el historial.
+
+        Returns:
+            Los puntos nuevos, con las columnas SPC_POINT_COLUMNS.
+        """
+        fecha = pd.to_datetime(df["Fecha_Vaciado"], errors="coerce").dt.normalize()
+        valid = fecha.notna() & df["Resistencia_MPa"].notna() & df[SPC_GROUP_COLS].notna().all(axis=1)
+        rows  = pd.DataFrame({
+            "Edad_Dias":       df.loc[valid, "Edad_Dias"].astype(float),
+            "Estructura":      df.loc[valid, "Estructura"].astype(str),
+            "Fecha":           fecha[valid].dt.strftime(_SQL_DATETIME_FMT),
+            "Resistencia_MPa": df.loc[valid, "Resistencia_MPa"].astype(float),
+        })
+        subgroups = rows.groupby([*SPC_GROUP_COLS, "Fecha"], sort=True)["Resistencia_MPa"].agg(
+            ["size", "mean", "min", "max"]
+        )
+
+        points, skipped = [], []
+        for (edad, estructura, fecha_sg), sg in zip(subgroups.index, subgroups.itertuples(index=False)):
+            chart = self.charts.get((edad, estructura))
+            if chart is None:
+                chart = self.charts[(edad, estructura)] = SPCChart(edad, estructura)
+            if fecha_sg <= chart.last_fecha:
+                skipped.append(f"{edad:.0f}d/{estructura}/{fecha_sg[:10]} (ultimo {chart.last_fecha[:10]})")
+                continue
+            points.append(chart.add(fecha_sg, int(sg.size), float(sg.mean), float(sg.max - sg.min)))
+        if skipped:
+            log.warning(
+                "SPC: %d subgrupo(s) con vaciado igual o anterior al ultimo graficado se omiten: %s%s",
+                len(skipped), ", ".join(skipped[:SPC_SKIPPED_EXAMPLES]),
+                " ..." if len(skipped) > SPC_SKIPPED_EXAMPLES else "",
+            )
+        return _spc_flags(pd.DataFrame(points, columns=SPC_POINT_COLUMNS))
+
+    def to_sql(self, conn: sqlite3.Connection, table: str = "SPC_Estado") -> None:
+        state = pd.DataFrame([asdict(c) for c in self.charts.values()],
+                             columns=[f.name for f in fields(SPCChart)])
+        state.to_sql(table, conn, if_exists="replace", index=False)
+
+    @classmethod
+    def from_sql(cls, conn: sqlite3.Connection, table: str = "SPC_Estado") -> "SPCEngine":
+        exists = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name=?", (table,),
+        ).fetchone()[0]
+        if not exists:
+            return cls()
+        casts: dict[str, Callable[[Any], Any]] = {
+            "int": int, "str": str,
+            "float": lambda v: float("nan") if v is None else float(v),  # NULL ← NaN
+        }
+        charts = {}
+        for rec in pd.read_sql(f"SELECT * FROM {table}", conn).to_dict("records"):
+            chart = SPCChart(**{f.name: casts[f.type](rec[f.name]) for f in fields(SPCChart)})
+            charts[(chart.edad, chart.estructura)] = chart
+        return cls(charts)
+
+
+def spc_pending_rows(db_path: Path, df: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Filas que las cartas aún no han visto: las probetas nuevas del lote o,
+    si la BD todavía no tiene estado SPC, todas las filas analizadas (`df`).
+    """
+    with closing(connect_db(db_path)) as conn:
+        return new_rows if SPCEngine.from_sql(conn).charts else df
+
+
+def update_spc(db_path: Path, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Incorpora las roturas de `df` a las cartas guardadas en la BD (tablas
+    SPC_Estado y SPC_Puntos) en una sola transacción.
 
     Returns:
-        Número de registros insertados.
+        Los puntos nuevos.
+    """
+    conn = connect_db(db_path)
+    with closing(conn), conn:
+        engine = SPCEngine.from_sql(conn)
+        points = engine.update(df)
+        if not points.empty:
+            points.to_sql("SPC_Puntos", conn, if_exists="append", index=False)
+        engine.to_sql(conn)
+    n_out = int(points["Fuera_Control"].sum())
+    log.info("SPC: %d subgrupo(s) nuevos, %d fuera de control.", len(points), n_out)
+    return points
+
+
+def load_spc_points(db_path: Path, last: Optional[int] = None) -> pd.DataFrame:
+    """Puntos de las cartas (los `last` subgrupos más recientes de cada grupo si se indica)."""
+    with closing(_connect_readonly(db_path)) as conn:
+        exists = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='SPC_Puntos'"
+        ).fetchone()[0]
+        if not exists:
+            return pd.DataFrame(columns=SPC_POINT_COLUMNS)
+        if last is None:
+            sql, params = "SELECT * FROM SPC_Puntos", ()
+        else:
+            sql = (
+                "SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY Edad_Dias, Estructura "
+                "ORDER BY Subgrupo DESC) AS _r FROM SPC_Puntos) WHERE _r <= ?"
+            )
+            params = (last,)
+        points = pd.read_sql(sql, conn, params=params)
+    points = points.drop(columns="_r", errors="ignore").sort_values([*SPC_GROUP_COLS, "Subgrupo"])
+    flags = [c for c in SPC_POINT_COLUMNS if c.startswith("Fuera_")]
+    points[flags] = points[flags].astype(bool)
+    return points.reset_index(drop=True)
+
+
+@dataclass
+class SPCSummary:
+    """Resumen de las cartas para los reportes."""
+    table:       pd.DataFrame                        # una fila por grupo
+    chart_paths: dict[str, Path] = field(default_factory=dict)
+    new_points:  int = 0
+
+
+def query_spc_summary(db_path: Path) -> pd.DataFrame:
+    """Subgrupos y puntos fuera de control por carta, agregados en SQLite."""
+    with closing(_connect_readonly(db_path)) as conn:
+        exists = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='SPC_Puntos'"
+        ).fetchone()[0]
+        if not exists:
+            return pd.DataFrame(columns=[*SPC_GROUP_COLS, "Subgrupos", "Fuera_X", "Fuera_R",
+                                         "Fuera_EWMA", "Fuera_CUSUM", "Ultimo_Vaciado"])
+        return pd.read_sql(
+            "SELECT Edad_Dias, Estructura, MAX(Subgrupo) AS Subgrupos, "
+            "SUM(Fuera_X) AS Fuera_X, SUM(Fuera_R) AS Fuera_R, SUM(Fuera_EWMA) AS Fuera_EWMA, "
+            "SUM(Fuera_CUSUM) AS Fuera_CUSUM, MAX(Fecha_Vaciado) AS Ultimo_Vaciado "
+            "FROM SPC_Puntos GROUP BY Edad_Dias, Estructura ORDER BY Edad_Dias, Estructura",
+            conn,
+        )
+
+
+def _slug(text: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in str(text)).strip("_") or "grupo"
+
+
+def _render_spc_chart(points: pd.DataFrame, path: Path, title: str) -> None:
+    """Cuatro paneles (X̄, R, EWMA, CUSUM) de un grupo con sus límites por punto."""
+    x = points["Subgrupo"].to_numpy()
+    fig, axes = plt.subplots(4, 1, figsize=(10, 9), sharex=True)
+    panels = [
+        ("Media",     "LCI_X",    "LCS_X",    "LC_X", "Fuera_X",     "X barra (MPa)"),
+        ("Rango",     "LCI_R",    "LCS_R",    "LC_R", "Fuera_R",     "Rango (MPa)"),
+        ("EWMA",      "LCI_EWMA", "LCS_EWMA", "LC_X", "Fuera_EWMA",  "EWMA (MPa)"),
+    ]
+    for ax, (col, lo, hi, center, flag, label) in zip(axes, panels):
+        ax.plot(x, points[col], "o-", color="steelblue", markersize=3)
+        ax.step(x, points[lo], "r--", where="mid", linewidth=1)
+        ax.step(x, points[hi], "r--", where="mid", linewidth=1)
+        ax.step(x, points[center], "g-", where="mid", linewidth=1)
+        out = points[flag]
+        ax.plot(x[out], points.loc[out, col], "rs", markersize=6)
+        ax.set_ylabel(label, fontsize=8); ax.grid(True, alpha=0.3)
+    ax = axes[3]
+    ax.plot(x, points["CUSUM_Pos"], "o-", markersize=3, label="C+")
+    ax.plot(x, points["CUSUM_Neg"], "o-", markersize=3, label="C-")
+    ax.axhline(SPC_CUSUM_H, color="red", linestyle="--", linewidth=1)
+    ax.set_ylabel("CUSUM (sigmas)", fontsize=8); ax.set_xlabel("Subgrupo (vaciado)")
+    ax.legend(fontsize=7); ax.grid(True, alpha=0.3)
+    axes[0].set_title(title, fontsize=12, fontweight="bold")
+    fig.savefig(path, dpi=110, bbox_inches="tight"); plt.close(fig)
+
+
+def render_spc_charts(
+    points:     pd.DataFrame,
+    output_dir: Path,
+    max_charts: int = SPC_MAX_CHARTS,
+) -> dict[str, Path]:
+    """
+    Dibuja las cartas de los grupos con fase II, priorizando los que tienen
+    más puntos fuera de control. Returns: {nombre de grupo: ruta PNG}.
     """
-    with sqlite3.connect(db_path) as conn:
-        df.to_sql("Roturas", conn, if_exists="replace", index=False)
-        count = pd.read_sql("SELECT COUNT(*) AS total FROM Roturas", conn).iloc[0, 0]
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    monitored = points[points["Fase"] == "II"]
+    if monitored.empty:
+        return {}
+    ranking = (
+        monitored.groupby(SPC_GROUP_COLS)["Fuera_Control"].agg(["sum", "size"])
+        .sort_values(["sum", "size"], ascending=False).head(max_charts)
+    )
+    paths: dict[str, Path] = {}
+    for edad, estructura in ranking.index:
+        name  = f"{edad:.0f}d - {estructura}"
+        group = points[(points["Edad_Dias"] == edad) & (points["Estructura"] == estructura)]
+        path  = output_dir / f"spc_{edad:.0f}d_{_slug(estructura)}.png"
+        _render_spc_chart(group, path, f"Cartas de control - {name}")
+        paths[name] = path
+    return paths
 
-    log.info("BD actualizada: %s → %d registros en tabla 'Roturas'.", db_path.name, count)
-    return int(count)
+
+def run_spc(
+    df:        pd.DataFrame,
+    db_path:   Path,
+    chart_dir: Optional[Path] = None,
+) -> SPCSummary:
+    """
+    Actualiza las cartas con las filas nuevas de `df` y, si se indica
+    `chart_dir`, dibuja los últimos SPC_MAX_POINTS subgrupos de cada carta.
+    """
+    new_points = update_spc(db_path, df)
+    points = load_spc_points(db_path, last=SPC_MAX_POINTS)
+    paths  = render_spc_charts(points, chart_dir) if chart_dir is not None else {}
+    return SPCSummary(table=query_spc_summary(db_path), chart_paths=paths, new_points=len(new_points))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PASO 7 — VISUALIZACIONES
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Archivo PNG de cada gráfico (clave = nombre en el diccionario de rutas)
+PLOT_FILES: dict[str, str] = {
+    "distribucion":     "plot_distribucion.png",
+    "kde":              "plot_kde.png",
+    "crecimiento":      "plot_crecimiento.png",
+    "anova_edad_dias":  "boxplot_Edad_Dias.png",
+    "anova_estructura": "boxplot_Estructura.png",
+}
+
+
+@dataclass
+class PlotJob:
+    """
+    Un gráfico independiente: `render(df, path, **params)` dibuja y guarda el
+    PNG. `columns` son las únicas columnas de df que el gráfico lee.
+    """
+    name:    str
+    render:  Callable[..., None]
+    columns: tuple[str, ...]
+    params:  dict[str, Any] = field(default_factory=dict)
+
+
+PLOT_CACHE_MAX_BYTES = 128 * 1024 * 1024  # 128 MB de PNGs
+PLOT_CACHE_MAX_AGE_S = 30 * 24 * 3600     # 30 días sin uso
+_PLOT_CACHE_VERSION  = 1                  # Incrementar si cambia algún _render_*()
+
+
+@dataclass
+class PlotCache:
+    """
+    Caché en disco de los PNG generados por `generate_plots()`.
+
+    Cada gráfico se indexa por el hash de las columnas que dibuja (valores y
+    orden de filas), sus parámetros de estilo (PlotJob.params, TARGETS) y las
+    versiones de matplotlib/seaborn; si nada de eso cambió, el PNG se copia
+    desde la caché en lugar de volver a renderizarlo. Las entradas se
+    eliminan por antigüedad y por LRU al superar `max_bytes`.
+    """
+    root:      Path
+    max_bytes: int   = PLOT_CACHE_MAX_BYTES
+    max_age_s: float = PLOT_CACHE_MAX_AGE_S
+    enabled:   bool  = True
+    hits:      int   = 0
+    misses:    int   = 0
+
+    def __post_init__(self) -> None:
+        self.root = Path(self.root)
+
+    def key_for(self, job: PlotJob, df: pd.DataFrame) -> str:
+        h = hashlib.sha256()
+        h.update(json.dumps([
+            _PLOT_CACHE_VERSION, job.name, job.render.__name__, job.columns,
+            job.params, sorted(TARGETS.items()),
+            matplotlib.__version__, sns.__version__,
+        ], default=str).encode())
+        h.update(pd.util.hash_pandas_object(df[list(job.columns)], index=False).to_numpy().tobytes())
+        return h.hexdigest()
+
+    def get(self, key: str, dest: Path) -> bool:
+        """Copia el PNG `key` a `dest` si está en caché."""
+        if not self.enabled:
+            return False
+        entry = self.root / f"{key}.png"
+        try:
+            shutil.copyfile(entry, dest)
+        except OSError:
+            self.misses += 1
+            return False
+        os.utime(entry)  # Marca de uso para la expulsión LRU
+        self.hits += 1
+        return True
+
+    def put(self, key: str, src: Path) -> bool:
+        """Guarda una copia de `src` (escritura atómica vía archivo temporal)."""
+        if not self.enabled:
+            return False
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".png", dir=self.root)
+        os.close(fd)
+        try:
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, self.root / f"{key}.png")
+        except OSError as exc:
+            log.warning("No se pudo guardar %s en cache de graficos: %s", src.name, exc)
+            Path(tmp).unlink(missing_ok=True)
+            return False
+        return True
+
+    def evict(self) -> int:
+        """Aplica los límites de antigüedad y tamaño. Devuelve entradas eliminadas."""
+        return _evict_cache_dir(self.root, self.max_bytes, self.max_age_s)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas de la caché."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _anovas(*results: Optional[AnovaResults]) -> list[AnovaResults]:
+    """ANOVA calculados (los reportes por estructura no tienen factor Estructura)."""
+    return [result for result in results if result is not None]
+
+
+# DataFrame de solo lectura compartido por los procesos de renderizado
+_PLOT_DATA: Optional[pd.DataFrame] = None
+
+
+def _init_plot_worker(df: pd.DataFrame) -> None:
+    """Inicializador del pool: recibe los datos una vez por proceso, no por gráfico."""
+    global _PLOT_DATA
+    _PLOT_DATA = df
+    sns.set_theme(style="whitegrid")
+
+
+def _render_distribucion(df: pd.DataFrame, path: Path) -> None:
+    ages_sorted = sorted(df["Edad_Dias"].unique())
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.boxplot(
+        x="Edad_Dias", y="Resistencia_MPa", hue="Edad_Dias",
+        data=df, palette="Blues", legend=False, ax=ax, order=ages_sorted,
+    )
+    sns.stripplot(
+        x="Edad_Dias", y="Resistencia_MPa", data=df,
+        color="#333333", alpha=0.25, jitter=True, ax=ax, order=ages_sorted,
+    )
+    ax.axhline(
+        TARGETS[28.0], color="red", linestyle="--", linewidth=1.5,
+        label=f"Meta 28d ({TARGETS[28.0]} MPa)",
+    )
+    for age, target in TARGETS.items():
+        if age != 28.0:
+            ax.axhline(target, color="orange", linestyle=":", linewidth=1, alpha=0.7)
+    ax.set_title("Distribucion de Resistencia por Edad - SikaGrout 9400 BR", fontsize=13, fontweight="bold")
+    ax.set_xlabel("Edad (dias)"); ax.set_ylabel("Resistencia (MPa)")
+    ax.legend()
+    fig.savefig(path, dpi=150, bbox_inches="tight"); plt.close(fig)
+
+
+def _render_kde(df: pd.DataFrame, path: Path) -> None:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for age, subset in df.groupby("Edad_Dias", sort=True)["Resistencia_MPa"]:
+        if len(subset) > 1:
+            sns.kdeplot(subset, label=f"{int(age)} dias", fill=True, alpha=0.4, ax=ax)
+    ax.set_title("Densidad de Probabilidad de Resistencia por Edad", fontsize=13, fontweight="bold")
+    ax.set_xlabel("Resistencia (MPa)"); ax.legend()
+    fig.savefig(path, dpi=150, bbox_inches="tight"); plt.close(fig)
+
+
+def _render_crecimiento(
+    df: pd.DataFrame, path: Path, intercept: float, slope: float, equation: str,
+) -> None:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(df["Edad_Dias"], df["Resistencia_MPa"], alpha=0.3, label="Mediciones")
+    x_fine = np.linspace(0.5, 35, 200)
+    y_fit  = intercept + slope * np.log(x_fine)
+    ax.plot(x_fine, y_fit, "r-", linewidth=2, label=f"Modelo: {equation}")
+    ax.axhline(TARGETS[28.0], color="green", linestyle="--", label=f"Meta 28d ({TARGETS[28.0]} MPa)")
+    ax.set_title("Cinetica de Resistencia: Datos vs Modelo Logaritmico", fontsize=13, fontweight="bold")
+    ax.set_xlabel("Edad (dias)"); ax.set_ylabel("Resistencia (MPa)")
+    ax.legend(); ax.grid(True, alpha=0.3)
+    fig.savefig(path, dpi=150, bbox_inches="tight"); plt.close(fig)
+
+
+def _render_anova_boxplot(df: pd.DataFrame, path: Path, factor: str, is_significant: bool) -> None:
+    # Solo la columna del factor pasa a texto; el DataFrame no se copia
+    levels = df[factor].astype(str).rename(factor)
+    order  = sorted(levels.unique())
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.boxplot(
+        x=levels, y=df["Resistencia_MPa"], hue=levels,
+        palette="Set2", legend=False, ax=ax, order=order,
+    )
+    sns.stripplot(
+        x=levels, y=df["Resistencia_MPa"],
+        color="black", alpha=0.3, jitter=True, ax=ax, order=order,
+    )
+    sig_label = "SIGNIFICATIVO" if is_significant else "No significativo"
+    ax.set_title(
+        f"ANOVA - Resistencia por {factor} [{sig_label}]",
+        fontsize=12, fontweight="bold",
+    )
+    ax.set_xlabel(factor); ax.set_ylabel("Resistencia (MPa)")
+    ax.tick_params(axis="x", rotation=90)
+    ax.grid(True, linestyle="--", alpha=0.4)
+    fig.savefig(path, dpi=150, bbox_inches="tight"); plt.close(fig)
+
+
+def _run_plot_job(
+    job: PlotJob, path: Path, df: Optional[pd.DataFrame] = None,
+) -> tuple[str, Optional[Path], list[str]]:
+    """
+    Ejecuta un PlotJob capturando sus warnings.
+
+    Los UserWarning de matplotlib abortan el gráfico (como en la versión
+    secuencial); el resto solo se recogen. Returns (nombre, ruta o None si
+    falló, mensajes de warnings capturados).
+    """
+    data = _PLOT_DATA if df is None else df
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        warnings.filterwarnings("error", category=UserWarning, module="matplotlib")
+        try:
+            job.render(data, path, **job.params)
+        except UserWarning as w:
+            plt.close("all")
+            return job.name, None, [str(w)]
+    return job.name, path, [str(w.message) for w in caught]
+
+
+def _plot_jobs(
+    pred_model:       PredictiveModel,
+    anova_edad:       Optional[AnovaResults],
+    anova_estructura: Optional[AnovaResults],
+) -> list[PlotJob]:
+    """Lista de gráficos disponibles, en el orden de PLOT_FILES (ANOVA None = sin boxplot)."""
+    base = ("Edad_Dias", "Resistencia_MPa")
+    jobs = [
+        PlotJob("distribucion", _render_distribucion, base),
+        PlotJob("kde",          _render_kde,          base),
+    ]
+    if pred_model.is_trained:
+        jobs.append(PlotJob("crecimiento", _render_crecimiento, base, {
+            "intercept": pred_model.intercept,
+            "slope":     pred_model.slope,
+            "equation":  pred_model.equation_str,
+        }))
+    for result in _anovas(anova_edad, anova_estructura):
+        jobs.append(PlotJob(f"anova_{result.factor.lower()}", _render_anova_boxplot,
+                            (result.factor, "Resistencia_MPa"), {
+            "factor":         result.factor,
+            "is_significant": result.is_significant,
+        }))
+    return jobs
+
+
 def generate_plots(
     df: pd.DataFrame,
     pred_model: PredictiveModel,
     anova_edad: AnovaResults,
     anova_estructura: AnovaResults,
     output_dir: Path,
+    plots:   Optional[Iterable[str]] = None,
+    workers: int = 1,
+    cache:   Optional[PlotCache] = None,
 ) -> dict[str, Path]:
     """
-    Genera todos los gráficos del pipeline y los guarda como PNG.
+    Genera los gráficos del pipeline y los guarda como PNG.
+
+    Args:
+        plots:   Nombres (claves de PLOT_FILES) a generar; None = todos.
+        workers: Procesos de renderizado. Con 1 (default) se dibuja en el
+                 proceso actual; con más, cada gráfico es un trabajo
+                 independiente y los datos se envían una sola vez por proceso.
+        cache:   PlotCache opcional. Los gráficos cuyos datos y estilo no
+                 cambiaron se copian desde la caché sin renderizar.
 
     Returns:
         Diccionario {nombre: Path} con las rutas de los archivos generados.
-    """
-    sns.set_theme(style="whitegrid")
-    # Capture matplotlib/seaborn UserWarnings and route them to the log file
-    # instead of letting them appear on stderr unfiltered.
-    warnings.filterwarnings("error", category=UserWarning, module="matplotlib")
-    paths: dict[str, Path] = {}
-    ages_sorted = sorted(df["Edad_Dias"].unique())
-
-    # ── Gráfico 1: Boxplot distribución por edad ──────────────────────────
-    try:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.boxplot(
-            x="Edad_Dias", y="Resistencia_MPa", hue="Edad_Dias",
-            data=df, palette="Blues", legend=False, ax=ax, order=ages_sorted,
-        )
-        sns.stripplot(
-            x="Edad_Dias", y="Resistencia_MPa", data=df,
-            color="#333333", alpha=0.25, jitter=True, ax=ax, order=ages_sorted,
-        )
-        ax.axhline(
-            TARGETS[28.0], color="red", linestyle="--", linewidth=1.5,
-            label=f"Meta 28d ({TARGETS[28.0]} MPa)",
-        )
-        for age, target in TARGETS.items():
-            if age != 28.0:
-                ax.axhline(target, color="orange", linestyle=":", linewidth=1, alpha=0.7)
-        ax.set_title("Distribucion de Resistencia por Edad - SikaGrout 9400 BR", fontsize=13, fontweight="bold")
-        ax.set_xlabel("Edad (dias)"); ax.set_ylabel("Resistencia (MPa)")
-        ax.legend()
-        p = output_dir / "plot_distribucion.png"
-        fig.savefig(p, dpi=150, bbox_inches="tight"); plt.close(fig)
-        paths["distribucion"] = p
-    except UserWarning as w:
-        log.warning("Matplotlib warning (plot_distribucion): %s", w)
-        plt.close("all")
-
-    # ── Gráfico 2: KDE por edad ───────────────────────────────────────────
-    try:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        for age in ages_sorted:
-            subset = df[df["Edad_Dias"] == age]
-            if len(subset) > 1:
-                sns.kdeplot(subset["Resistencia_MPa"], label=f"{int(age)} dias", fill=True, alpha=0.4, ax=ax)
-        ax.set_title("Densidad de Probabilidad de Resistencia por Edad", fontsize=13, fontweight="bold")
-        ax.set_xlabel("Resistencia (MPa)"); ax.legend()
-        p = output_dir / "plot_kde.png"
-        fig.savefig(p, dpi=150, bbox_inches="tight"); plt.close(fig)
-        paths["kde"] = p
-    except UserWarning as w:
-        log.warning("Matplotlib warning (plot_kde): %s", w)
-        plt.close("all")
-
-    # ── Gráfico 3: Modelo de crecimiento logarítmico ──────────────────────
-    if pred_model.is_trained:
-        try:
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.scatter(df["Edad_Dias"], df["Resistencia_MPa"], alpha=0.3, label="Mediciones")
-            x_fine = np.linspace(0.5, 35, 200)
-            y_fit  = pred_model.intercept + pred_model.slope * np.log(x_fine)
-            ax.plot(x_fine, y_fit, "r-", linewidth=2, label=f"Modelo: {pred_model.equation_str}")
-            ax.axhline(TARGETS[28.0], color="green", linestyle="--", label=f"Meta 28d ({TARGETS[28.0]} MPa)")
-            ax.set_title("Cinetica de Resistencia: Datos vs Modelo Logaritmico", fontsize=13, fontweight="bold")
-            ax.set_xlabel("Edad (dias)"); ax.set_ylabel("Resistencia (MPa)")
-            ax.legend(); ax.grid(True, alpha=0.3)
-            p = output_dir / "plot_crecimiento.png"
-            fig.savefig(p, dpi=150, bbox_inches="tight"); plt.close(fig)
-            paths["crecimiento"] = p
-        except UserWarning as w:
-            log.warning("Matplotlib warning (plot_crecimiento): %s", w)
-            plt.close("all")
+    """
+    jobs = _plot_jobs(pred_model, anova_edad, anova_estructura)
+    if plots is not None:
+        wanted = set(plots)
+        unknown = wanted - PLOT_FILES.keys()
+        if unknown:
+            raise ValueError(f"Graficos desconocidos: {sorted(unknown)}")
+        jobs = [job for job in jobs if job.name in wanted]
+
+    columns = ["Edad_Dias", "Resistencia_MPa", *(a.factor for a in _anovas(anova_edad, anova_estructura))]
+    data = df[list(dict.fromkeys(columns))]
+    targets = {job.name: output_dir / PLOT_FILES[job.name] for job in jobs}
 
-    # ── Gráficos 4 & 5: Boxplots ANOVA ───────────────────────────────────
-    anova_configs = [
-        (anova_edad,       "boxplot_Edad_Dias.png"),
-        (anova_estructura, "boxplot_Estructura.png"),
-    ]
-    for result, fname in anova_configs:
-        try:
-            df_plot = df.copy()
-            df_plot[result.factor] = df_plot[result.factor].astype(str)
-            order = sorted(df_plot[result.factor].unique())
-            fig, ax = plt.subplots(figsize=(12, 6))
-            sns.boxplot(
-                x=result.factor, y="Resistencia_MPa", hue=result.factor,
-                data=df_plot, palette="Set2", legend=False, ax=ax, order=order,
-            )
-            sns.stripplot(
-                x=result.factor, y="Resistencia_MPa",
-                data=df_plot, color="black", alpha=0.3, jitter=True, ax=ax, order=order,
-            )
-            sig_label = "SIGNIFICATIVO" if result.is_significant else "No significativo"
-            ax.set_title(
-                f"ANOVA - Resistencia por {result.factor} [{sig_label}]",
-                fontsize=12, fontweight="bold",
-            )
-            ax.set_xlabel(result.factor); ax.set_ylabel("Resistencia (MPa)")
-            ax.tick_params(axis="x", rotation=90)
-            ax.grid(True, linestyle="--", alpha=0.4)
-            p = output_dir / fname
-            fig.savefig(p, dpi=150, bbox_inches="tight"); plt.close(fig)
-            paths[f"anova_{result.factor.lower()}"] = p
-        except UserWarning as w:
-            log.warning("Matplotlib warning (%s): %s", fname, w)
-            plt.close("all")
+    paths: dict[str, Path] = {}
+    keys:  dict[str, str]  = {}
+    if cache is not None and cache.enabled:
+        for job in jobs:
+            keys[job.name] = cache.key_for(job, data)
+            if cache.get(keys[job.name], targets[job.name]):
+                paths[job.name] = targets[job.name]
+        jobs = [job for job in jobs if job.name not in paths]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)),
+            initializer=_init_plot_worker, initargs=(data,),
+        ) as pool:
+            outcomes = list(pool.map(_run_plot_job, jobs, [targets[j.name] for j in jobs]))
+    else:
+        sns.set_theme(style="whitegrid")
+        outcomes = [_run_plot_job(job, targets[job.name], data) for job in jobs]
 
-    # Restore default warning filter after plotting
-    warnings.resetwarnings()
+    for name, path, messages in outcomes:
+        if path is None:
+            log.warning("Matplotlib warning (%s): %s", PLOT_FILES[name], messages[0])
+            continue
+        for msg in messages:
+            log.debug("Warning en grafico %s: %s", name, msg)
+        paths[name] = path
+        if name in keys:
+            cache.put(keys[name], path)
+
+    if cache is not None and cache.enabled:
+        cache.evict()
+        log.info(
+            "Cache de graficos: %d reutilizados, %d renderizados.",
+            len(keys) - len(jobs), len(jobs),
+        )
     log.info("Graficos generados en: %s", output_dir)
-    return paths
+    return {name: paths[name] for name in PLOT_FILES if name in paths}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PASO 8 — REPORTE DE TEXTO
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _bootstrap_lines(boot: Optional[BootstrapResults]) -> list[str]:
+    """Líneas de intervalos bootstrap para los reportes (vacío si no se calculó)."""
+    if boot is None:
+        return []
+    pct = f"{boot.level:.0%}"
+    return [
+        f"Bootstrap ({boot.n_resamples} remuestras, n={boot.n}, IC {pct}):",
+        f"  Media 28d:       [{boot.mean_ci[0]:.2f}, {boot.mean_ci[1]:.2f}] MPa",
+        f"  f'ck:            [{boot.fck_ci[0]:.2f}, {boot.fck_ci[1]:.2f}] MPa",
+        f"  Probetas >= {FCK_REQUIRED:.0f}: {boot.pass_rate:.1%} "
+        f"[{boot.pass_rate_ci[0]:.1%}, {boot.pass_rate_ci[1]:.1%}]",
+        f"  P(f'ck >= {FCK_REQUIRED:.0f}): {boot.prob_fck_pass:.1%}",
+    ]
+
+
 def generate_text_report(
     inference:        InferenceResults,
-    anova_edad:       AnovaResults,
-    anova_estructura: AnovaResults,
+    anova_edad:       Optional[AnovaResults],
+    anova_estructura: Optional[AnovaResults],
     pred_model:       PredictiveModel,
     output_path:      Path,
+    subtitle:         Optional[str] = None,
 ) -> str:
     """
-    Genera y guarda el reporte de texto completo.
+    Genera y guarda el reporte de texto completo. `subtitle` (p. ej. la
+    estructura de un reporte parcial) se añade al título; los ANOVA en None
+    se omiten y las secciones siguientes se renumeran.
 
     Returns:
         Contenido del reporte como string.
@@ -571,7 +2765,8 @@ def generate_text_report(
     def section(title: str) -> None:
         lines.extend(["", SEP, f"  {title}", SEP, ""])
 
-    section("REPORTE DE CONTROL ESTADISTICO - SIKAGROUT 9400 BR | Blue Tech")
+    title = "REPORTE DE CONTROL ESTADISTICO - SIKAGROUT 9400 BR | Blue Tech"
+    section(f"{title} | {subtitle}" if subtitle else title)
     lines.append(f"Probetas analizadas: {inference.n_total}")
     lines.append(f"Fecha de generacion: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}\n")
 
@@ -610,9 +2805,11 @@ def generate_text_report(
         f"  Resistencia Caracteristica f'ck requerida (Ficha Tecnica): {inference.fck_required:.2f} MPa"
     )
     lines.append(f"  RESULTADO FINAL: {'APROBADO' if inference.passes_fck else 'REVISAR'}\n")
+    lines.extend(f"  {line}" for line in _bootstrap_lines(inference.bootstrap))
 
     # ── ANOVA ─────────────────────────────────────────────────────────────
-    for i, anova in enumerate([anova_edad, anova_estructura], start=3):
+    anovas = _anovas(anova_edad, anova_estructura)
+    for i, anova in enumerate(anovas, start=3):
         section(f"{i}. ANALISIS ANOVA — Factor: {anova.factor}")
         lines.append(anova.anova_table.to_string())
         norm_status = "Normal" if anova.residuals_normal else "No normal (ADVERTENCIA)"
@@ -625,7 +2822,7 @@ def generate_text_report(
             lines.append(f"\n  Factor NO significativo -> Post-hoc Tukey no aplicable.\n")
 
     # ── Modelo predictivo ─────────────────────────────────────────────────
-    section("5. MODELO PREDICTIVO LOGARITMICO")
+    section(f"{3 + len(anovas)}. MODELO PREDICTIVO LOGARITMICO")
     if pred_model.is_trained:
         lines.append(f"  Ecuacion: {pred_model.equation_str}")
         lines.append(f"  R2 = {pred_model.r2_score:.4f}  |  n = {pred_model.n_samples} probetas")
@@ -646,63 +2843,183 @@ def generate_text_report(
 # PASO 9 — REPORTE PDF
 # ─────────────────────────────────────────────────────────────────────────────
 
+PDF_IMAGE_MAX_PX = 1100   # ancho de los PNG embebidos (~160 dpi a 175 mm)
+PDF_IMAGE_COLORS = 256    # paleta de los PNG recomprimidos
+PDF_BLUE         = (0, 71, 133)
+STATS_COLUMNS    = ["Edad (d)", "N", "Media", "Desv.", "Min", "Max", "CV%", "Meta", "Estado"]
+STATS_WIDTHS     = [22, 12, 22, 22, 20, 20, 18, 18, 22]
+SPC_COLUMNS      = ["Edad", "Estructura", "Subgrupos", "Fuera X", "Fuera R",
+                    "Fuera EWMA", "Fuera CUSUM", "Ultimo vaciado"]
+SPC_WIDTHS       = [16, 40, 20, 18, 18, 20, 22, 36]
+
+
 def _safe_str(text: str) -> str:
     """Convierte texto UTF-8 a latin-1 para compatibilidad con fpdf1."""
     return text.encode("latin-1", "replace").decode("latin-1")
 
 
-def generate_pdf_report(
-    inference:         InferenceResults,
-    anova_edad:        AnovaResults,
-    anova_estructura:  AnovaResults,
-    pred_model:        PredictiveModel,
-    plot_paths:        dict[str, Path],
-    text_report_path:  Path,
-    output_path:       Path,
-) -> bool:
+@lru_cache(maxsize=1)
+def _pdf_template() -> type:
     """
-    Genera el reporte PDF ejecutivo completo.
-
-    Returns:
-        True si el PDF fue generado correctamente, False en caso de error.
+    Clase FPDF con la maqueta fija del reporte (cabecera, pie, títulos de
+    sección y tablas). Se define una sola vez por proceso; ImportError si
+    fpdf2 no está instalado.
     """
-    try:
-        from fpdf import FPDF
-    except ImportError:
-        log.error("fpdf no esta instalado. Ejecute: pip install fpdf2")
-        return False
+    from fpdf import FPDF
 
-    BLUE = (0, 71, 133)
-    COL_WIDTHS = [22, 12, 22, 22, 20, 20, 18, 18, 22]
+    class ReportPDF(FPDF):
+        subtitle: str = ""
 
-    class PDF(FPDF):
         def header(self):
-            self.set_font("Arial", "B", 11)
-            self.set_fill_color(*BLUE)
+            title = "  CONTROL DE CALIDAD - SIKAGROUT 9400 BR | Blue Tech"
+            self.set_font("Helvetica", "B", 11)
+            self.set_fill_color(*PDF_BLUE)
             self.set_text_color(255, 255, 255)
-            self.cell(0, 10, "  CONTROL DE CALIDAD - SIKAGROUT 9400 BR | Blue Tech", 0, 1, "L", True)
+            self.cell(0, 10, _safe_str(f"{title} | {self.subtitle}" if self.subtitle else title),
+                      new_x="LMARGIN", new_y="NEXT", fill=True)
             self.set_text_color(0, 0, 0)
             self.ln(2)
 
         def footer(self):
             self.set_y(-12)
-            self.set_font("Arial", "I", 8)
+            self.set_font("Helvetica", "I", 8)
             self.set_text_color(128, 128, 128)
-            self.cell(0, 10, f"Pagina {self.page_no()} - Generado por Blue Tech Pipeline", 0, 0, "C")
+            self.cell(0, 10, f"Pagina {self.page_no()} - Generado por Blue Tech Pipeline", align="C")
 
         def section_title(self, title: str):
-            self.set_font("Arial", "B", 13)
+            self.set_font("Helvetica", "B", 13)
             self.set_fill_color(230, 240, 255)
-            self.cell(0, 8, _safe_str(f"  {title}"), 1, 1, "L", True)
+            self.cell(0, 8, _safe_str(f"  {title}"), border=1, new_x="LMARGIN", new_y="NEXT", fill=True)
             self.ln(3)
 
-    pdf = PDF()
+        def data_table(
+            self,
+            headers:   list[str],
+            widths:    list[float],
+            rows:      Iterable[Iterable[str]],
+            row_h:     float = 7,
+            font_size: int   = 9,
+        ):
+            """Tabla con la cabecera repetida en cada página; `rows` puede ser un generador."""
+            def head():
+                self.set_font("Helvetica", "B", font_size)
+                for h_txt, w in zip(headers, widths):
+                    self.cell(w, row_h + 1, h_txt, border=1, align="C")
+                self.ln()
+                self.set_font("Helvetica", size=font_size)
+
+            head()
+            for row in rows:
+                if self.will_page_break(row_h):
+                    self.add_page()
+                    head()
+                for val, w in zip(row, widths):
+                    self.cell(w, row_h, _safe_str(val), border=1, align="C")
+                self.ln()
+
+        def text_file(self, path: Path, size: int = 7, line_h: float = 4):
+            """
+            Vuelca un archivo de texto línea a línea en Courier. Solo las líneas
+            más anchas que la página pasan por multi_cell.
+            """
+            self.set_font("Courier", size=size)
+            max_chars = int(self.epw / self.get_string_width("M"))
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    line = _safe_str(line.rstrip("\n"))
+                    if len(line) > max_chars:
+                        self.multi_cell(0, line_h, line, new_x="LMARGIN", new_y="NEXT")
+                    else:
+                        self.cell(0, line_h, line, new_x="LMARGIN", new_y="NEXT")
+
+        def plot(self, path: Optional[Path]):
+            if path is not None and path.exists():
+                self.image(_pdf_image(path), x=15, w=175)
+
+    return ReportPDF
+
+
+@lru_cache(maxsize=64)
+def _compressed_png(path: str, mtime_ns: int, size: int, max_px: int) -> bytes:
+    # mtime_ns y size forman parte de la clave: un PNG regenerado invalida la entrada
+    from PIL import Image
+
+    with Image.open(path) as im:
+        im = im.convert("RGB")
+        if im.width > max_px:
+            im = im.resize((max_px, round(im.height * max_px / im.width)), Image.LANCZOS)
+        buf = io.BytesIO()
+        im.quantize(PDF_IMAGE_COLORS, method=Image.Quantize.FASTOCTREE).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _pdf_image(path: Path, max_px: int = PDF_IMAGE_MAX_PX) -> io.BytesIO | str:
+    """
+    PNG reducido a `max_px` de ancho y a una paleta de PDF_IMAGE_COLORS
+    colores (~3x más pequeño que el original de 150 dpi). Se cachea por ruta
+    y fecha de modificación, así el mismo gráfico en varios reportes se
+    recomprime una sola vez; si falla la conversión se embebe el original.
+    """
+    try:
+        st = path.stat()
+        return io.BytesIO(_compressed_png(str(path), st.st_mtime_ns, st.st_size, max_px))
+    except OSError as exc:
+        log.debug("No se pudo recomprimir %s: %s", path.name, exc)
+        return str(path)
+
+
+def _stats_rows(stats_summary: pd.DataFrame) -> Iterator[list[str]]:
+    cols = ["Edad_Dias", "N", "Media", "Desv", "Min", "Max", "CV_%"]
+    for edad, n, media, desv, vmin, vmax, cv in stats_summary[cols].itertuples(index=False, name=None):
+        target = TARGETS.get(float(edad))
+        estado = ("PASA" if target and media >= target else ("REVISAR" if target else "---"))
+        yield [
+            f"{edad:.0f}", str(int(n)), f"{media:.2f}", f"{desv:.2f}", f"{vmin:.2f}",
+            f"{vmax:.2f}", f"{cv:.2f}", f"{target:.0f}" if target else "-", estado,
+        ]
+
+
+def _spc_rows(table: pd.DataFrame) -> Iterator[list[str]]:
+    for row in table.itertuples(index=False):
+        yield [
+            f"{row.Edad_Dias:.0f}", str(row.Estructura)[:24], str(int(row.Subgrupos)),
+            str(int(row.Fuera_X)), str(int(row.Fuera_R)), str(int(row.Fuera_EWMA)),
+            str(int(row.Fuera_CUSUM)), str(row.Ultimo_Vaciado)[:10],
+        ]
+
+
+def generate_pdf_report(
+    inference:         InferenceResults,
+    anova_edad:        Optional[AnovaResults],
+    anova_estructura:  Optional[AnovaResults],
+    pred_model:        PredictiveModel,
+    plot_paths:        dict[str, Path],
+    text_report_path:  Optional[Path],
+    output_path:       Path,
+    spc:               Optional[SPCSummary] = None,
+    subtitle:          Optional[str] = None,
+) -> bool:
+    """
+    Genera el reporte PDF ejecutivo completo. Con `spc` se añade la sección
+    de cartas de control; `subtitle` se muestra en la cabecera de cada página.
+
+    Returns:
+        True si el PDF fue generado correctamente, False en caso de error.
+    """
+    try:
+        ReportPDF = _pdf_template()
+    except ImportError:
+        log.error("fpdf no esta instalado. Ejecute: pip install fpdf2")
+        return False
+
+    pdf = ReportPDF()
+    pdf.subtitle = subtitle or ""
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
 
     # ── Sección 1: Resumen ejecutivo ──────────────────────────────────────
     pdf.section_title("1. Resumen Ejecutivo")
-    pdf.set_font("Arial", size=10)
+    pdf.set_font("Helvetica", size=10)
 
     row_28 = inference.stats_summary[inference.stats_summary["Edad_Dias"] == 28.0]
     media_28 = f"{row_28['Media'].values[0]:.2f} MPa" if not row_28.empty else "N/D"
@@ -714,40 +3031,19 @@ def generate_pdf_report(
         f"f'ck requerido (Ficha):        {inference.fck_required:.2f} MPa",
         f"Resultado final:               {'APROBADO' if inference.passes_fck else 'REVISAR'}",
     ]:
-        pdf.cell(0, 7, _safe_str(line), 0, 1)
+        pdf.cell(0, 7, _safe_str(line), new_x="LMARGIN", new_y="NEXT")
     pdf.ln(3)
 
     # Tabla estadística descriptiva
-    pdf.set_font("Arial", "B", 9)
-    for h_txt, w in zip(["Edad (d)", "N", "Media", "Desv.", "Min", "Max", "CV%", "Meta", "Estado"], COL_WIDTHS):
-        pdf.cell(w, 8, h_txt, 1, 0, "C")
-    pdf.ln()
-    pdf.set_font("Arial", size=9)
-    for _, row in inference.stats_summary.iterrows():
-        target = TARGETS.get(float(row["Edad_Dias"]))
-        estado = ("PASA" if target and row["Media"] >= target else ("REVISAR" if target else "---"))
-        for val, w in zip(
-            [
-                f"{row['Edad_Dias']:.0f}", str(int(row["N"])),
-                f"{row['Media']:.2f}", f"{row['Desv']:.2f}",
-                f"{row['Min']:.2f}",   f"{row['Max']:.2f}",
-                f"{row['CV_%']:.2f}",  f"{target:.0f}" if target else "-",
-                estado,
-            ],
-            COL_WIDTHS,
-        ):
-            pdf.cell(w, 7, val, 1, 0, "C")
-        pdf.ln()
+    pdf.data_table(STATS_COLUMNS, STATS_WIDTHS, _stats_rows(inference.stats_summary))
     pdf.ln(5)
-
-    if "distribucion" in plot_paths and plot_paths["distribucion"].exists():
-        pdf.image(str(plot_paths["distribucion"]), x=15, w=175)
+    pdf.plot(plot_paths.get("distribucion"))
     pdf.ln(5)
 
     # ── Sección 2: Inferencia estadística ────────────────────────────────
     pdf.add_page()
     pdf.section_title("2. Inferencia Estadistica (28 dias)")
-    pdf.set_font("Arial", size=10)
+    pdf.set_font("Helvetica", size=10)
     for line in [
         f"Prueba T vs {TARGETS[28.0]} MPa:  t = {inference.t_stat_28d:+.4f},  p = {inference.p_value_28d:.4e}",
         f"Resultado T-test: {'SIGNIFICATIVO (p < 0.05)' if inference.passes_ttest else 'No concluyente'}",
@@ -755,13 +3051,14 @@ def generate_pdf_report(
         f"f'ck calculado (Percentil 5): {inference.fck_project:.2f} MPa",
         f"f'ck requerido:               {inference.fck_required:.2f} MPa",
         f"RESULTADO FINAL:              {'APROBADO' if inference.passes_fck else 'REVISAR'}",
+        *_bootstrap_lines(inference.bootstrap),
     ]:
-        pdf.cell(0, 7, _safe_str(line), 0, 1)
+        pdf.cell(0, 7, _safe_str(line), new_x="LMARGIN", new_y="NEXT")
     pdf.ln(3)
 
     # ── Sección 3: Modelo predictivo ──────────────────────────────────────
     pdf.section_title("3. Modelo Predictivo Logaritmico")
-    pdf.set_font("Arial", size=10)
+    pdf.set_font("Helvetica", size=10)
     if pred_model.is_trained:
         pdf.multi_cell(
             0, 7,
@@ -772,83 +3069,668 @@ def generate_pdf_report(
             ),
         )
     pdf.ln(3)
-    if "crecimiento" in plot_paths and plot_paths["crecimiento"].exists():
-        pdf.image(str(plot_paths["crecimiento"]), x=15, w=175)
-    if "kde" in plot_paths and plot_paths["kde"].exists():
+    pdf.plot(plot_paths.get("crecimiento"))
+    if "kde" in plot_paths:
         pdf.ln(3)
-        pdf.image(str(plot_paths["kde"]), x=15, w=175)
+        pdf.plot(plot_paths["kde"])
 
     # ── Sección 4: ANOVA ──────────────────────────────────────────────────
-    pdf.add_page()
-    pdf.section_title("4. Analisis de Varianza (ANOVA)")
-    pdf.set_font("Arial", size=10)
-    for anova in [anova_edad, anova_estructura]:
-        pdf.set_font("Arial", "B", 10)
+    next_section = 4
+    anovas = _anovas(anova_edad, anova_estructura)
+    if anovas:
+        pdf.add_page()
+        pdf.section_title(f"{next_section}. Analisis de Varianza (ANOVA)")
+        next_section += 1
+    for anova in anovas:
+        pdf.set_font("Helvetica", "B", 10)
         sig = "SIGNIFICATIVO" if anova.is_significant else "No significativo"
-        pdf.cell(0, 7, _safe_str(f"Factor: {anova.factor}  ->  {sig}"), 0, 1)
-        pdf.set_font("Arial", size=9)
+        pdf.cell(0, 7, _safe_str(f"Factor: {anova.factor}  ->  {sig}"), new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", size=9)
         norm = "Normal" if anova.residuals_normal else "No normal (ADVERTENCIA)"
         hom  = "Homogeneo" if anova.variances_homogeneous else "No homogeneo (ADVERTENCIA)"
-        pdf.cell(0, 6, _safe_str(f"  Shapiro-Wilk: p={anova.shapiro_p:.4f} ({norm})  |  Levene: p={anova.levene_p:.4f} ({hom})"), 0, 1)
+        pdf.cell(
+            0, 6,
+            _safe_str(f"  Shapiro-Wilk: p={anova.shapiro_p:.4f} ({norm})  |  Levene: p={anova.levene_p:.4f} ({hom})"),
+            new_x="LMARGIN", new_y="NEXT",
+        )
         pdf.ln(2)
-        fname_key = f"anova_{anova.factor.lower()}"
-        if fname_key in plot_paths and plot_paths[fname_key].exists():
-            pdf.image(str(plot_paths[fname_key]), x=15, w=175)
+        pdf.plot(plot_paths.get(f"anova_{anova.factor.lower()}"))
         pdf.ln(5)
 
-    # ── Sección 5: Reporte de texto completo ─────────────────────────────
-    if text_report_path.exists():
+    # ── Sección 5: Control estadístico de procesos ───────────────────────
+    if spc is not None and not spc.table.empty:
         pdf.add_page()
-        pdf.section_title("5. Detalle del Reporte de Control de Calidad")
+        pdf.section_title(f"{next_section}. Control Estadistico de Procesos (SPC)")
+        next_section += 1
+        pdf.set_font("Helvetica", size=9)
+        pdf.multi_cell(0, 5, _safe_str(
+            f"Cartas X-R, EWMA (lambda={SPC_EWMA_LAMBDA}) y CUSUM (k={SPC_CUSUM_K}, h={SPC_CUSUM_H}) "
+            f"por edad y estructura; subgrupo = vaciado del dia. Limites fijados con los primeros "
+            f"{SPC_BASELINE} subgrupos de cada carta."
+        ))
+        pdf.ln(2)
+        pdf.data_table(SPC_COLUMNS, SPC_WIDTHS, _spc_rows(spc.table), row_h=6, font_size=8)
+        for name, path in spc.chart_paths.items():
+            if path.exists():
+                pdf.add_page()
+                pdf.plot(path)
+
+    # ── Sección 6: Reporte de texto completo ─────────────────────────────
+    if text_report_path is not None and text_report_path.exists():
+        pdf.add_page()
+        pdf.section_title(f"{next_section}. Detalle del Reporte de Control de Calidad")
         try:
-            text = text_report_path.read_text(encoding="utf-8")
-            pdf.set_font("Courier", size=7)
-            pdf.multi_cell(0, 4, _safe_str(text))
+            pdf.text_file(text_report_path)
         except Exception as exc:
-            pdf.set_font("Arial", size=10)
-            pdf.cell(0, 8, _safe_str(f"Error leyendo reporte: {exc}"), 0, 1)
+            pdf.set_font("Helvetica", size=10)
+            pdf.cell(0, 8, _safe_str(f"Error leyendo reporte: {exc}"), new_x="LMARGIN", new_y="NEXT")
 
     pdf.output(str(output_path))
     log.info("Reporte PDF generado: %s", output_path.name)
     return True
 
 
+# ── Reportes por estructura ──────────────────────────────────────────────────
+
+STRUCTURE_REPORT_MIN_SAMPLES = 10
+STRUCTURE_REPORT_DIR         = "reportes_estructura"
+STRUCTURE_PLOTS              = ("distribucion", "crecimiento", "anova_edad_dias")
+
+
+def _structure_report(
+    estructura: str,
+    output_dir: Path,
+    df:         Optional[pd.DataFrame] = None,
+) -> tuple[str, Optional[Path]]:
+    """
+    Reporte de texto + PDF de una estructura. Sin `df` usa el DataFrame
+    compartido del proceso (_init_plot_worker). Returns (estructura, ruta
+    del PDF o None si no se pudo generar).
+    """
+    data = _PLOT_DATA if df is None else df
+    sub  = data[data["Estructura"] == estructura]
+    base = output_dir / f"Reporte_{_slug(estructura)}"
+    subtitle = f"Estructura: {estructura}"
+
+    inference  = compute_inference(sub)
+    pred_model = PredictiveModel()
+    anova_edad = None
+    if sub["Edad_Dias"].nunique() >= 2:
+        pred_model.train(sub)
+        anova_edad = perform_anova(sub, "Edad_Dias")
+
+    with tempfile.TemporaryDirectory(prefix="grout-plots-") as tmp:
+        plot_paths: dict[str, Path] = {}
+        for job in _plot_jobs(pred_model, anova_edad, None):
+            if job.name in STRUCTURE_PLOTS:
+                name, path, _ = _run_plot_job(job, Path(tmp) / PLOT_FILES[job.name], sub)
+                if path is not None:
+                    plot_paths[name] = path
+        txt_path = base.with_suffix(".txt")
+        generate_text_report(inference, anova_edad, None, pred_model, txt_path, subtitle=subtitle)
+        pdf_path = base.with_suffix(".pdf")
+        ok = generate_pdf_report(
+            inference, anova_edad, None, pred_model, plot_paths, txt_path, pdf_path,
+            subtitle=subtitle,
+        )
+    return estructura, pdf_path if ok else None
+
+
+def generate_structure_reports(
+    df:          pd.DataFrame,
+    output_dir:  Path,
+    workers:     int = 1,
+    min_samples: int = STRUCTURE_REPORT_MIN_SAMPLES,
+) -> dict[str, Path]:
+    """
+    Genera un reporte (texto + PDF) por cada Estructura con al menos
+    `min_samples` probetas, a partir del mismo DataFrame ya cargado.
+
+    Con workers > 1 cada estructura es un trabajo de un pool de procesos; las
+    columnas necesarias se envían una sola vez por proceso, igual que en
+    `generate_plots()`.
+
+    Returns:
+        {estructura: ruta del PDF} de los reportes generados.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    data   = df[["Estructura", "Edad_Dias", "Resistencia_MPa"]].dropna()
+    counts = data["Estructura"].value_counts()
+    skipped = counts[counts < min_samples]
+    if not skipped.empty:
+        log.info(
+            "Reportes por estructura: %d estructura(s) con menos de %d probetas omitidas.",
+            len(skipped), min_samples,
+        )
+    structures = sorted(counts[counts >= min_samples].index)
+
+    if workers > 1 and len(structures) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(structures)),
+            initializer=_init_plot_worker, initargs=(data,),
+        ) as pool:
+            outcomes = list(pool.map(_structure_report, structures, [output_dir] * len(structures)))
+    else:
+        sns.set_theme(style="whitegrid")
+        outcomes = [_structure_report(name, output_dir, data) for name in structures]
+
+    paths = {name: path for name, path in outcomes if path is not None}
+    log.info("Reportes por estructura generados: %d en %s", len(paths), output_dir)
+    return paths
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# INSTRUMENTACIÓN DE ETAPAS (tiempo, CPU, memoria, filas)
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class StageMetrics:
+    """
+    Mediciones de una etapa del pipeline.
+
+    `cpu_s` es el tiempo de CPU del hilo que ejecuta la etapa y
+    `child_cpu_s` el de los procesos hijo terminados durante ella (p.ej. los
+    workers de un ProcessPoolExecutor). `rss_mb` es la memoria residente del
+    proceso al terminar la etapa y `rss_delta_mb` su variación durante ella
+    (None si no es medible: sin psutil ni /proc). `traced_peak_mb` es el pico
+    de tracemalloc durante la etapa, solo si tracemalloc está activo. Con
+    etapas en paralelo, memoria y CPU de hijos incluyen las etapas simultáneas.
+    """
+    name:           str
+    start:          float  # time.time() al iniciar (comparable entre procesos)
+    wall_s:         float
+    cpu_s:          float
+    child_cpu_s:    Optional[float] = None
+    rss_mb:         Optional[float] = None
+    rss_delta_mb:   Optional[float] = None
+    traced_peak_mb: Optional[float] = None
+    rows_in:        Optional[int] = None
+    rows_out:       Optional[int] = None
+    pid:            int = 0
+    thread:         int = 0
+
+
+def _rss_mb() -> Optional[float]:
+    """
+    Memoria residente actual del proceso en MB (None si no es medible).
+    ru_maxrss no sirve por etapa: es el máximo de toda la vida del proceso.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _children_cpu_s() -> Optional[float]:
+    """CPU (usuario + sistema) acumulada de los procesos hijo ya terminados."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _row_count(*objs: Any) -> Optional[int]:
+    """Suma de filas de los DataFrames entre `objs` (None si no hay ninguno)."""
+    frames = [o for o in objs if isinstance(o, pd.DataFrame)]
+    return sum(len(f) for f in frames) if frames else None
+
+
+class _StageProbe:
+    """Medición en curso de una etapa; `rows_out` puede fijarse dentro del bloque."""
+
+    def __init__(self, name: str, rows_in: Optional[int] = None):
+        self.name, self.rows_in, self.rows_out = name, rows_in, None
+        self.metrics: Optional[StageMetrics] = None
+
+    def __enter__(self) -> "_StageProbe":
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._start = time.time()
+        self._wall  = time.perf_counter()
+        self._cpu   = time.thread_time()
+        self._child = _children_cpu_s()
+        self._rss   = _rss_mb()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        child, rss = _children_cpu_s(), _rss_mb()
+        self.metrics = StageMetrics(
+            name=self.name,
+            start=self._start,
+            wall_s=time.perf_counter() - self._wall,
+            cpu_s=time.thread_time() - self._cpu,
+            child_cpu_s=None if child is None else child - self._child,
+            rss_mb=rss,
+            rss_delta_mb=None if rss is None or self._rss is None else rss - self._rss,
+            traced_peak_mb=(
+                tracemalloc.get_traced_memory()[1] / 2**20 if tracemalloc.is_tracing() else None
+            ),
+            rows_in=self.rows_in,
+            rows_out=self.rows_out,
+            pid=os.getpid(),
+            thread=threading.get_ident(),
+        )
+
+
+def _measured_call(name: str, func: Callable[..., Any], *args: Any) -> tuple[Any, StageMetrics]:
+    """Ejecuta func(*args) midiéndolo; nivel de módulo para poder usarse en procesos."""
+    with _StageProbe(name, rows_in=_row_count(*args)) as probe:
+        result = func(*args)
+        probe.rows_out = _row_count(result)
+    return result, probe.metrics
+
+
+@dataclass
+class PipelineTrace:
+    """
+    Registro de StageMetrics de una ejecución de `run_pipeline()`.
+
+    Uso:
+        trace = PipelineTrace()
+        with trace.stage("carga") as probe:
+            df = load_files(files)
+            probe.rows_out = len(df)
+        trace.write("traza.json", fmt="chrome")
+    """
+    stages: list[StageMetrics] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[_StageProbe]:
+        probe = _StageProbe(name, rows_in)
+        try:
+            with probe:
+                yield probe
+        finally:
+            self.stages.append(probe.metrics)
+
+    def extend(self, metrics: Iterable[StageMetrics]) -> None:
+        self.stages.extend(metrics)
+
+    def to_dict(self) -> dict:
+        return {"stages": [asdict(m) for m in self.stages]}
+
+    def to_chrome_trace(self) -> dict:
+        """Formato Trace Event (chrome://tracing, Perfetto): un evento "X" por etapa."""
+        t0 = min((m.start for m in self.stages), default=0.0)
+        return {
+            "traceEvents": [
+                {
+                    "name": m.name, "cat": "grout_pipeline", "ph": "X",
+                    "ts":  (m.start - t0) * 1e6, "dur": m.wall_s * 1e6,
+                    "pid": m.pid, "tid": m.thread,
+                    "args": {k: v for k, v in asdict(m).items()
+                             if k not in ("name", "start", "wall_s", "pid", "thread")},
+                }
+                for m in self.stages
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write(self, path: Path, fmt: str = "json") -> Path:
+        """Guarda la traza como JSON simple ("json") o Trace Event ("chrome")."""
+        if fmt not in ("json", "chrome"):
+            raise ValueError(f"Formato de traza desconocido: {fmt!r}")
+        data = self.to_chrome_trace() if fmt == "chrome" else self.to_dict()
+        path = Path(path)
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        return path
+
+    def log_summary(self) -> None:
+        def fmt(value: Optional[float], spec: str) -> str:
+            return "-" if value is None else format(value, spec)
+
+        log.info(
+            "%-18s %9s %9s %9s %9s %9s %9s %9s",
+            "Etapa", "Wall s", "CPU s", "CPU hijos", "RSS MB", "dRSS MB", "Heap MB", "Filas",
+        )
+        for m in self.stages:
+            log.info(
+                "%-18s %9.3f %9.3f %9s %9s %9s %9s %9s",
+                m.name, m.wall_s, m.cpu_s, fmt(m.child_cpu_s, ".3f"),
+                fmt(m.rss_mb, ".1f"), fmt(m.rss_delta_mb, "+.1f"), fmt(m.traced_peak_mb, ".1f"),
+                fmt(m.rows_out if m.rows_out is not None else m.rows_in, "d"),
+            )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PLANIFICADOR DE ETAPAS (DAG)
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class PipelineStage:
+    """
+    Etapa del pipeline dentro del grafo de dependencias.
+
+    `func` recibe como argumentos posicionales los resultados de `inputs`
+    (en ese orden); su valor de retorno queda disponible con el nombre de la
+    etapa. `after` declara dependencias de orden sin pasar su resultado (p.ej.
+    el PDF necesita que el reporte de texto ya exista en disco).
+    Con el ejecutor de procesos `func` debe ser serializable (función de
+    módulo o functools.partial de una).
+    """
+    name:   str
+    func:   Callable[..., Any]
+    inputs: tuple[str, ...] = ()
+    after:  tuple[str, ...] = ()
+
+    @property
+    def depends_on(self) -> tuple[str, ...]:
+        return self.inputs + self.after
+
+
+@dataclass
+class StageSchedule:
+    """Resultados, mediciones y ruta crítica de una ejecución de `run_stages()`."""
+    results:       dict[str, Any]
+    metrics:       dict[str, StageMetrics]
+    critical_path: list[str]
+    wall_time:     float
+
+    @property
+    def durations(self) -> dict[str, float]:
+        return {name: m.wall_s for name, m in self.metrics.items()}
+
+    @property
+    def critical_time(self) -> float:
+        return sum(self.metrics[name].wall_s for name in self.critical_path)
+
+
+def _critical_path(stages: list[PipelineStage], durations: dict[str, float]) -> list[str]:
+    """Cadena de dependencias con mayor suma de duraciones (stages en orden topológico)."""
+    finish: dict[str, float] = {}
+    prev:   dict[str, Optional[str]] = {}
+    for stage in stages:
+        deps = [d for d in stage.depends_on if d in finish]
+        parent = max(deps, key=finish.__getitem__) if deps else None
+        prev[stage.name]   = parent
+        finish[stage.name] = durations[stage.name] + (finish[parent] if parent else 0.0)
+
+    if not finish:
+        return []
+    node: Optional[str] = max(finish, key=finish.__getitem__)
+    path: list[str] = []
+    while node is not None:
+        path.append(node)
+        node = prev[node]
+    return path[::-1]
+
+
+def _toposort(stages: list[PipelineStage], available: Iterable[str]) -> list[PipelineStage]:
+    """Ordena las etapas por dependencias; ValueError si hay ciclos o entradas desconocidas."""
+    known = set(available)
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names) or known & set(names):
+        raise ValueError(f"Nombres de etapa duplicados: {names}")
+    missing = {d for s in stages for d in s.depends_on} - known - set(names)
+    if missing:
+        raise ValueError(f"Dependencias desconocidas: {sorted(missing)}")
+
+    ordered: list[PipelineStage] = []
+    pending = list(stages)
+    while pending:
+        ready = [s for s in pending if set(s.depends_on) <= known]
+        if not ready:
+            raise ValueError(f"Ciclo de dependencias entre: {[s.name for s in pending]}")
+        for stage in ready:
+            ordered.append(stage)
+            known.add(stage.name)
+            pending.remove(stage)
+    return ordered
+
+
+# Etapas de run_pipeline() que dibujan con pyplot, en el orden en que se
+# encadenan con el ejecutor de hilos (SPC primero: solo espera sus filas).
+PYPLOT_STAGES = ("spc", "plot_paths", "structure_reports")
+
+
+def _chain_stages(stages: list[PipelineStage], names: Iterable[str]) -> list[PipelineStage]:
+    """
+    Encadena con `after` las etapas `names` presentes, en ese orden, para que
+    nunca se ejecuten a la vez (p.ej. las que usan pyplot, que no es seguro
+    entre hilos). Las demás etapas se devuelven sin cambios.
+    """
+    available = {s.name for s in stages}
+    present   = [name for name in names if name in available]
+    previous  = dict(zip(present[1:], present))
+    return [
+        replace(s, after=s.after + (previous[s.name],))
+        if s.name in previous and previous[s.name] not in s.after else s
+        for s in stages
+    ]
+
+
+def run_stages(
+    stages:   list[PipelineStage],
+    initial:  Optional[dict[str, Any]] = None,
+    workers:  int = 1,
+    executor: str = "thread",
+) -> StageSchedule:
+    """
+    Ejecuta un grafo de etapas, lanzando en paralelo las que no dependen entre sí.
+
+    Args:
+        stages:   Etapas a ejecutar (en cualquier orden).
+        initial:  Valores ya disponibles (p.ej. {"df": df}) que las etapas
+                  pueden usar como entrada.
+        workers:  Etapas simultáneas. Con 1 (default) se ejecutan en orden
+                  topológico en el proceso actual.
+        executor: "thread" (default) o "process". Los hilos comparten los
+                  datos sin copiarlos; los procesos evitan el GIL pero
+                  serializan entradas y resultados.
+
+    Returns:
+        StageSchedule con los resultados por nombre (incluye `initial`), la
+        StageMetrics de cada etapa y la ruta crítica del grafo.
+
+    Raises:
+        ValueError: Si hay ciclos, nombres repetidos o dependencias desconocidas.
+        Cualquier excepción de una etapa se propaga; las etapas que aún no
+        habían empezado se cancelan.
+    """
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Ejecutor desconocido: {executor!r}")
+    results: dict[str, Any] = dict(initial or {})
+    ordered = _toposort(stages, results)
+    metrics: dict[str, StageMetrics] = {}
+    start = time.perf_counter()
+
+    if workers <= 1 or len(ordered) <= 1:
+        for stage in ordered:
+            results[stage.name], metrics[stage.name] = _measured_call(
+                stage.name, stage.func, *(results[i] for i in stage.inputs)
+            )
+    else:
+        pool_cls = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+        with pool_cls(max_workers=workers) as pool:
+            pending = list(ordered)
+            running: dict[Future, PipelineStage] = {}
+            try:
+                while pending or running:
+                    for stage in [s for s in pending if set(s.depends_on) <= results.keys()]:
+                        args = [results[i] for i in stage.inputs]
+                        running[pool.submit(_measured_call, stage.name, stage.func, *args)] = stage
+                        pending.remove(stage)
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage = running.pop(future)
+                        results[stage.name], metrics[stage.name] = future.result()
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+    schedule = StageSchedule(
+        results=results,
+        metrics={s.name: metrics[s.name] for s in ordered},  # orden topológico
+        critical_path=_critical_path(ordered, {n: m.wall_s for n, m in metrics.items()}),
+        wall_time=time.perf_counter() - start,
+    )
+    log.info(
+        "Ruta critica: %s (%.2f s) | tiempo total de etapas: %.2f s",
+        " -> ".join(schedule.critical_path), schedule.critical_time, schedule.wall_time,
+    )
+    return schedule
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ORQUESTADOR PRINCIPAL — run_pipeline()
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _report_prediction(
+    pred_model:   PredictiveModel,
+    predict_args: Optional[tuple[float, float]],
+) -> None:
+    """Proyecta (mpa_actual, edad_actual) a 28 días y lo muestra por consola."""
+    if not predict_args:
+        return
+    mpa_now, age_now = predict_args
+    row     = pred_model.predict_many([mpa_now], age_now).iloc[0]
+    pred_28 = row["MPa_28d"]
+    status  = "CUMPLE (>= 110 MPa)" if pred_28 >= TARGETS[28.0] else "RIESGO (< 110 MPa)"
+    log.info(
+        "Prediccion: %.1f MPa a %.0f dias -> %.2f MPa a 28d (IP95%% %.2f - %.2f) [%s]",
+        mpa_now, age_now, pred_28, row["PI_Inf"], row["PI_Sup"], status,
+    )
+    print(f"\n  Proyeccion a 28d: {pred_28:.2f} MPa  [{status}]\n")
+
+
+def _pdf_stage(
+    inference:        InferenceResults,
+    anova_edad:       AnovaResults,
+    anova_estructura: AnovaResults,
+    pred_model:       PredictiveModel,
+    plot_paths:       dict[str, Path],
+    spc:              Optional[SPCSummary],
+    **kwargs:         Any,
+) -> bool:
+    """`generate_pdf_report` con la salida de la etapa SPC como entrada posicional."""
+    return generate_pdf_report(
+        inference, anova_edad, anova_estructura, pred_model, plot_paths, spc=spc, **kwargs,
+    )
+
+
+def _train_model(df: pd.DataFrame) -> PredictiveModel:
+    pred_model = PredictiveModel()
+    pred_model.train(df)
+    return pred_model
+
+
+def _train_model_from_sums(sums: LogModelSums) -> PredictiveModel:
+    pred_model = PredictiveModel()
+    pred_model.train_from_sums(sums)
+    return pred_model
+
+
+def _finish_trace(
+    trace:           PipelineTrace,
+    own_tracemalloc: bool,
+    trace_path:      Optional[Path],
+    trace_format:    str,
+) -> None:
+    """Detiene tracemalloc (si lo inició run_pipeline), resume y guarda la traza."""
+    if own_tracemalloc:
+        tracemalloc.stop()
+    trace.log_summary()
+    if trace_path is not None:
+        log.info("Traza de etapas guardada: %s", trace.write(trace_path, fmt=trace_format))
+
+
 def run_pipeline(
     files:        list[str | Path],
     output_dir:   Path = PROJECT_ROOT,
     db_path:      Optional[Path] = None,
     skip_pdf:     bool = False,
     predict_args: Optional[tuple[float, float]] = None,
+    workers:      int = 1,
+    use_cache:    bool = True,
+    rebuild_cache: bool = False,
+    incremental:  bool = False,
+    stage_workers: int = 1,
+    stage_executor: str = "thread",
+    plot_workers: int = 1,
+    trace_path:   Optional[Path] = None,
+    trace_format: str = "json",
+    trace_memory: bool = False,
+    export_csv:   bool = False,
+    bootstrap:    int = 0,
+    bootstrap_seed: Optional[int] = BOOTSTRAP_SEED,
+    spc:          bool = True,
+    structure_reports: bool = False,
+    report_workers: int = 1,
 ) -> dict:
     """
     Ejecuta el pipeline completo de control de calidad del grout.
 
     Pasos:
       1. Carga y consolidación de archivos Excel/CSV
-      2. Estadística descriptiva
-      3. Inferencia estadística (t-test, f'ck)
-      4. ANOVA por Edad_Dias
-      5. ANOVA por Estructura
-      6. Modelo predictivo logarítmico
-      7. Persistencia en SQLite
+      2. Persistencia en SQLite (probetas nuevas o modificadas)
+      3. Estadística descriptiva
+      4. Inferencia estadística (t-test, f'ck)
+      5. ANOVA por Edad_Dias
+      6. ANOVA por Estructura
+      7. Modelo predictivo logarítmico
       8. Generación de gráficos
       9. Reporte de texto
       10. Reporte PDF
 
     Args:
         files:        Lista de rutas a archivos Excel/CSV.
-        output_dir:   Directorio para master_data_grout.csv y reportes de texto.
+        output_dir:   Directorio para el maestro columnar (MASTER_STORE_NAME),
+                      el CSV opcional y las cachés.
         db_path:      Ruta al archivo SQLite (default: BlueTech_Grout.db en PROJECT_ROOT).
         skip_pdf:     Si True, omite la generación del PDF.
         predict_args: (mpa_actual, edad_actual) para predicción puntual a 28d.
+        workers:      Procesos para la lectura paralela de archivos (default: 1).
+        use_cache:    Si True, reutiliza hojas ya parseadas desde
+                      <output_dir>/.grout_cache/parse (solo si pyarrow está
+                      instalado; si no, esa caché se omite sin aviso) y
+                      gráficos sin cambios desde <output_dir>/.grout_cache/plots.
+        rebuild_cache: Si True, vacía ambas cachés antes de cargar.
+        incremental:  En ambos modos solo se escriben en SQLite las probetas
+                      nuevas o modificadas (el estado incremental se mantiene).
+                      Si False, el análisis cubre los archivos cargados. Si
+                      True, cubre el historial completo de 'Roturas':
+                      estadística, inferencia y modelo salen de las sumas
+                      almacenadas y, sin cambios, se conservan gráficos y
+                      reportes anteriores sin leer el historial.
+        stage_workers: Etapas de análisis simultáneas (ANOVA, modelo, SPC,
+                      gráficos, reportes); ver `run_stages()`. Default: 1.
+        stage_executor: "thread" (default) o "process" para esas etapas. Con
+                      hilos, las que dibujan (PYPLOT_STAGES) van en serie.
+        plot_workers: Procesos para renderizar los gráficos (default: 1).
+        trace_path:   Si se indica, guarda allí las StageMetrics de la ejecución.
+        trace_format: "json" (default) o "chrome" (chrome://tracing, Perfetto).
+        trace_memory: Si True, activa tracemalloc para medir el pico de memoria
+                      Python de cada etapa (más lento).
+        export_csv:   Si True, exporta además master_data_grout.csv y
+                      anomalias_fechas.csv (las anomalías de fechas siempre se
+                      guardan en la tabla 'Anomalias_Fechas').
+        bootstrap:    Remuestras bootstrap para los intervalos de la media,
+                      f'ck y tasa de aprobación a 28 días (0 = no calcular).
+        bootstrap_seed: Semilla del bootstrap (None = no reproducible).
+        spc:          Si True, añade las roturas nuevas a las cartas de control
+                      (X̄/R, EWMA, CUSUM) guardadas en la BD y las incluye en
+                      el PDF (imágenes en <output_dir>/spc).
+        structure_reports: Si True, genera además un reporte (texto + PDF) por
+                      Estructura en <output_dir>/STRUCTURE_REPORT_DIR.
+        report_workers: Procesos para los reportes por estructura (default: 1).
 
     Returns:
-        Diccionario con todos los resultados del pipeline.
+        Diccionario con todos los resultados del pipeline; "schedule" es el
+        StageSchedule con duraciones y ruta crítica de las etapas 5-10 y
+        "trace" el PipelineTrace con las mediciones de todas las etapas.
     """
+    if trace_format not in ("json", "chrome"):
+        raise ValueError(f"Formato de traza desconocido: {trace_format!r}")
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     if db_path is None:
@@ -860,68 +3742,166 @@ def run_pipeline(
     log.info("=" * 65)
 
     # ── Paso 1: Carga ──────────────────────────────────────────────────────
-    log.info("[1/9] Cargando y consolidando datos...")
-    df = load_files(files)
-    validate_dates(df)
-
-    csv_path = output_dir / "master_data_grout.csv"
-    df.to_csv(csv_path, index=False, encoding="utf-8-sig")
-    log.info("Master CSV guardado: %s (%d registros).", csv_path.name, len(df))
-    log.info("Total de probetas: %d", len(df))
-
-    # ── Paso 2 & 3: Estadística + Inferencia ──────────────────────────────
-    log.info("[2/9] Estadistica descriptiva e inferencia estadistica...")
-    inference = compute_inference(df)
-
-    # ── Paso 4 & 5: ANOVA ─────────────────────────────────────────────────
-    log.info("[3/9] ANOVA por Edad_Dias...")
-    anova_edad = perform_anova(df, "Edad_Dias")
-
-    log.info("[4/9] ANOVA por Estructura...")
-    anova_estructura = perform_anova(df, "Estructura")
-
-    # ── Paso 6: Modelo predictivo ──────────────────────────────────────────
-    log.info("[5/9] Entrenando modelo predictivo logaritmico...")
-    pred_model = PredictiveModel()
-    pred_model.train(df)
-
-    if predict_args:
-        mpa_now, age_now = predict_args
-        pred_28 = pred_model.predict_at_28d(mpa_now, age_now)
-        status  = "CUMPLE (>= 110 MPa)" if pred_28 >= TARGETS[28.0] else "RIESGO (< 110 MPa)"
-        log.info(
-            "Prediccion: %.1f MPa a %.0f dias -> %.2f MPa a 28d [%s]",
-            mpa_now, age_now, pred_28, status,
+    log.info("[1-2/10] Cargando, consolidando y guardando datos...")
+    trace = PipelineTrace()
+    own_tracemalloc = trace_memory and not tracemalloc.is_tracing()
+    if own_tracemalloc:
+        tracemalloc.start()
+    parse_cache = ParseCache(output_dir / ".grout_cache" / "parse", enabled=None if use_cache else False)
+    plot_cache  = PlotCache(output_dir / ".grout_cache" / "plots", enabled=use_cache)
+    if rebuild_cache:
+        log.info("Reconstruyendo caches de parseo y graficos: %s", parse_cache.root.parent)
+        parse_cache.clear()
+        plot_cache.clear()
+    with trace.stage("load_files") as probe:
+        df = load_files(files, workers=workers, cache=parse_cache)
+        probe.rows_out = len(df)
+    with trace.stage("validate_dates", rows_in=len(df)) as probe:
+        anomalies = find_date_anomalies(df)
+        log_date_anomalies(anomalies)
+        save_date_anomalies(
+            anomalies, db_path=db_path,
+            csv_path=output_dir / "anomalias_fechas.csv" if export_csv else None,
         )
-        print(f"\n  Proyeccion a 28d: {pred_28:.2f} MPa  [{status}]\n")
-
-    # ── Paso 7: SQLite ────────────────────────────────────────────────────
-    log.info("[6/9] Persistiendo en base de datos SQLite...")
-    persist_to_database(df, db_path)
+        probe.rows_out = len(anomalies)
 
-    # ── Paso 8: Gráficos ─────────────────────────────────────────────────
-    log.info("[7/9] Generando visualizaciones...")
-    plot_paths = generate_plots(df, pred_model, anova_edad, anova_estructura, SCRIPT_DIR)
+    with trace.stage("persist", rows_in=len(df)) as probe:
+        batch = update_incremental(df, db_path)
+        probe.rows_out = len(batch.new_rows) + len(batch.changed_rows)
+    update = batch if incremental else None
 
-    # ── Paso 9: Reporte de texto ──────────────────────────────────────────
-    log.info("[8/9] Generando reporte de texto...")
-    txt_path    = PROJECT_ROOT / "Reporte_Control_Calidad_Grout.txt"
-    report_text = generate_text_report(
-        inference, anova_edad, anova_estructura, pred_model, txt_path
-    )
-    print(f"\n{report_text}\n")
+    if update is not None and not update.has_changes:
+        # Sin cambios: todo sale de los agregados guardados, en O(grupos)
+        inference = inference_from_summary(
+            update.accumulator.to_frame(), n_total=update.accumulator.n_total,
+        )
+        if bootstrap > 0:
+            log.info("Bootstrap omitido: sin probetas nuevas ni modificadas.")
+        pred_model = _train_model_from_sums(update.sums)
+        _report_prediction(pred_model, predict_args)
+        plot_paths = {
+            name: SCRIPT_DIR / fname for name, fname in PLOT_FILES.items()
+            if (SCRIPT_DIR / fname).exists()
+        }
+        log.info("[3-10/10] Sin cambios: se conservan ANOVA, graficos y reportes anteriores.")
+        _finish_trace(trace, own_tracemalloc, trace_path, trace_format)
+        log.info("=" * 65)
+        log.info("BLUE TECH — PIPELINE GROUT — COMPLETADO (incremental)")
+        log.info("=" * 65)
+        return {
+            "df":               df,
+            "inference":        inference,
+            "anova_edad":       None,
+            "anova_estructura": None,
+            "pred_model":       pred_model,
+            "plot_paths":       plot_paths,
+            "incremental":      update,
+            "anomalies":        anomalies,
+            "schedule":         None,
+            "trace":            trace,
+            "spc":              None,
+            "structure_reports": {},
+        }
+
+    if update is not None:
+        with trace.stage("load_history") as probe:
+            df = load_history(db_path)  # El modo incremental analiza todo el historial
+            probe.rows_out = len(df)
+
+    with trace.stage("master_store", rows_in=len(df)):
+        store_path = write_master_store(df, output_dir / MASTER_STORE_NAME)
+    log.info("Maestro columnar guardado: %s (%d registros).", store_path.name, len(df))
+    if export_csv:
+        csv_path = output_dir / "master_data_grout.csv"
+        with trace.stage("master_csv", rows_in=len(df)):
+            df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+        log.info("Master CSV exportado: %s.", csv_path.name)
+    log.info("Total de probetas: %d", len(df))
 
-    # ── Paso 10: PDF ──────────────────────────────────────────────────────
+    # ── Paso 2 & 3: Estadística + Inferencia ──────────────────────────────
+    log.info("[3-4/10] Estadistica descriptiva e inferencia estadistica...")
+    with trace.stage("inference", rows_in=len(df)):
+        if update is not None:
+            inference = inference_from_summary(
+                update.accumulator.to_frame(), n_total=update.accumulator.n_total,
+            )
+        else:
+            inference = compute_inference(df)
+        if bootstrap > 0:
+            try:
+                inference.bootstrap = bootstrap_28d(df, bootstrap, seed=bootstrap_seed)
+            except ValueError as exc:
+                log.warning("%s", exc)
+
+    # ── Pasos 5-10: grafo de etapas ───────────────────────────────────────
+    # ANOVA y modelo solo dependen del DataFrame; gráficos y
+    # reportes esperan a sus entradas. Con stage_workers > 1 las ramas
+    # independientes se ejecutan en paralelo.
+    txt_path = PROJECT_ROOT / "Reporte_Control_Calidad_Grout.txt"
+    stages = [
+        PipelineStage("anova_edad",       partial(perform_anova, factor="Edad_Dias"),  ("df",)),
+        PipelineStage("anova_estructura", partial(perform_anova, factor="Estructura"), ("df",)),
+        PipelineStage("plot_paths", partial(generate_plots, output_dir=SCRIPT_DIR,
+                              workers=plot_workers, cache=plot_cache),
+                      ("df", "pred_model", "anova_edad", "anova_estructura")),
+        PipelineStage("report_text", partial(generate_text_report, output_path=txt_path),
+                      ("inference", "anova_edad", "anova_estructura", "pred_model")),
+    ]
+    if update is not None:
+        stages.append(PipelineStage("pred_model", _train_model_from_sums, ("sums",)))
+    else:
+        stages.append(PipelineStage("pred_model", _train_model, ("df",)))
+    if spc:
+        stages.append(PipelineStage(
+            "spc",
+            partial(run_spc, db_path=db_path, chart_dir=None if skip_pdf else output_dir / "spc"),
+            ("spc_rows",),
+        ))
     if not skip_pdf:
-        log.info("[9/9] Generando reporte PDF...")
         pdf_path = SCRIPT_DIR / "Reporte_Ejecutivo_Grout.pdf"
-        generate_pdf_report(
-            inference, anova_edad, anova_estructura,
-            pred_model, plot_paths, txt_path, pdf_path,
-        )
-    else:
-        log.info("[9/9] Generacion de PDF omitida (--no-pdf).")
+        stages.append(PipelineStage(
+            "pdf",
+            partial(_pdf_stage, text_report_path=txt_path, output_path=pdf_path),
+            ("inference", "anova_edad", "anova_estructura", "pred_model", "plot_paths", "spc"),
+            after=("report_text",),
+        ))
+        if structure_reports:
+            stages.append(PipelineStage(
+                "structure_reports",
+                partial(generate_structure_reports, output_dir=output_dir / STRUCTURE_REPORT_DIR,
+                        workers=report_workers),
+                ("df",),
+            ))
+    if stage_executor == "thread" and stage_workers > 1:
+        # pyplot no es seguro entre hilos: las etapas que dibujan van en cadena
+        stages = _chain_stages(stages, PYPLOT_STAGES)
 
+    log.info(
+        "[5-10/10] ANOVA, modelo, graficos y reportes (%d etapa(s) simultaneas)...",
+        max(stage_workers, 1),
+    )
+    if skip_pdf:
+        log.info("Generacion de PDF omitida (--no-pdf).")
+    schedule = run_stages(
+        stages,
+        initial={
+            "df":        df,
+            "inference": inference,
+            "sums":      update.sums if update is not None else None,
+            "spc_rows":  spc_pending_rows(db_path, df, batch.new_rows) if spc else None,
+            **({} if spc else {"spc": None}),
+        },
+        workers=stage_workers,
+        executor=stage_executor,
+    )
+    trace.extend(schedule.metrics.values())
+    results = schedule.results
+    anova_edad, anova_estructura = results["anova_edad"], results["anova_estructura"]
+    pred_model, plot_paths       = results["pred_model"], results["plot_paths"]
+    _report_prediction(pred_model, predict_args)
+    print(f"\n{results['report_text']}\n")
+
+    _finish_trace(trace, own_tracemalloc, trace_path, trace_format)
     log.info("=" * 65)
     log.info("BLUE TECH — PIPELINE GROUT — COMPLETADO")
     log.info("=" * 65)
@@ -933,6 +3913,12 @@ def run_pipeline(
         "anova_estructura": anova_estructura,
         "pred_model":       pred_model,
         "plot_paths":       plot_paths,
+        "incremental":      update,
+        "anomalies":        anomalies,
+        "schedule":         schedule,
+        "trace":            trace,
+        "spc":              results["spc"],
+        "structure_reports": results.get("structure_reports", {}),
     }
 
 
@@ -985,6 +3971,21 @@ Ejemplos:
 
   python grout_pipeline.py -f datos.xlsx --output-dir ./resultados
       Guarda master CSV y reportes en carpeta personalizada.
+
+  python grout_pipeline.py -f *.xlsx --workers 4
+      Lee los archivos en paralelo con 4 procesos.
+
+  python grout_pipeline.py -f *.xlsx --rebuild-cache
+      Vacia las caches de parseo y graficos y vuelve a leer todos los libros.
+
+  python grout_pipeline.py -f ensayo_10.xlsx --incremental
+      Actualiza estadistica y modelo desde las sumas guardadas en SQLite y
+      regenera graficos y reportes unicamente si hubo probetas nuevas o
+      modificadas. El analisis cubre todo el historial de la BD.
+
+  python grout_pipeline.py -f *.xlsx --stage-workers 4
+      Ejecuta ANOVA, modelo, graficos y reportes en paralelo y
+      registra la ruta critica de las etapas.
         """,
     )
     parser.add_argument(
@@ -999,6 +4000,22 @@ Ejemplos:
         "--predict", nargs=2, metavar=("MPa", "EDAD"), type=float,
         help="Proyectar resistencia a 28d. Ejemplo: --predict 92 7",
     )
+    parser.add_argument(
+        "--predict-file", metavar="CSV", default=None,
+        help="Proyectar a 28d un CSV con Resistencia_MPa y Edad_Dias (sin -f usa el modelo de la BD).",
+    )
+    parser.add_argument(
+        "--predict-out", metavar="CSV", default=None,
+        help="Salida de --predict-file (default: <entrada>_proyeccion.csv).",
+    )
+    parser.add_argument(
+        "--predict-by", nargs="+", metavar="COLUMNA", default=None,
+        help="Usar un modelo por grupo (p. ej. Estructura Origen_Archivo) en --predict-file.",
+    )
+    parser.add_argument(
+        "--chunksize", metavar="N", type=int, default=50_000,
+        help="Filas por bloque al leer --predict-file (default: 50000).",
+    )
     parser.add_argument(
         "--output-dir", metavar="DIR", default=str(PROJECT_ROOT),
         help=f"Directorio de salida para CSV y reportes (default: raiz del proyecto).",
@@ -1007,9 +4024,87 @@ Ejemplos:
         "--db", metavar="RUTA_DB", default=None,
         help="Ruta al archivo SQLite (default: BlueTech_Grout.db en raiz del proyecto).",
     )
+    parser.add_argument(
+        "--workers", metavar="N", type=int, default=1,
+        help="Procesos para leer archivos en paralelo (default: 1, secuencial).",
+    )
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--no-cache", action="store_true",
+        help="No usar las caches de parseo ni de graficos.",
+    )
+    cache_group.add_argument(
+        "--rebuild-cache", action="store_true",
+        help="Vaciar las caches de parseo y graficos antes de cargar los archivos.",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Actualizar estadistica y modelo desde las sumas de la BD; sin "
+             "probetas nuevas o modificadas se conservan graficos y reportes.",
+    )
+    parser.add_argument(
+        "--stage-workers", metavar="N", type=int, default=1,
+        help="Etapas de analisis simultaneas (default: 1, secuencial).",
+    )
+    parser.add_argument(
+        "--stage-executor", choices=("thread", "process"), default="thread",
+        help="Hilos o procesos para las etapas paralelas (default: thread).",
+    )
+    parser.add_argument(
+        "--plot-workers", metavar="N", type=int, default=1,
+        help="Procesos para renderizar los graficos en paralelo (default: 1).",
+    )
+    parser.add_argument(
+        "--trace", metavar="ARCHIVO", default=None,
+        help="Guardar tiempos, CPU, memoria y filas de cada etapa en JSON.",
+    )
+    parser.add_argument(
+        "--trace-format", choices=("json", "chrome"), default="json",
+        help="Formato de --trace: json simple o Trace Event de Chrome (default: json).",
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="Medir el pico de memoria Python por etapa con tracemalloc (mas lento).",
+    )
+    parser.add_argument(
+        "--bootstrap", metavar="N", type=int, nargs="?", const=BOOTSTRAP_RESAMPLES, default=0,
+        help=f"Intervalos bootstrap de media, f'ck y aprobacion a 28d (default N: {BOOTSTRAP_RESAMPLES}).",
+    )
+    parser.add_argument(
+        "--seed", metavar="N", type=int, default=BOOTSTRAP_SEED,
+        help=f"Semilla del bootstrap (default: {BOOTSTRAP_SEED}).",
+    )
+    parser.add_argument(
+        "--no-spc", action="store_true",
+        help="No actualizar las cartas de control (X-R, EWMA, CUSUM) ni incluirlas en el PDF.",
+    )
+    parser.add_argument(
+        "--por-estructura", action="store_true",
+        help="Generar ademas un reporte PDF por Estructura (en <output-dir>/reportes_estructura).",
+    )
+    parser.add_argument(
+        "--report-workers", metavar="N", type=int, default=1,
+        help="Procesos para los reportes por estructura (default: 1).",
+    )
+    parser.add_argument(
+        "--csv", action="store_true",
+        help="Exportar tambien master_data_grout.csv (el maestro se guarda en columnas .npy).",
+    )
 
     args = parser.parse_args()
 
+    predict_src  = Path(args.predict_file) if args.predict_file else None
+    predict_dest = (
+        Path(args.predict_out) if args.predict_out
+        else predict_src.with_name(f"{predict_src.stem}_proyeccion.csv") if predict_src
+        else None
+    )
+    if predict_src and not args.files:
+        db_path = Path(args.db) if args.db else PROJECT_ROOT / "BlueTech_Grout.db"
+        pred_model = ModelBank.from_db(db_path, args.predict_by) if args.predict_by else load_model(db_path)
+        predict_file(pred_model, predict_src, predict_dest, chunksize=args.chunksize)
+        return
+
     # Obtener archivos: CLI o GUI
     if args.files:
         files = args.files
@@ -1021,13 +4116,35 @@ Ejemplos:
         log.error("No se seleccionaron archivos. Cancelando.")
         sys.exit(1)
 
-    run_pipeline(
+    result = run_pipeline(
         files=files,
         output_dir=Path(args.output_dir),
         db_path=Path(args.db) if args.db else None,
         skip_pdf=args.no_pdf,
         predict_args=tuple(args.predict) if args.predict else None,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        rebuild_cache=args.rebuild_cache,
+        incremental=args.incremental,
+        stage_workers=args.stage_workers,
+        stage_executor=args.stage_executor,
+        plot_workers=args.plot_workers,
+        trace_path=Path(args.trace) if args.trace else None,
+        trace_format=args.trace_format,
+        trace_memory=args.trace_memory,
+        export_csv=args.csv,
+        bootstrap=args.bootstrap,
+        bootstrap_seed=args.seed,
+        spc=not args.no_spc,
+        structure_reports=args.por_estructura,
+        report_workers=args.report_workers,
     )
+    if predict_src:
+        pred_model = (
+            ModelBank.from_frame(result["df"], args.predict_by) if args.predict_by
+            else result["pred_model"]
+        )
+        predict_file(pred_model, predict_src, predict_dest, chunksize=args.chunksize)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+"""
+master_store.py — Almacén columnar del maestro de roturas
+=========================================================
+Blue Tech | SikaGrout 9400 BR
+
+El maestro consolidado se guarda como un directorio con un .npy por columna
+y un manifest.json (MASTER_STORE_NAME). Los lectores abren cada columna con
+np.load(mmap_mode="r"): sin parsear texto ni copiar datos.
+
+Módulo aparte de grout_pipeline.py, que escribe el almacén, para que los
+scripts que solo lo leen (7_count.data.py, 5_Sql_grout.py) no carguen el
+pipeline completo (statsmodels, sklearn, seaborn, logging).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+MASTER_STORE_NAME     = "master_data_grout.cols"
+MASTER_CATEGORICAL    = ("Estructura", "Origen_Archivo", "Origen_Hoja")
+_MASTER_STORE_VERSION = 1
+_DATETIME_FMT         = "%Y-%m-%d %H:%M:%S"  # Mismo texto que las fechas en SQLite
+
+
+def write_master_store(df: pd.DataFrame, path: Path) -> Path:
+    """
+    Guarda `df` como un directorio con un .npy por columna y un manifest.json.
+
+    - Numéricas y datetime64: el array tal cual.
+    - MASTER_CATEGORICAL (y columnas category): códigos int32 (-1 = nulo) y
+      las categorías en el manifiesto.
+    - Resto (texto, fechas como objeto): array Unicode de ancho fijo con los
+      nulos como "" y una máscara `<i>.nulls.npy` si los hay.
+
+    Se escribe en un directorio temporal que luego sustituye al anterior,
+    así que un lector nunca ve un almacén a medio escribir.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=path.parent))
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            col = df[name]
+            meta: dict[str, Any] = {"name": str(name)}
+            if name in MASTER_CATEGORICAL or isinstance(col.dtype, pd.CategoricalDtype):
+                codes, categories = pd.factorize(col, sort=True)
+                np.save(tmp / f"{i}.npy", codes.astype(np.int32))
+                meta.update(kind="category", categories=[str(c) for c in categories])
+            elif (pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col)) \
+                    or pd.api.types.is_datetime64_dtype(col):
+                np.save(tmp / f"{i}.npy", col.to_numpy())
+                meta.update(kind="array")
+            else:
+                nulls = col.isna().to_numpy()
+                text = col.map(
+                    lambda v: v.strftime(_DATETIME_FMT) if isinstance(v, datetime) else str(v)
+                )
+                np.save(tmp / f"{i}.npy", np.where(nulls, "", text.to_numpy(dtype=str)).astype(str))
+                if nulls.any():
+                    np.save(tmp / f"{i}.nulls.npy", nulls)
+                meta.update(kind="text", nulls=bool(nulls.any()))
+            columns.append(meta)
+
+        (tmp / "manifest.json").write_text(
+            json.dumps({"version": _MASTER_STORE_VERSION, "n_rows": len(df), "columns": columns}),
+            encoding="utf-8",
+        )
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+
+class MasterStore:
+    """
+    Lector del almacén escrito por `write_master_store()`.
+
+    Con mmap=True (default) cada columna se abre con np.load(mmap_mode="r"):
+    `column()` no copia ni parsea nada y solo se leen del disco las páginas
+    que se usan. `to_frame()` construye un DataFrame con las columnas pedidas.
+    """
+
+    def __init__(self, path: Path, mmap: bool = True):
+        self.path = Path(path)
+        self.manifest = json.loads((self.path / "manifest.json").read_text(encoding="utf-8"))
+        if self.manifest.get("version") != _MASTER_STORE_VERSION:
+            raise ValueError(f"Version de almacen no soportada: {self.manifest.get('version')}")
+        self._mmap_mode = "r" if mmap else None
+        self._index = {meta["name"]: i for i, meta in enumerate(self.manifest["columns"])}
+
+    def __len__(self) -> int:
+        return int(self.manifest["n_rows"])
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._index)
+
+    def _load(self, fname: str) -> np.ndarray:
+        return np.load(self.path / fname, mmap_mode=self._mmap_mode, allow_pickle=False)
+
+    def column(self, name: str) -> np.ndarray | pd.Categorical:
+        """Array de la columna: ndarray (mapeado) o pd.Categorical sobre los códigos mapeados."""
+        i = self._index[name]
+        meta = self.manifest["columns"][i]
+        values = self._load(f"{i}.npy")
+        if meta["kind"] == "category":
+            return pd.Categorical.from_codes(values, categories=meta["categories"])
+        return values
+
+    def count(self, name: str) -> int:
+        """Valores no nulos de la columna, contados sobre el array mapeado."""
+        i = self._index[name]
+        meta = self.manifest["columns"][i]
+        values = self._load(f"{i}.npy")
+        if meta["kind"] == "category":
+            return int(np.count_nonzero(values >= 0))
+        if meta["kind"] == "text":
+            nulls = self._load(f"{i}.nulls.npy") if meta["nulls"] else None
+            return len(values) - (int(np.count_nonzero(nulls)) if nulls is not None else 0)
+        if values.dtype.kind == "f":
+            return int(np.count_nonzero(~np.isnan(values)))
+        if values.dtype.kind == "M":
+            return int(np.count_nonzero(~np.isnat(values)))
+        return len(values)
+
+    def to_frame(self, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """DataFrame con `columns` (default: todas); texto y categorías como object, nulos NaN."""
+        data: dict[str, Any] = {}
+        for name in (self.columns if columns is None else columns):
+            i = self._index[name]
+            meta = self.manifest["columns"][i]
+            values = self.column(name)
+            if meta["kind"] == "category":
+                values = np.asarray(values, dtype=object)
+            elif meta["kind"] == "text":
+                values = values.astype(object)
+                if meta["nulls"]:
+                    values[self._load(f"{i}.nulls.npy")] = np.nan
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def open_master_store(path: Path, mmap: bool = True) -> MasterStore:
+    """Abre el almacén columnar del maestro (ver `write_master_store()`)."""
+    return MasterStore(path, mmap=mmap)
@@ -35,25 +35,17 @@ def run_prices_scraper():
             print(f"[Scraper] {msg}")
 
         logic = ScraperLogic(log_capture)
-        # Using the logic methods directly
-        all_data = []
 
-        # Run for all configured sources
-        data_tailoy = logic.scrape_tailoy("https://www.tailoy.com.bo/escolar.html")
-        all_data.extend(data_tailoy)
+        # Crawl every page of all configured stores in parallel; products are
+        # saved in batches as they arrive
+        conteos, (success, msg) = logic.crawl_tiendas()
+        total = sum(conteos.values())
 
-        data_brasil = logic.scrape_libreria_brasil()
-        all_data.extend(data_brasil)
-
-        data_mat_bo = logic.scrape_materiales_bo()
-        all_data.extend(data_mat_bo)
-
-        if all_data:
-            success, msg = logic.db.save_data(all_data)
+        if total:
             return {
                 "status": "success",
-                "message": f"Se obtuvieron {len(all_data)} productos. {msg}",
-                "count": len(all_data),
+                "message": f"Se obtuvieron {total} productos. {msg}",
+                "count": total,
                 "logs": logs,
             }
         else:
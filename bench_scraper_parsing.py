@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+bench_scraper_parsing.py — Throughput de parseo por página de los scrapers
+==========================================================================
+
+Compara, sobre páginas sintéticas con el markup de cada tienda (menús,
+scripts y pie de página incluidos), cuántas páginas por segundo procesa
+cada parser con:
+
+  actual        html.parser, árbol completo, selectores como texto (camino anterior)
+  lxml          lxml, árbol completo, selectores compilados (crawler)
+  lxml+listado  lxml, solo el subárbol del listado, selectores compilados
+
+Verifica además que los tres modos extraen exactamente los mismos registros.
+
+Uso:
+  python bench_scraper_parsing.py
+  python bench_scraper_parsing.py --productos 96 --repeat 50
+  python bench_scraper_parsing.py --casos Tailoy Numbeo -o parsing.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).parent))
+import scraper_runner  # noqa: E402
+from sources import html_parsing  # noqa: E402
+from sources import numbeo_global  # noqa: E402
+
+MODOS = ("actual", "lxml", "lxml+listado")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PÁGINAS SINTÉTICAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _pagina(listado: str) -> str:
+    """Envuelve un listado con el resto de una página de tienda típica."""
+    menu = "".join(
+        f'<li class="menu-item"><a href="/c/{i}">Categoria {i}</a><ul class="sub-menu">'
+        + "".join(f'<li><a href="/c/{i}/{j}">Sub {j}</a></li>' for j in range(6))
+        + "</ul></li>"
+        for i in range(40)
+    )
+    script = "<script>window.dataLayer=[" + ",".join(['{"e":"view"}'] * 1500) + "];</script>"
+    return (
+        f'<!DOCTYPE html><html><head><title>Escolar</title>{script}'
+        f'<link rel="next" href="?p=2"></head><body>'
+        f'<header><nav><ul class="menu">{menu}</ul></nav></header>'
+        f'<main><div class="toolbar">Ordenar por</div>{listado}</main>'
+        f'<footer><ul class="menu">{menu}</ul></footer>{script}</body></html>'
+    )
+
+
+def pagina_tailoy(n: int) -> str:
+    items = "".join(
+        f'<li class="item product product-item"><div class="product-item-info">'
+        f'<img class="product-image-photo" src="/img/{i}.jpg" alt="Cuaderno {i}"/>'
+        f'<strong class="product-item-name"><a class="product-item-link" href="/p/{i}.html">'
+        f'Cuaderno universitario {i} 100 hojas</a></strong>'
+        f'<div class="price-box"><span data-price-type="finalPrice">'
+        f'<span class="price">Bs {i}.50</span></span></div>'
+        f'<button class="action tocart primary">Agregar</button></div></li>'
+        for i in range(n)
+    )
+    return _pagina(f'<ol class="products list items product-items">{items}</ol>')
+
+
+def pagina_libreria_brasil(n: int) -> str:
+    items = "".join(
+        f'<li class="product type-product post-{i} status-publish instock">'
+        f'<a href="/producto/{i}/" class="woocommerce-LoopProduct-link">'
+        f'<img src="/img/{i}.jpg"/><h2 class="woocommerce-loop-product__title">'
+        f'Lapiz HB {i}</h2><span class="price"><span class="woocommerce-Price-amount amount">'
+        f'<bdi>{i},50&nbsp;<span class="woocommerce-Price-currencySymbol">Bs.</span>'
+        f'</bdi></span></span></a><a href="?add-to-cart={i}" class="button">Añadir</a></li>'
+        for i in range(n)
+    )
+    return _pagina(f'<ul class="products columns-4">{items}</ul>')
+
+
+def pagina_materiales_bo(n: int) -> str:
+    items = "".join(
+        f'<div class="col-md-3"><div class="main_box"><div class="box_1">'
+        f'<img src="/img/{i}.jpg"/></div><div class="desc"><h5><a href="/products/{i}">'
+        f'Mochila escolar {i}</a></h5><div class="price"><span class="money">'
+        f'Bs {i},90</span></div></div></div></div>'
+        for i in range(n)
+    )
+    return _pagina(f'<div class="row products">{items}</div>')
+
+
+def pagina_numbeo(n: int) -> str:
+    rows = "".join(
+        f'<tr><td>{i + 1}</td><td><a href="/country/{i}">Country {i}</a></td>'
+        f'<td style="text-align: right">{1000 + i * 13.37:,.2f}</td>'
+        f'<td><div class="bar" style="width:{i}px"></div></td></tr>'
+        for i in range(n)
+    )
+    tabla = (
+        '<table id="t2" class="stripe"><thead><tr><th>Rank</th><th>Country</th>'
+        f"<th>Price</th><th></th></tr></thead><tbody>{rows}</tbody></table>"
+    )
+    return _pagina(tabla)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MODOS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _selectores_texto():
+    return {
+        tienda: {k: sel.pattern for k, sel in selectores.items()}
+        for tienda, selectores in scraper_runner.SELECTORES.items()
+    }
+
+
+@contextmanager
+def modo(nombre: str):
+    """Configura selectores y construcción del árbol según el modo."""
+    compilados = scraper_runner.SELECTORES
+    make_soup = numbeo_global.make_soup
+    if nombre == "actual":
+        scraper_runner.SELECTORES = _selectores_texto()
+        numbeo_global.make_soup = lambda markup, only=None: BeautifulSoup(markup, "html.parser")
+    elif nombre == "lxml":
+        numbeo_global.make_soup = lambda markup, only=None: make_soup(markup)
+    try:
+        yield
+    finally:
+        scraper_runner.SELECTORES = compilados
+        numbeo_global.make_soup = make_soup
+
+
+def caso_tienda(logic, tienda: str):
+    t = scraper_runner.TIENDAS[tienda]
+    parse = getattr(logic, t.parser)
+
+    def run(html: str, nombre_modo: str):
+        if nombre_modo == "actual":
+            soup = BeautifulSoup(html, "html.parser")
+        elif nombre_modo == "lxml":
+            soup = html_parsing.make_soup(html)
+        else:
+            soup = html_parsing.make_soup(html, only=t.listado)
+        return parse(soup)
+
+    return run
+
+
+def caso_numbeo():
+    scraper = numbeo_global.NumbeoGlobalScraper()
+    return lambda html, nombre_modo: scraper.format_data(html)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EJECUCIÓN
+# ─────────────────────────────────────────────────────────────────────────────
+
+def measure(func, repeat: int) -> float:
+    """Mejor tiempo (s) de `repeat` ejecuciones tras un calentamiento."""
+    func()
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return best
+
+
+def run_benchmarks(casos, productos: int, repeat: int) -> list:
+    logic = scraper_runner.ScraperLogic(lambda msg: None)
+    disponibles = {
+        "Tailoy": (pagina_tailoy, caso_tienda(logic, "Tailoy")),
+        "Libreria Brasil": (pagina_libreria_brasil, caso_tienda(logic, "Libreria Brasil")),
+        "Materiales BO": (pagina_materiales_bo, caso_tienda(logic, "Materiales BO")),
+        "Numbeo": (pagina_numbeo, caso_numbeo()),
+    }
+    results = []
+    for caso in casos:
+        generar, run = disponibles[caso]
+        html = generar(productos)
+        salidas = {}
+        for nombre_modo in MODOS:
+            with modo(nombre_modo):
+                salidas[nombre_modo] = run(html, nombre_modo)
+                seconds = measure(lambda: run(html, nombre_modo), repeat)
+            results.append({
+                "caso": caso,
+                "modo": nombre_modo,
+                "kb": round(len(html.encode()) / 1024, 1),
+                "items": len(salidas[nombre_modo]),
+                "ms_pagina": round(seconds * 1000, 2),
+                "paginas_s": round(1 / seconds, 1),
+            })
+        if any(salida != salidas["actual"] for salida in salidas.values()):
+            raise SystemExit(f"ERROR: {caso}: los modos extraen registros distintos")
+    return results
+
+
+def print_results(results: list) -> None:
+    base = {r["caso"]: r["ms_pagina"] for r in results if r["modo"] == "actual"}
+    print(f"{'Caso':<16} {'Modo':<13} {'KB':>6} {'Items':>6} {'ms/pág':>8} {'pág/s':>7} {'x':>6}")
+    for r in results:
+        speedup = base[r["caso"]] / r["ms_pagina"]
+        print(
+            f"{r['caso']:<16} {r['modo']:<13} {r['kb']:>6} {r['items']:>6} "
+            f"{r['ms_pagina']:>8} {r['paginas_s']:>7} {speedup:>5.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de parseo HTML de los scrapers.")
+    parser.add_argument(
+        "--casos", nargs="+", default=["Tailoy", "Libreria Brasil", "Materiales BO", "Numbeo"],
+        help="Casos a medir (default: todos).",
+    )
+    parser.add_argument("--productos", type=int, default=48, help="Productos/filas por página (default: 48).")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por modo (default: 20).")
+    parser.add_argument("-o", "--output", metavar="JSON", help="Guardar resultados en JSON.")
+    args = parser.parse_args()
+
+    print(f"Parser disponible: {html_parsing.PARSER}")
+    results = run_benchmarks(args.casos, args.productos, args.repeat)
+    print_results(results)
+
+    if args.output:
+        payload = {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "parser": html_parsing.PARSER,
+            "productos": args.productos,
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
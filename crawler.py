@@ -0,0 +1,234 @@
+"""
+Crawler de páginas de categoría para las tiendas de scraper_runner.
+
+A partir de la URL de categoría de cada tienda sigue los enlaces de
+paginación (rel="next", "Siguiente", ?page=N...) y, si la tienda lo define,
+los enlaces a subcategorías. Las páginas se descargan en paralelo con una
+frontera acotada y un conjunto de URLs visitadas, respetando por host el
+mismo HostLimit (concurrencia + token bucket) que sources.fetch_engine, y
+los productos de cada
+página se entregan al `sink` (p. ej. DatabaseManager.batch_writer()) en
+cuanto se parsean, sin acumular el catálogo completo en memoria.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+from bs4 import BeautifulSoup
+from soupsieve import SoupSieve
+
+from sources.fetch_engine import HostLimit, TokenBucket
+from sources.html_parsing import css, make_soup
+
+# Selectores de "página siguiente" de las plataformas usadas por las tiendas
+# (Magento, WooCommerce, Shopify) y el genérico rel="next".
+NEXT_SELECTORS = (
+    'link[rel="next"]',
+    'a[rel="next"]',
+    "a.next",
+    "a.action.next",
+    "a.next.page-numbers",
+    ".pagination a.next",
+    ".pagination__next",
+)
+MAX_PAGES = 50  # páginas por tienda
+FRONTIER_SIZE = 200  # URLs pendientes como máximo
+WORKERS = 4  # descargas simultáneas (entre todas las tiendas)
+HOST_LIMIT = HostLimit()  # por tienda: 2 descargas a la vez, 1 página/s
+
+
+@dataclass
+class CrawlTarget:
+    """Una tienda a recorrer."""
+
+    nombre: str
+    start_url: str
+    fetch: Callable[[str], bytes]  # descarga (con la sesión y headers de la tienda)
+    parse: Callable[[BeautifulSoup], List[Dict]]  # productos de una página
+    follow: Optional[str] = None  # selector CSS de enlaces a subcategorías
+    max_pages: int = MAX_PAGES
+    host: str = field(init=False)
+    scope: str = field(init=False)  # ruta de la categoría, sin extensión ni "/" final
+    links: SoupSieve = field(init=False)
+
+    def __post_init__(self):
+        parts = urlsplit(self.start_url)
+        path = parts.path
+        if "." in path.rsplit("/", 1)[-1]:
+            path = path.rsplit(".", 1)[0]
+        self.host = parts.netloc.lower()
+        self.scope = path.rstrip("/")
+        # Paginación + subcategorías en un solo selector compilado
+        selectors = list(NEXT_SELECTORS)
+        if self.follow:
+            selectors.append(self.follow)
+        self.links = css(", ".join(selectors))
+
+
+def normalize_url(url: str) -> str:
+    """Quita el fragmento y normaliza esquema/host para la deduplicación."""
+    url, _ = urldefrag(url)
+    parts = urlsplit(url)
+    rest = url[len(f"{parts.scheme}://{parts.netloc}") :]
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{rest}"
+
+
+def in_scope(url: str, target: CrawlTarget) -> bool:
+    """
+    Mismo host y ruta bajo la categoría inicial: "/escolar" cubre
+    "/escolar", "/escolar.html?p=2" y "/escolar/cuadernos", pero no
+    "/escolares-ofertas".
+    """
+    parts = urlsplit(url)
+    if parts.netloc.lower() != target.host:
+        return False
+    path = parts.path.rstrip("/")
+    return path == target.scope or path.startswith(
+        (target.scope + "/", target.scope + ".")
+    )
+
+
+def discover_links(soup: BeautifulSoup, base_url: str, target: CrawlTarget) -> List[str]:
+    """Enlaces de paginación y subcategorías dentro del alcance de la tienda."""
+    links = []
+    for elem in target.links.select(soup):
+        href = elem.get("href")
+        if not href or href.startswith(("javascript:", "mailto:", "#")):
+            continue
+        url = normalize_url(urljoin(base_url, href))
+        if in_scope(url, target):
+            links.append(url)
+    return links
+
+
+class StoreCrawler:
+    """
+    Recorre varias tiendas a la vez. Descarga y parseo corren en un pool de
+    hilos; la frontera, el conjunto de visitadas, los límites por host y las
+    llamadas a `sink` se manejan solo en el hilo que llama a crawl(), sin
+    locks.
+
+    Cada host tiene un HostLimit (`host_limits`, o `default_limit` /
+    HOST_LIMIT): como máximo `concurrency` descargas a la vez y un ritmo de
+    `rate` páginas por segundo, así `workers` no cae entero sobre una tienda.
+    """
+
+    def __init__(
+        self,
+        log=print,
+        workers=WORKERS,
+        frontier_size=FRONTIER_SIZE,
+        default_limit: Optional[HostLimit] = None,
+        host_limits: Optional[Dict[str, HostLimit]] = None,
+    ):
+        self.log = log
+        self.workers = workers
+        self.frontier_size = frontier_size
+        self.default_limit = default_limit
+        self.host_limits = {host.lower(): limit for host, limit in (host_limits or {}).items()}
+
+    @staticmethod
+    def _process(target: CrawlTarget, url: str):
+        # Árbol completo: los enlaces de paginación están fuera del listado
+        soup = make_soup(target.fetch(url))
+        return target.parse(soup), discover_links(soup, url, target)
+
+    def crawl(
+        self,
+        targets: List[CrawlTarget],
+        sink: Callable[[List[Dict]], object],
+    ) -> Dict[str, int]:
+        """
+        Recorre `targets` entregando los productos de cada página a `sink`.
+
+        Returns:
+            {tienda: productos encontrados}.
+        """
+        frontier = deque()
+        visited = set()
+        pages = {t.nombre: 0 for t in targets}  # descargadas y parseadas
+        inflight = {t.nombre: 0 for t in targets}
+        items = {t.nombre: 0 for t in targets}
+        dropped = failed = 0
+        limits = {
+            t.host: self.host_limits.get(t.host, self.default_limit or HOST_LIMIT)
+            for t in targets
+        }
+        buckets = {host: TokenBucket(limit.rate, limit.burst) for host, limit in limits.items()}
+        host_inflight = dict.fromkeys(limits, 0)
+
+        def enqueue(target, url):
+            nonlocal dropped
+            if url in visited or pages[target.nombre] >= target.max_pages:
+                return
+            if len(frontier) >= self.frontier_size:
+                dropped += 1
+                return
+            visited.add(url)
+            frontier.append((target, url))
+
+        for target in targets:
+            self.log(f"Iniciando crawl de {target.nombre}: {target.start_url}")
+            enqueue(target, normalize_url(target.start_url))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while frontier or running:
+                pause = None  # segundos hasta el próximo token de un host en espera
+                for _ in range(len(frontier)):
+                    if len(running) >= self.workers:
+                        break
+                    target, url = frontier.popleft()
+                    # El presupuesto se descuenta al descargar, no al encolar:
+                    # las páginas que fallan no lo consumen
+                    if pages[target.nombre] + inflight[target.nombre] >= target.max_pages:
+                        visited.discard(url)
+                        continue
+                    if host_inflight[target.host] >= limits[target.host].concurrency:
+                        frontier.append((target, url))
+                        continue
+                    delay = buckets[target.host].try_acquire()
+                    if delay:
+                        pause = delay if pause is None else min(pause, delay)
+                        frontier.append((target, url))
+                        continue
+                    inflight[target.nombre] += 1
+                    host_inflight[target.host] += 1
+                    running[pool.submit(self._process, target, url)] = (target, url)
+                if not running:
+                    if pause is None:
+                        break
+                    time.sleep(pause)
+                    continue
+                done, _ = wait(running, timeout=pause, return_when=FIRST_COMPLETED)
+                for future in done:
+                    target, url = running.pop(future)
+                    inflight[target.nombre] -= 1
+                    host_inflight[target.host] -= 1
+                    try:
+                        products, links = future.result()
+                    except Exception as e:
+                        failed += 1
+                        self.log(f"Error en {target.nombre} ({url}): {e}")
+                        continue
+                    pages[target.nombre] += 1
+                    if products:
+                        sink(products)
+                        items[target.nombre] += len(products)
+                    for link in links:
+                        enqueue(target, link)
+
+        for target in targets:
+            self.log(
+                f"{target.nombre}: {items[target.nombre]} items en "
+                f"{pages[target.nombre]} pagina(s)."
+            )
+        if failed:
+            self.log(f"{failed} pagina(s) con error, no contadas en max_pages.")
+        if dropped:
+            self.log(f"Frontera llena: {dropped} enlace(s) descartados.")
+        return items
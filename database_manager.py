@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+import tempfile
 
 
 class DatabaseManager:
@@ -17,80 +18,91 @@ class DatabaseManager:
         Schema esperado: {'Fuente', 'Material', 'Precio_BS', 'Fecha_Consulta'}
         """
         try:
-            df_nuevos = pd.DataFrame(data_list)
-
-            # Asegurar orden de columnas
-            cols_deseadas = [
-                "Fuente",
-                "Material",
-                "Precio",
-                "Moneda",
-                "Unidad",
-                "Precio_BS",
-                "Fecha_Consulta",
-            ]
-
-            # Normalizar datos de entrada
-            for idx, row in df_nuevos.iterrows():
-                # Backward compatibility for Precio_BS -> Precio + Moneda=BOB
-                if (
-                    "Precio_BS" in row
-                    and pd.notna(row["Precio_BS"])
-                    and ("Precio" not in row or pd.isna(row["Precio"]))
-                ):
-                    df_nuevos.at[idx, "Precio"] = row["Precio_BS"]
-                    if "Moneda" not in row or pd.isna(row["Moneda"]):
-                        df_nuevos.at[idx, "Moneda"] = "BOB"
-
-                # Forward compatibility: If we have Price but no Precio_BS, leave Precio_BS as NaN or 0?
-                # Let's leave it as is, visualisation tools might need updates.
-
-                # Map incoming fields to database schema
-                if "currency" in row:
-                    df_nuevos.at[idx, "Moneda"] = row["currency"]
-                if "unit" in row:
-                    df_nuevos.at[idx, "Unidad"] = row["unit"]
-                if "price" in row:
-                    df_nuevos.at[idx, "Precio"] = row["price"]
-                if "source" in row:
-                    df_nuevos.at[idx, "Fuente"] = row["source"]
-                if "material" in row:
-                    df_nuevos.at[idx, "Material"] = row["material"]
-                if "date" in row:
-                    df_nuevos.at[idx, "Fecha_Consulta"] = row["date"]
-
-            # Rellenar si falta alguna
-            for col in cols_deseadas:
-                if col not in df_nuevos.columns:
-                    df_nuevos[col] = "N/A"
-
-            df_nuevos = df_nuevos[cols_deseadas]
-
-            if os.path.exists(self.filename):
-                # Leemos todo el histórico del Excel para añadir lo nuevo
-                df_existente = pd.read_excel(self.filename)
-                df_final = pd.concat([df_existente, df_nuevos], ignore_index=True)
-            else:
-                df_final = df_nuevos
-
-            # Verificar tipos para evitar errores en streamlit
-            df_final["Precio_BS"] = pd.to_numeric(
-                df_final["Precio_BS"], errors="coerce"
-            ).fillna(0)
-
-            # Guardar Excel
-            df_final.to_excel(self.filename, index=False)
-
-            # Guardar CSV (Separador decimal punto)
-            df_final.to_csv(self.csv_filename, index=False, decimal=".")
-
-            return (
-                True,
-                f"Guardados {len(df_nuevos)} registros en {self.filename} y {self.csv_filename}",
-            )
+            return self._merge(self.normalize_data(data_list))
         except Exception as e:
             return False, str(e)
 
+    def batch_writer(self, staging_filename=None):
+        """Escritor incremental (ver BatchWriter) sobre este Excel/CSV maestro."""
+        return BatchWriter(self, staging_filename)
+
+    def normalize_data(self, data_list):
+        """Convierte una lista de diccionarios al schema de columnas del maestro."""
+        df_nuevos = pd.DataFrame(data_list)
+
+        # Asegurar orden de columnas
+        cols_deseadas = [
+            "Fuente",
+            "Material",
+            "Precio",
+            "Moneda",
+            "Unidad",
+            "Precio_BS",
+            "Fecha_Consulta",
+        ]
+
+        # Normalizar datos de entrada
+        for idx, row in df_nuevos.iterrows():
+            # Backward compatibility for Precio_BS -> Precio + Moneda=BOB
+            if (
+                "Precio_BS" in row
+                and pd.notna(row["Precio_BS"])
+                and ("Precio" not in row or pd.isna(row["Precio"]))
+            ):
+                df_nuevos.at[idx, "Precio"] = row["Precio_BS"]
+                if "Moneda" not in row or pd.isna(row["Moneda"]):
+                    df_nuevos.at[idx, "Moneda"] = "BOB"
+
+            # Forward compatibility: If we have Price but no Precio_BS, leave Precio_BS as NaN or 0?
+            # Let's leave it as is, visualisation tools might need updates.
+
+            # Map incoming fields to database schema
+            if "currency" in row:
+                df_nuevos.at[idx, "Moneda"] = row["currency"]
+            if "unit" in row:
+                df_nuevos.at[idx, "Unidad"] = row["unit"]
+            if "price" in row:
+                df_nuevos.at[idx, "Precio"] = row["price"]
+            if "source" in row:
+                df_nuevos.at[idx, "Fuente"] = row["source"]
+            if "material" in row:
+                df_nuevos.at[idx, "Material"] = row["material"]
+            if "date" in row:
+                df_nuevos.at[idx, "Fecha_Consulta"] = row["date"]
+
+        # Rellenar si falta alguna
+        for col in cols_deseadas:
+            if col not in df_nuevos.columns:
+                df_nuevos[col] = "N/A"
+
+        df_nuevos = df_nuevos[cols_deseadas]
+        return df_nuevos
+
+    def _merge(self, df_nuevos):
+        """Añade registros ya normalizados al histórico y reescribe Excel y CSV."""
+        if os.path.exists(self.filename):
+            # Leemos todo el histórico del Excel para añadir lo nuevo
+            df_existente = pd.read_excel(self.filename)
+            df_final = pd.concat([df_existente, df_nuevos], ignore_index=True)
+        else:
+            df_final = df_nuevos
+
+        # Verificar tipos para evitar errores en streamlit
+        df_final["Precio_BS"] = pd.to_numeric(
+            df_final["Precio_BS"], errors="coerce"
+        ).fillna(0)
+
+        # Guardar Excel
+        df_final.to_excel(self.filename, index=False)
+
+        # Guardar CSV (Separador decimal punto)
+        df_final.to_csv(self.csv_filename, index=False, decimal=".")
+
+        return (
+            True,
+            f"Guardados {len(df_nuevos)} registros en {self.filename} y {self.csv_filename}",
+        )
+
     @staticmethod
     def clean_price(price_str, decimal_separator="."):
         """
@@ -121,3 +133,69 @@ class DatabaseManager:
             return float(text)
         except:
             return 0.0
+
+
+class BatchWriter:
+    """
+    Escritura incremental para scrapers que entregan productos por lotes.
+
+    Cada lote se normaliza y se agrega a un CSV de staging en cuanto llega,
+    sin acumularlo en memoria; close() consolida todo de una sola vez en el
+    Excel y el CSV maestros (el Excel no admite append, así que reescribirlo
+    por lote haría el costo cuadrático). Como context manager, lo ya escrito
+    se consolida aunque el scraping termine con error.
+
+    Cada escritor usa su propio archivo de staging (temporal, junto al CSV
+    maestro), así que dos ejecuciones simultáneas (GUI y Flask) no se pisan
+    los lotes.
+    """
+
+    def __init__(self, db, staging_filename=None):
+        self.db = db
+        self.count = 0
+        self.result = None
+        if staging_filename:
+            self.staging_filename = staging_filename
+            if os.path.exists(self.staging_filename):
+                os.remove(self.staging_filename)
+            return
+        directory = os.path.dirname(db.csv_filename) or "."
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=directory,
+            prefix=f"{os.path.basename(db.csv_filename)}.",
+            suffix=".staging",
+            delete=False,
+        ) as staging:
+            self.staging_filename = staging.name
+
+    def write(self, data_list):
+        if not data_list:
+            return 0
+        df = self.db.normalize_data(data_list)
+        df.to_csv(self.staging_filename, mode="a", header=self.count == 0, index=False)
+        self.count += len(df)
+        return len(df)
+
+    def close(self):
+        if self.result is not None:
+            return self.result
+        if self.count == 0:
+            if os.path.exists(self.staging_filename):
+                os.remove(self.staging_filename)
+            self.result = (False, "No se recolectaron datos.")
+            return self.result
+        try:
+            # "N/A" es el relleno de columnas faltantes: no debe leerse como NaN
+            df = pd.read_csv(self.staging_filename, keep_default_na=False, na_values=[""])
+            self.result = self.db._merge(df)
+            os.remove(self.staging_filename)
+        except Exception as e:
+            self.result = (False, str(e))
+        return self.result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
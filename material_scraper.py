@@ -3,6 +3,7 @@ import pandas as pd
 from datetime import datetime
 from sources.static_data import StaticDataSource
 from sources.numbeo_global import NumbeoGlobalScraper
+from sources.fetch_engine import run_sources
 
 # Define the output directory and file
 DATA_DIR = "data"
@@ -21,16 +22,17 @@ def main():
 
     all_data = []
 
-    # 2. Fetch Data
-    for source in sources:
+    # 2. Fetch Data (all sources concurrently)
+    for source, result in zip(sources, run_sources(sources)):
         try:
-            print(f"Fetching from {source.__class__.__name__}...")
-            raw_data = source.fetch_prices()
-            formatted_data = source.format_data(raw_data)
+            print(f"Fetching from {result.name}...")
+            if not result.ok:
+                raise result.error
+            formatted_data = source.format_data(result.raw)
             all_data.extend(formatted_data)
             print(f"  -> {len(formatted_data)} records found.")
         except Exception as e:
-            print(f"  [ERROR] Failed to fetch from {source.__class__.__name__}: {e}")
+            print(f"  [ERROR] Failed to fetch from {result.name}: {e}")
 
     # 3. Save to CSV
     if all_data:
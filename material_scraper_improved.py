@@ -5,7 +5,7 @@ Material Price Scraper
 Script para recolectar precios de materiales de construcción de múltiples fuentes.
 
 Características:
-- Scraping de múltiples fuentes de datos
+- Scraping concurrente de múltiples fuentes de datos (asyncio, límites por host)
 - Validación de datos recolectados
 - Backup automático de datos anteriores
 - Logging detallado
@@ -25,6 +25,7 @@ from datetime import datetime
 from pathlib import Path
 from sources.static_data import StaticDataSource
 from sources.numbeo_global import NumbeoGlobalScraper
+from sources.fetch_engine import run_sources
 
 # --- Logging Configuration ---
 logging.basicConfig(
@@ -235,17 +236,22 @@ def main():
     errors = []
     source_stats = {}
 
-    # 2. Fetch Data from each source
-    for source in sources:
-        source_name = source.__class__.__name__
+    # 2. Fetch Data from all sources concurrently
+    logger.info(f"📡 Fetching from {len(sources)} source(s) concurrently...")
+    results = run_sources(sources)
+
+    for source, result in zip(sources, results):
+        source_name = result.name
 
         try:
             logger.info(f"\n{'─'*60}")
-            logger.info(f"📡 Fetching from: {source_name}")
+            logger.info(f"📡 Results from: {source_name} ({result.seconds:.2f}s)")
             logger.info(f"{'─'*60}")
 
-            # Fetch raw data
-            raw_data = source.fetch_prices()
+            if not result.ok:
+                raise result.error
+
+            raw_data = result.raw
             logger.info(f"  ➜ Raw data fetched: {len(raw_data)} items")
 
             # Format data
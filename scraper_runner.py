@@ -1,144 +1,258 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import requests
-from bs4 import BeautifulSoup
 import threading
 import datetime
 from datetime import datetime
 import random
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Optional
+from crawler import MAX_PAGES, CrawlTarget, StoreCrawler
 from database_manager import DatabaseManager
+from sources.fetch_engine import create_session
+from sources.html_parsing import css, make_soup
+
+# Tiempo máximo (conexión, lectura) por request, en segundos
+TIMEOUT = (5, 20)
+CHROME_UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+@dataclass
+class Tienda:
+    url: str  # página de categoría inicial
+    parser: str  # método _parse_* de ScraperLogic: soup de una página -> productos
+    listado: str  # selector simple de un producto; acota el parseo de una página
+    headers: dict = field(default_factory=lambda: {"User-Agent": CHROME_UA})
+    categorias: Optional[str] = None  # selector de enlaces a subcategorías (crawler)
+
+
+# Tiendas disponibles. Para agregar una tienda basta con un método _parse_*
+# y una entrada aquí.
+TIENDAS = {
+    "Tailoy": Tienda(
+        "https://www.tailoy.com.bo/escolar.html",
+        "_parse_tailoy",
+        ".product-item",
+        headers={"User-Agent": "Mozilla/5.0"},
+    ),
+    "Libreria Brasil": Tienda(
+        "https://libreriabrasil.com/categoria-producto/escolar/",
+        "_parse_libreria_brasil",
+        "li.product",
+        categorias=".product-categories a",
+    ),
+    "Materiales BO": Tienda(
+        "https://materiales.com.bo/collections/utiles-escolares",
+        "_parse_materiales_bo",
+        ".main_box",
+    ),
+}
+
+
+# Selectores CSS de cada tienda, compilados una sola vez. El de producto sale
+# de Tienda.listado, que también acota el parseo de una sola página.
+SELECTORES = {
+    "Tailoy": {
+        "producto": css(TIENDAS["Tailoy"].listado),
+        "titulo": css(".product-item-link"),
+        "precio_final": css('[data-price-type="finalPrice"] .price'),
+        "precio": css(".price"),
+    },
+    "Libreria Brasil": {
+        "producto": css(TIENDAS["Libreria Brasil"].listado),
+        "titulo": css(".woocommerce-loop-product__title"),
+        "precio": css(".price"),
+    },
+    "Materiales BO": {
+        "producto": css(TIENDAS["Materiales BO"].listado),
+        "titulo": css(".desc h5 a"),
+        "precio_money": css(".price .money"),
+        "precio": css(".price"),
+    },
+}
 
 
 class ScraperLogic:
-    def __init__(self, log_callback):
+    def __init__(self, log_callback, max_workers=None):
         self.log = log_callback
         self.db = DatabaseManager()
-
-    def scrape_tailoy(self, url):
-        self.log(f"Iniciando scrapeo de Tailoy: {url}")
-        headers = {"User-Agent": "Mozilla/5.0"}
-        data_batch = []
+        self.max_workers = max_workers or len(TIENDAS)
+        # Sesión compartida por todas las tiendas: conexiones keep-alive,
+        # reintentos con backoff exponencial ante errores de red o 429/5xx
+        self.session = create_session(pool_size=max(self.max_workers, 10))
+
+    def _get(self, url, headers):
+        response = self.session.get(url, headers=headers, timeout=TIMEOUT)
+        response.raise_for_status()
+        return response.content
+
+    def _scrape(self, nombre, url):
+        """Descarga una sola página de la tienda y devuelve sus productos."""
+        self.log(f"Iniciando scrapeo de {nombre}: {url}")
+        tienda = TIENDAS[nombre]
         try:
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.content, "html.parser")
-            products = soup.select(".product-item")
-
-            for product in products:
-                try:
-                    title = product.select_one(".product-item-link").get_text(
-                        strip=True
-                    )
-                    price_elem = product.select_one(
-                        '[data-price-type="finalPrice"] .price'
-                    ) or product.select_one(".price")
-                    price_txt = price_elem.get_text(strip=True) if price_elem else "0"
-
-                    price_val = self.db.clean_price(price_txt, decimal_separator=".")
-
-                    data_batch.append(
-                        {
-                            "Fuente": "Tailoy",
-                            "Material": title,
-                            "Precio_BS": price_val,
-                            "Fecha_Consulta": datetime.now().strftime("%Y-%m-%d"),
-                        }
-                    )
-                except Exception:
-                    continue
-            return data_batch
+            # Una sola página: basta con construir el árbol del listado
+            soup = make_soup(self._get(url, tienda.headers), only=tienda.listado)
+            return getattr(self, tienda.parser)(soup)
         except Exception as e:
-            self.log(f"Error en Tailoy: {e}")
+            self.log(f"Error en {nombre}: {e}")
             return []
 
+    def _crawl(self, tiendas, sink, max_pages):
+        nombres = list(TIENDAS) if tiendas is None else list(tiendas)
+        targets = [
+            CrawlTarget(
+                nombre,
+                TIENDAS[nombre].url,
+                fetch=partial(self._get, headers=TIENDAS[nombre].headers),
+                parse=getattr(self, TIENDAS[nombre].parser),
+                follow=TIENDAS[nombre].categorias,
+                max_pages=max_pages,
+            )
+            for nombre in nombres
+        ]
+        if not targets:
+            return {}
+        crawler = StoreCrawler(self.log, workers=max(self.max_workers, 4))
+        return crawler.crawl(targets, sink)
+
+    def scrape_tiendas(self, tiendas=None, max_pages=1):
+        """
+        Scrapea varias tiendas en paralelo y devuelve los productos en memoria
+        (por defecto solo la página inicial de cada una).
+
+        Args:
+            tiendas: Nombres de TIENDAS a consultar (None = todas).
+            max_pages: Páginas como máximo por tienda.
+
+        Returns:
+            (lista combinada de productos, {tienda: cantidad de items}),
+            lista para un único save_data().
+        """
+        all_data = []
+        conteos = self._crawl(tiendas, all_data.extend, max_pages)
+        return all_data, conteos
+
+    def crawl_tiendas(self, tiendas=None, max_pages=MAX_PAGES):
+        """
+        Recorre todas las páginas de categoría de las tiendas (paginación y
+        subcategorías) y va guardando los productos por lotes mientras llegan.
+
+        Args:
+            tiendas: Nombres de TIENDAS a recorrer (None = todas).
+            max_pages: Páginas como máximo por tienda.
+
+        Returns:
+            ({tienda: cantidad de items}, (éxito, mensaje) del guardado).
+        """
+        nombres = list(TIENDAS) if tiendas is None else list(tiendas)
+        if not nombres:
+            return {}, (True, "Sin tiendas seleccionadas")
+        with self.db.batch_writer() as writer:
+            conteos = self._crawl(nombres, writer.write, max_pages)
+        return conteos, writer.result
+
+    def scrape_tailoy(self, url):
+        return self._scrape("Tailoy", url)
+
     def scrape_libreria_brasil(
         self, url="https://libreriabrasil.com/categoria-producto/escolar/"
     ):
-        self.log(f"Iniciando scrapeo de Libreria Brasil: {url}")
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
-        data_batch = []
-        try:
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.content, "html.parser")
-            products = soup.select("li.product")
-
-            for product in products:
-                try:
-                    title_elem = product.select_one(".woocommerce-loop-product__title")
-                    title = (
-                        title_elem.get_text(strip=True) if title_elem else "Sin Nombre"
-                    )
-
-                    price_elem = product.select_one(".price")
-                    price_txt = price_elem.get_text(strip=True) if price_elem else "0"
-
-                    # Limpieza extra para 'Bs.' que a veces viene pegado
-                    price_txt = price_txt.replace("Bs.", "").replace("Bs", "").strip()
-
-                    price_val = self.db.clean_price(price_txt, decimal_separator=",")
-
-                    data_batch.append(
-                        {
-                            "Fuente": "Libreria Brasil",
-                            "Material": title,
-                            "Precio_BS": price_val,
-                            "Fecha_Consulta": datetime.now().strftime("%Y-%m-%d"),
-                        }
-                    )
-                except Exception:
-                    continue
-            return data_batch
-        except Exception as e:
-            self.log(f"Error en Libreria Brasil: {e}")
-            return []
+        return self._scrape("Libreria Brasil", url)
 
     def scrape_materiales_bo(
         self, url="https://materiales.com.bo/collections/utiles-escolares"
     ):
-        self.log(f"Iniciando scrapeo de Materiales BO: {url}")
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
+        return self._scrape("Materiales BO", url)
+
+    def _parse_tailoy(self, soup):
+        sel = SELECTORES["Tailoy"]
         data_batch = []
-        try:
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.content, "html.parser")
-            products = soup.select(".main_box")
-
-            for product in products:
-                try:
-                    title_elem = product.select_one(".desc h5 a")
-                    title = (
-                        title_elem.get_text(strip=True) if title_elem else "Sin Nombre"
-                    )
-
-                    # Intentar buscar .money primero, si no, usar .price completo
-                    price_elem = product.select_one(".price .money")
-                    if not price_elem:
-                        price_elem = product.select_one(".price")
-
-                    price_txt = price_elem.get_text(strip=True) if price_elem else "0"
-
-                    # Limpieza preliminar (el resto lo hace database_manager)
-                    price_txt = price_txt.replace("Desde", "").strip()
-
-                    price_val = self.db.clean_price(price_txt, decimal_separator=",")
-
-                    data_batch.append(
-                        {
-                            "Fuente": "Materiales BO",
-                            "Material": title,
-                            "Precio_BS": price_val,
-                            "Fecha_Consulta": datetime.now().strftime("%Y-%m-%d"),
-                        }
-                    )
-                except Exception:
-                    continue
-            return data_batch
-        except Exception as e:
-            self.log(f"Error en Materiales BO: {e}")
-            return []
+        for product in soup.select(sel["producto"]):
+            try:
+                title = product.select_one(sel["titulo"]).get_text(strip=True)
+                price_elem = product.select_one(
+                    sel["precio_final"]
+                ) or product.select_one(sel["precio"])
+                price_txt = price_elem.get_text(strip=True) if price_elem else "0"
+
+                price_val = self.db.clean_price(price_txt, decimal_separator=".")
+
+                data_batch.append(
+                    {
+                        "Fuente": "Tailoy",
+                        "Material": title,
+                        "Precio_BS": price_val,
+                        "Fecha_Consulta": datetime.now().strftime("%Y-%m-%d"),
+                    }
+                )
+            except Exception:
+                continue
+        return data_batch
+
+    def _parse_libreria_brasil(self, soup):
+        sel = SELECTORES["Libreria Brasil"]
+        data_batch = []
+        for product in soup.select(sel["producto"]):
+            try:
+                title_elem = product.select_one(sel["titulo"])
+                title = (
+                    title_elem.get_text(strip=True) if title_elem else "Sin Nombre"
+                )
+
+                price_elem = product.select_one(sel["precio"])
+                price_txt = price_elem.get_text(strip=True) if price_elem else "0"
+
+                # Limpieza extra para 'Bs.' que a veces viene pegado
+                price_txt = price_txt.replace("Bs.", "").replace("Bs", "").strip()
+
+                price_val = self.db.clean_price(price_txt, decimal_separator=",")
+
+                data_batch.append(
+                    {
+                        "Fuente": "Libreria Brasil",
+                        "Material": title,
+                        "Precio_BS": price_val,
+                        "Fecha_Consulta": datetime.now().strftime("%Y-%m-%d"),
+                    }
+                )
+            except Exception:
+                continue
+        return data_batch
+
+    def _parse_materiales_bo(self, soup):
+        sel = SELECTORES["Materiales BO"]
+        data_batch = []
+        for product in soup.select(sel["producto"]):
+            try:
+                title_elem = product.select_one(sel["titulo"])
+                title = (
+                    title_elem.get_text(strip=True) if title_elem else "Sin Nombre"
+                )
+
+                # Intentar buscar .money primero, si no, usar .price completo
+                price_elem = product.select_one(sel["precio_money"])
+                if not price_elem:
+                    price_elem = product.select_one(sel["precio"])
+
+                price_txt = price_elem.get_text(strip=True) if price_elem else "0"
+
+                # Limpieza preliminar (el resto lo hace database_manager)
+                price_txt = price_txt.replace("Desde", "").strip()
+
+                price_val = self.db.clean_price(price_txt, decimal_separator=",")
+
+                data_batch.append(
+                    {
+                        "Fuente": "Materiales BO",
+                        "Material": title,
+                        "Precio_BS": price_val,
+                        "Fecha_Consulta": datetime.now().strftime("%Y-%m-%d"),
+                    }
+                )
+            except Exception:
+                continue
+        return data_batch
 
 
 class ScraperApp:
@@ -207,25 +321,17 @@ class ScraperApp:
         threading.Thread(target=self.run_process, daemon=True).start()
 
     def run_process(self):
-        all_data = []
-
-        if self.var_tailoy.get():
-            data = self.logic.scrape_tailoy("https://www.tailoy.com.bo/escolar.html")
-            all_data.extend(data)
-            self.log(f"Tailoy: {len(data)} items encontrados.")
-
-        if self.var_brasil.get():
-            data = self.logic.scrape_libreria_brasil()
-            all_data.extend(data)
-            self.log(f"Libreria Brasil: {len(data)} items encontrados.")
-
-        if self.var_mat_bo.get():
-            data = self.logic.scrape_materiales_bo()
-            all_data.extend(data)
-            self.log(f"Materiales BO: {len(data)} items encontrados.")
+        seleccion = {
+            "Tailoy": self.var_tailoy,
+            "Libreria Brasil": self.var_brasil,
+            "Materiales BO": self.var_mat_bo,
+        }
+        # Las tiendas marcadas se recorren en paralelo, página por página
+        conteos, (success, msg) = self.logic.crawl_tiendas(
+            [nombre for nombre, var in seleccion.items() if var.get()]
+        )
 
-        if all_data:
-            success, msg = self.logic.db.save_data(all_data)
+        if sum(conteos.values()):
             self.log(f"Guardado: {msg}")
         else:
             self.log("No se recolectaron datos.")
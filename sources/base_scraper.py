@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Dict
 import pandas as pd
@@ -9,6 +10,11 @@ class ScraperSource(ABC):
     Abstract base class for material price sources.
     """
 
+    # Sources that call a single host can declare its politeness limit
+    # (a fetch_engine.HostLimit); run_sources registers it up front.
+    HOST = None
+    HOST_LIMIT = None
+
     def __init__(self, country: str, currency: str):
         self.country = country
         self.currency = currency
@@ -26,6 +32,17 @@ class ScraperSource(ABC):
         """
         pass
 
+    async def fetch_prices_async(self, client):
+        """
+        Async variant of fetch_prices() used by sources.fetch_engine.
+
+        Sources that make HTTP requests should override it and go through
+        `client` (an AsyncHttpClient) so they share its connection pool and
+        per-host rate limits. The default runs fetch_prices() in a worker
+        thread, which keeps purely synchronous sources compatible.
+        """
+        return await asyncio.to_thread(self.fetch_prices)
+
     def format_data(self, raw_data: List[Dict]) -> List[Dict]:
         """
         Helper to ensure all fields are present and add country/currency.
@@ -0,0 +1,268 @@
+"""
+Async fetch engine for ScraperSource implementations.
+
+All sources run concurrently on one event loop. HTTP requests share a pooled
+requests.Session (executed in worker threads), are limited per host by a
+semaphore and paced by a non-blocking token bucket, so adding sources does
+not add their waits one after another. Sessions answer GET requests from
+the shared HTTP cache (sources.http_cache) when possible.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .http_cache import CachingAdapter, HttpCache, shared_cache
+
+logger = logging.getLogger(__name__)
+
+# Browser-like headers: some sources (Numbeo) answer 403 Forbidden otherwise
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+DEFAULT_TIMEOUT = 15  # seconds
+DEFAULT_PER_HOST = 2  # concurrent requests per host
+DEFAULT_RATE = 1.0  # requests per second per host
+DEFAULT_BURST = 2  # tokens available before pacing kicks in
+DEFAULT_POOL_SIZE = 20  # keep-alive connections per host and I/O threads
+DEFAULT_RETRIES = 3  # retries on connection errors and 429/5xx answers
+DEFAULT_BACKOFF = 0.5  # seconds; waits 0.5, 1, 2... between retries
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    headers: Optional[Dict[str, str]] = None,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: Optional[HttpCache] = None,
+    use_cache: bool = True,
+) -> requests.Session:
+    """
+    requests.Session with a keep-alive connection pool large enough to be
+    shared by all worker threads, and automatic retries with exponential
+    backoff (honouring Retry-After) for idempotent requests.
+
+    GET requests go through `cache` (default: the shared on-disk cache from
+    sources.http_cache, configured by HTTP_CACHE_* variables) unless
+    `use_cache` is False or HTTP_CACHE_MODE=off.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=("GET", "HEAD"),
+        raise_on_status=False,
+    )
+    adapter_kwargs = dict(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    cache = (cache or shared_cache()) if use_cache else None
+    if cache is not None and cache.enabled:
+        adapter = CachingAdapter(cache, **adapter_kwargs)
+    else:
+        adapter = HTTPAdapter(**adapter_kwargs)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS if headers is None else headers)
+    return session
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, at most `capacity` stored.
+    acquire() awaits until a token is free instead of blocking the thread.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be > 0 and capacity >= 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:  # FIFO: waiters are served in arrival order
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def try_acquire(self) -> float:
+        """
+        Non-waiting variant for a single scheduling thread (no event loop):
+        takes a token and returns 0, or returns the seconds until one is free.
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+@dataclass
+class HostLimit:
+    """Politeness settings for one host."""
+
+    concurrency: int = DEFAULT_PER_HOST
+    rate: float = DEFAULT_RATE
+    burst: float = DEFAULT_BURST
+
+
+class AsyncHttpClient:
+    """
+    Shared HTTP client for async sources.
+
+    Each host gets its own semaphore (concurrency) and token bucket (rate),
+    taken only by requests that go to the network: GETs the session's
+    HTTP cache can answer (fresh entries, replay mode) skip both;
+    `host_limits` overrides the defaults per host, e.g.
+    {"www.numbeo.com": HostLimit(concurrency=1, rate=0.5)}. Blocking
+    requests run on the client's own thread pool (`pool_size` threads, one
+    per pooled connection) rather than asyncio's small default executor.
+    """
+
+    def __init__(
+        self,
+        default_limit: Optional[HostLimit] = None,
+        host_limits: Optional[Dict[str, HostLimit]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        session: Optional[requests.Session] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        self.default_limit = default_limit or HostLimit()
+        self.host_limits = dict(host_limits or {})
+        self.timeout = timeout
+        self.session = session or create_session(pool_size)
+        self._executor = ThreadPoolExecutor(pool_size, thread_name_prefix="fetch")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def set_host_limit(self, host: str, limit: HostLimit) -> None:
+        """
+        Politeness limit for `host`. It must be set before the host's first
+        request: once its semaphore and bucket exist a different limit
+        cannot take effect, so that raises instead of being ignored.
+        """
+        host = host.lower()
+        if host in self._semaphores and self.host_limits.get(host) != limit:
+            raise RuntimeError(f"{host} already has requests under another limit")
+        self.host_limits[host] = limit
+
+    def _limits_for(self, url: str):
+        host = urlsplit(url).netloc.lower()
+        if host not in self._semaphores:
+            limit = self.host_limits.get(host, self.default_limit)
+            self._semaphores[host] = asyncio.Semaphore(limit.concurrency)
+            self._buckets[host] = TokenBucket(limit.rate, limit.burst)
+        return self._semaphores[host], self._buckets[host]
+
+    def _answers_offline(self, method: str, url: str, **kwargs) -> bool:
+        # Cache hits (and replay mode) never reach the host: no token needed
+        if method.upper() != "GET" or kwargs.get("stream"):
+            return False
+        get_adapter = getattr(self.session, "get_adapter", None)
+        if get_adapter is None:
+            return False
+        prepared = self.session.prepare_request(
+            requests.Request(method, url, params=kwargs.get("params"))
+        )
+        adapter = get_adapter(prepared.url)
+        return isinstance(adapter, CachingAdapter) and adapter.answers_offline(prepared.url)
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        call = partial(self.session.request, method, url, **kwargs)
+        loop = asyncio.get_running_loop()
+        if self._answers_offline(method, url, **kwargs):
+            return await loop.run_in_executor(self._executor, call)
+        semaphore, bucket = self._limits_for(url)
+        async with semaphore:
+            await bucket.acquire()
+            return await loop.run_in_executor(self._executor, call)
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+@dataclass
+class SourceResult:
+    """Outcome of one source: raw fetch_prices() data or the error raised."""
+
+    name: str
+    raw: Any = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def _run_source(source, client: AsyncHttpClient) -> SourceResult:
+    name = source.__class__.__name__
+    start = time.perf_counter()
+    try:
+        raw = await source.fetch_prices_async(client)
+        return SourceResult(name, raw=raw, seconds=time.perf_counter() - start)
+    except Exception as e:
+        logger.error(f"Failed to fetch from {name}: {e}")
+        return SourceResult(name, error=e, seconds=time.perf_counter() - start)
+
+
+async def run_sources_async(
+    sources: List, client: Optional[AsyncHttpClient] = None, **client_kwargs
+) -> List[SourceResult]:
+    """
+    Runs fetch_prices_async() of every source concurrently. Results keep the
+    order of `sources`; a failing source does not cancel the others.
+
+    Without `client` one is created from `client_kwargs` and closed here;
+    a client passed in stays open for the caller. The HOST_LIMIT declared
+    by each source is registered before any request is made.
+    """
+    own_client = client is None
+    if own_client:
+        client = AsyncHttpClient(**client_kwargs)
+    try:
+        for source in sources:
+            if source.HOST and source.HOST_LIMIT:
+                client.set_host_limit(source.HOST, source.HOST_LIMIT)
+        return list(await asyncio.gather(*(_run_source(s, client) for s in sources)))
+    finally:
+        if own_client:
+            client.close()
+
+
+def run_sources(sources: List, **client_kwargs) -> List[SourceResult]:
+    """Synchronous entry point: one event loop and one HTTP client for all sources."""
+    return asyncio.run(run_sources_async(sources, **client_kwargs))
@@ -0,0 +1,76 @@
+"""
+Shared HTML parsing helpers for the scrapers.
+
+- make_soup() uses the lxml tree builder when lxml is installed (several
+  times faster than Python's html.parser) and falls back to html.parser.
+- css() compiles a CSS selector once (soupsieve) so per-product lookups do
+  not re-parse selector strings; bs4's select()/select_one() accept the
+  compiled pattern directly.
+- strainer() turns a simple selector ("li.product", "table#t2", "meta")
+  into a SoupStrainer, so only the matching subtrees (e.g. the product
+  listing) are built instead of the whole page.
+"""
+
+import importlib.util
+import re
+from functools import lru_cache
+from typing import Optional, Union
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+_SIMPLE_SELECTOR = re.compile(r"^(?P<name>[a-zA-Z][\w-]*)?(?P<rest>(?:[.#][\w-]+)*)$")
+
+
+@lru_cache(maxsize=None)
+def css(selector: str) -> soupsieve.SoupSieve:
+    """Compiled CSS selector, cached per selector string."""
+    return soupsieve.compile(selector)
+
+
+def _has_class(cls: str):
+    # While parsing, the class attribute is the raw "a b c" string, so
+    # SoupStrainer(class_=...) would only match the full value
+    def match(value):
+        if not value:
+            return False
+        tokens = value.split() if isinstance(value, str) else value
+        return cls in tokens
+
+    return match
+
+
+@lru_cache(maxsize=None)
+def strainer(selector: str) -> SoupStrainer:
+    """
+    SoupStrainer for a simple compound selector: optional tag name followed
+    by at most one .class and/or #id. Anything more complex raises ValueError.
+    """
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if not match:
+        raise ValueError(f"Unsupported selector for parse_only: {selector!r}")
+    classes = re.findall(r"\.([\w-]+)", match["rest"])
+    ids = re.findall(r"#([\w-]+)", match["rest"])
+    if len(classes) > 1 or len(ids) > 1:
+        raise ValueError(f"Unsupported selector for parse_only: {selector!r}")
+    attrs = {}
+    if classes:
+        attrs["class"] = _has_class(classes[0])
+    if ids:
+        attrs["id"] = ids[0]
+    return SoupStrainer(match["name"], attrs=attrs)
+
+
+def make_soup(
+    markup, only: Optional[Union[str, SoupStrainer]] = None
+) -> BeautifulSoup:
+    """
+    Parses `markup` with the fastest available parser. `only` restricts the
+    tree to the elements matching a simple selector (see strainer()) or a
+    ready-made SoupStrainer; matching elements become top-level nodes.
+    """
+    if isinstance(only, str):
+        only = strainer(only)
+    return BeautifulSoup(markup, PARSER, parse_only=only)
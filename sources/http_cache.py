@@ -0,0 +1,310 @@
+"""
+Shared on-disk HTTP cache for the scrapers.
+
+Responses to GET requests are stored zlib-compressed in a SQLite file and
+served through CachingAdapter, a requests transport adapter that
+create_session() mounts by default, so every scraper that uses a session
+from sources.fetch_engine goes through the cache:
+
+- Within `ttl` seconds an entry is served without touching the network.
+  The server's Cache-Control is honoured: max-age shortens the lifetime,
+  no-cache forces revalidation and no-store/private responses are not kept.
+- Older entries are revalidated with If-None-Match / If-Modified-Since; a
+  304 Not Modified answer reuses the stored body.
+- The total compressed size is bounded; least recently used entries are
+  evicted first.
+- In replay mode every request is answered from the cache regardless of
+  age and misses raise CacheMiss, so parsers can be re-run offline against
+  the pages of a previous run.
+
+Configuration (environment variables):
+    HTTP_CACHE_MODE     normal (default), replay or off
+    HTTP_CACHE_DIR      cache directory (default: data/http_cache)
+    HTTP_CACHE_TTL      freshness lifetime in seconds (default: 3600)
+    HTTP_CACHE_MAX_MB   size limit of the stored bodies (default: 200)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "http_cache"
+DEFAULT_TTL = 3600  # seconds
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+MODES = ("normal", "replay", "off")
+CACHEABLE_STATUS = (200, 301, 308)
+# The body is stored decoded, so transfer-related headers no longer apply
+DROP_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class CacheMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode for URLs that are not in the cache."""
+
+
+class HttpCache:
+    """
+    SQLite store of compressed GET responses keyed by URL.
+
+    One connection is shared by all threads behind a lock; WAL mode lets
+    several scraper processes use the same file.
+    """
+
+    def __init__(
+        self,
+        directory=DEFAULT_CACHE_DIR,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        mode: str = "normal",
+    ):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self._lock = threading.Lock()
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            self.directory / "responses.sqlite", check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "HttpCache":
+        return cls(
+            directory=os.getenv("HTTP_CACHE_DIR", DEFAULT_CACHE_DIR),
+            ttl=float(os.getenv("HTTP_CACHE_TTL", DEFAULT_TTL)),
+            max_bytes=int(float(os.getenv("HTTP_CACHE_MAX_MB", 200)) * 1024 * 1024),
+            mode=os.getenv("HTTP_CACHE_MODE", "normal").lower(),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def _cache_control(headers) -> dict:
+        directives = {}
+        for part in headers.get("Cache-Control", "").lower().split(","):
+            name, _, value = part.strip().partition("=")
+            if name:
+                directives[name] = value.strip('"')
+        return directives
+
+    def storable(self, headers) -> bool:
+        directives = self._cache_control(headers)
+        return "no-store" not in directives and "private" not in directives
+
+    def get(self, url: str) -> Optional[dict]:
+        """Stored entry for `url` (marked as recently used), or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._db.commit()
+        status, headers, body, stored_at = row
+        return {
+            "status": status,
+            "headers": CaseInsensitiveDict(json.loads(headers)),
+            "body": zlib.decompress(body),
+            "stored_at": stored_at,
+        }
+
+    def is_fresh(self, entry: dict) -> bool:
+        directives = self._cache_control(entry["headers"])
+        if "no-cache" in directives:
+            return False
+        lifetime = self.ttl
+        if directives.get("max-age", "").isdigit():
+            lifetime = min(lifetime, int(directives["max-age"]))
+        return time.time() - entry["stored_at"] < lifetime
+
+    def has_fresh(self, url: str) -> bool:
+        """
+        True if `url` would be served without the network right now. Reads
+        only the headers (no body, no LRU update).
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT headers, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return False
+        headers, stored_at = row
+        return self.is_fresh(
+            {"headers": CaseInsensitiveDict(json.loads(headers)), "stored_at": stored_at}
+        )
+
+    def put(self, url: str, status: int, headers, body: bytes) -> None:
+        headers = {k: v for k, v in headers.items() if k.lower() not in DROP_HEADERS}
+        blob = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(headers), blob, len(blob), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def touch(self, url: str, headers) -> None:
+        """Restarts the TTL of a revalidated entry, keeping newer validators."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT headers FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return
+            stored = CaseInsensitiveDict(json.loads(row[0]))
+            for name in ("ETag", "Last-Modified", "Cache-Control", "Expires"):
+                if name in headers:
+                    stored[name] = headers[name]
+            now = time.time()
+            self._db.execute(
+                "UPDATE responses SET headers = ?, stored_at = ?, accessed_at = ? "
+                "WHERE url = ?",
+                (json.dumps(dict(stored)), now, now, url),
+            )
+            self._db.commit()
+
+    def _evict(self) -> None:
+        # Drop the least recently used entries beyond the size limit
+        self._db.execute(
+            """
+            DELETE FROM responses WHERE url IN (
+                SELECT url FROM (
+                    SELECT url, SUM(size) OVER (
+                        ORDER BY accessed_at DESC, url
+                    ) AS running FROM responses
+                ) WHERE running > ?
+            )
+            """,
+            (self.max_bytes,),
+        )
+
+    def size(self) -> int:
+        """Total compressed size of the stored bodies, in bytes."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+@lru_cache(maxsize=None)
+def shared_cache() -> HttpCache:
+    """Process-wide cache configured from the environment."""
+    return HttpCache.from_env()
+
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that answers GET requests from an HttpCache when it can."""
+
+    def __init__(self, cache: HttpCache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def answers_offline(self, url: str) -> bool:
+        """
+        True if a GET of `url` will not reach the network: replay mode (hit
+        or CacheMiss) or a fresh entry. Lets callers skip rate limiting.
+        """
+        return self.cache.replay or self.cache.has_fresh(url)
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != "GET" or stream:
+            return super().send(request, stream=stream, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if self.cache.replay:
+            if entry is None:
+                raise CacheMiss(f"Not in HTTP cache (replay mode): {request.url}")
+            return self._from_cache(request, entry)
+        if entry is not None and self.cache.is_fresh(entry):
+            return self._from_cache(request, entry)
+
+        conditional = request
+        if entry is not None:
+            validators = {}
+            if "ETag" in entry["headers"]:
+                validators["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                validators["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+            if validators:
+                conditional = request.copy()
+                conditional.headers.update(validators)
+
+        response = super().send(conditional, stream=stream, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(request.url, response.headers)
+            response.close()
+            return self._from_cache(request, entry)
+        if response.status_code in CACHEABLE_STATUS and self.cache.storable(
+            response.headers
+        ):
+            self.cache.put(
+                request.url, response.status_code, response.headers, response.content
+            )
+        return response
+
+    def _from_cache(self, request, entry: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = "OK" if entry["status"] == 200 else "Moved Permanently"
+        response.headers = entry["headers"]
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry["body"]
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
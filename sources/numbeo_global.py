@@ -1,11 +1,18 @@
+import asyncio
+
 import requests
-from bs4 import BeautifulSoup
 from .base_scraper import ScraperSource
-import time
-import random
+from .fetch_engine import AsyncHttpClient, HostLimit
+from .html_parsing import make_soup, strainer
 
 
 class NumbeoGlobalScraper(ScraperSource):
+    HOST = "www.numbeo.com"
+    # Polite pacing for Numbeo: one request at a time, at most one every 2 s
+    HOST_LIMIT = HostLimit(concurrency=1, rate=0.5, burst=1)
+    # Only the tables are parsed; the ranking (and the fallback) live there
+    TABLES = strainer("table")
+
     def __init__(self):
         super().__init__("Global (Numbeo)", "Apartments")
         self.url = "https://www.numbeo.com/cost-of-living/prices_by_country.jsp?displayCurrency=USD&itemId=100"
@@ -13,23 +20,26 @@ class NumbeoGlobalScraper(ScraperSource):
     def fetch_prices(self):
         """
         Fetches 'Price per Square Meter to Buy Apartment in City Centre' from Numbeo.
-        Returns a list of raw data dictionaries.
+        Returns the raw HTML (None on error). Synchronous wrapper around
+        fetch_prices_async() for callers without an event loop.
         """
-        print(f"  [Numbeo] Connecting to {self.url}...")
+        client = AsyncHttpClient(host_limits={self.HOST: self.HOST_LIMIT})
+        try:
+            return asyncio.run(self.fetch_prices_async(client))
+        finally:
+            client.close()
 
-        # Add headers to mimic a browser to avoid 403 Forbidden
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-        }
+    async def fetch_prices_async(self, client):
+        """
+        Async fetch through the shared client. Rate limiting is done by the
+        client's token bucket for numbeo.com instead of sleeping afterwards.
+        """
+        print(f"  [Numbeo] Connecting to {self.url}...")
+        client.set_host_limit(self.HOST, self.HOST_LIMIT)
 
         try:
-            response = requests.get(self.url, headers=headers, timeout=15)
+            response = await client.get(self.url)
             response.raise_for_status()
-
-            # Rate limiting safety
-            time.sleep(random.uniform(1, 2))
-
             return response.text
         except requests.exceptions.RequestException as e:
             print(f"  [Numbeo] Error fetching data: {e}")
@@ -43,7 +53,7 @@ class NumbeoGlobalScraper(ScraperSource):
             return []
 
         formatted_data = []
-        soup = BeautifulSoup(raw_html, "html.parser")
+        soup = make_soup(raw_html, only=self.TABLES)
 
         # Find the table containing the prices
         # Numbeo usually uses a table with id "t2" for these rankings
@@ -202,3 +202,7 @@ class StaticDataSource(ScraperSource):
             formatted.append(item)
 
         return formatted
+
+    async def fetch_prices_async(self, client):
+        # Seed data only: no I/O, so no worker thread is needed
+        return self.fetch_prices()
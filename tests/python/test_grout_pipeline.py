@@ -10,6 +10,7 @@ Tests cover:
   - Regression model quality
   - SQLite persistence
   - Full pipeline integration
+  - PDF reports
 
 Run:
   pytest tests/python/test_grout_pipeline.py -v
@@ -17,14 +18,21 @@ Run:
 
 from __future__ import annotations
 
+import json
+import os
 import sqlite3
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
+from functools import partial
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import pytest
+import scipy.stats as stats
+import statsmodels.api as sm
 
 # ── Path setup ────────────────────────────────────────────────────────────────
 # Allow importing grout_pipeline from "Grout Stats/" regardless of cwd
@@ -32,7 +40,9 @@ REPO_ROOT = Path(__file__).parent.parent.parent
 GROUT_DIR = REPO_ROOT / "Grout Stats"
 sys.path.insert(0, str(GROUT_DIR))
 
+import bench_grout_pipeline as bench  # noqa: E402
 import grout_pipeline as gp  # noqa: E402
+import master_store as ms  # noqa: E402
 
 
 # ── Fixtures ──────────────────────────────────────────────────────────────────
@@ -71,12 +81,8 @@ def sample_df() -> pd.DataFrame:
     return _make_sample_df()
 
 
-@pytest.fixture
-def sample_csv(tmp_path: Path) -> Path:
-    """Write a minimal CSV that load_files() can parse (skiprows=5, 14 cols)."""
-    df = _make_sample_df()
-    csv_path = tmp_path / "test_data.csv"
-
+def _write_raw_csv(df: pd.DataFrame, csv_path: Path) -> Path:
+    """Write df in the raw lab layout that load_files() parses (skiprows=5, 14 cols)."""
     # Build a raw CSV with 5 header rows and 14+ columns so load_files parses correctly
     # Column indices used: [1,2,5,6,7,13] → ID_Probeta, Estructura, Fecha_Vaciado,
     #                                         Fecha_Rotura, Edad_Dias, Resistencia_MPa
@@ -102,6 +108,12 @@ def sample_csv(tmp_path: Path) -> Path:
     return csv_path
 
 
+@pytest.fixture
+def sample_csv(tmp_path: Path) -> Path:
+    """Write a minimal CSV that load_files() can parse (skiprows=5, 14 cols)."""
+    return _write_raw_csv(_make_sample_df(), tmp_path / "test_data.csv")
+
+
 # ── Test 1: Data Loading ───────────────────────────────────────────────────────
 
 class TestLoadData:
@@ -140,6 +152,97 @@ class TestLoadData:
         with pytest.raises(ValueError, match="No se procesaron datos"):
             gp.load_files([empty_csv])
 
+    def test_load_data_parallel_matches_serial(self, tmp_path: Path):
+        """load_files(workers=N) returns the same master frame as the serial path."""
+        files = [
+            _write_raw_csv(_make_sample_df(30), tmp_path / f"lote_{i}.csv")
+            for i in range(3)
+        ]
+        serial   = gp.load_files(files)
+        parallel = gp.load_files(files, workers=2)
+
+        pd.testing.assert_frame_equal(serial, parallel)
+        assert list(parallel["Origen_Archivo"].unique()) == [f.name for f in files]
+
+    def test_load_data_parallel_skips_bad_file(self, sample_csv: Path, tmp_path: Path):
+        """A file that fails to parse in a worker is logged and skipped."""
+        missing = tmp_path / "no_existe.csv"
+        df = gp.load_files([missing, sample_csv], workers=2)
+        assert len(df) == 30
+        assert set(df["Origen_Archivo"]) == {sample_csv.name}
+
+
+class TestParseCache:
+    def test_cache_hit_matches_fresh_parse(self, sample_csv: Path, tmp_path: Path):
+        """A second load served from the cache returns the same master frame."""
+        pytest.importorskip("pyarrow")
+        cache = gp.ParseCache(tmp_path / "cache")
+        fresh  = gp.load_files([sample_csv], cache=cache)
+        cached = gp.load_files([sample_csv], cache=cache)
+
+        assert cache.hits == 1
+        pd.testing.assert_frame_equal(fresh, cached)
+
+    def test_cache_key_tracks_content_and_schema(self, sample_csv: Path, tmp_path: Path,
+                                                 monkeypatch: pytest.MonkeyPatch):
+        """Editing the file or the extraction schema invalidates the cache key."""
+        pytest.importorskip("pyarrow")
+        cache = gp.ParseCache(tmp_path / "cache")
+        key = cache.key_for(sample_csv)
+
+        monkeypatch.setattr(gp, "COL_NAMES", [*gp.COL_NAMES[:-1], "MPa"])
+        assert cache.key_for(sample_csv) != key
+        monkeypatch.undo()
+
+        sample_csv.write_text(sample_csv.read_text() + ",P999,Losa\n")
+        assert cache.key_for(sample_csv) != key
+
+    def test_renamed_csv_hit_and_single_digest(self, sample_csv: Path, tmp_path: Path,
+                                               monkeypatch: pytest.MonkeyPatch):
+        """A hit for a renamed CSV matches a fresh parse, and each file is hashed once."""
+        pytest.importorskip("pyarrow")
+        cache = gp.ParseCache(tmp_path / "cache")
+        digests = []
+        file_digest = gp._file_digest
+        monkeypatch.setattr(gp, "_file_digest", lambda f: digests.append(f) or file_digest(f))
+        gp.load_files([sample_csv], cache=cache)
+        assert len(digests) == 1
+
+        renamed = sample_csv.rename(tmp_path / "renamed.csv")
+        cached = gp.load_files([renamed], cache=cache)
+        assert cache.hits == 1
+        pd.testing.assert_frame_equal(cached, gp.load_files([renamed]))
+
+    def test_missing_pyarrow_disables_quietly_by_default(self, tmp_path: Path,
+                                                         monkeypatch: pytest.MonkeyPatch,
+                                                         caplog: pytest.LogCaptureFixture):
+        """Without pyarrow the default cache is off silently; an explicit request warns."""
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        with caplog.at_level("WARNING", logger=gp.log.name):
+            assert not gp.ParseCache(tmp_path / "cache").enabled
+            assert not caplog.records
+            assert not gp.ParseCache(tmp_path / "cache", enabled=True).enabled
+        assert "pyarrow" in caplog.text
+
+    def test_cache_write_failure_keeps_parsed_data(self, sample_csv: Path, tmp_path: Path):
+        """A cache directory that cannot be created only skips the write."""
+        pytest.importorskip("pyarrow")
+        (tmp_path / "cache").write_text("no es un directorio")
+        cache = gp.ParseCache(tmp_path / "cache")
+        assert not cache.put("k", sample_csv, [], [])
+        assert len(gp.load_files([sample_csv], cache=cache)) == 30
+
+    def test_cache_eviction_respects_size_limit(self, tmp_path: Path):
+        """evict() drops least recently used entries until under max_bytes."""
+        pytest.importorskip("pyarrow")
+        cache = gp.ParseCache(tmp_path / "cache", max_bytes=0)
+        files = [
+            _write_raw_csv(_make_sample_df(30), tmp_path / f"lote_{i}.csv")
+            for i in range(2)
+        ]
+        gp.load_files(files, cache=cache)
+        assert not any((tmp_path / "cache").iterdir())
+
 
 # ── Test 2: Date Validation ────────────────────────────────────────────────────
 
@@ -178,6 +281,88 @@ class TestDateValidation:
         except Exception as exc:
             pytest.fail(f"validate_dates() raised unexpectedly: {exc}")
 
+    def test_anomaly_table_covers_all_rules(self, sample_df: pd.DataFrame):
+        """find_date_anomalies() reports each broken rule with the offending row."""
+        df_bad = sample_df.copy()
+        df_bad.loc[0, "Fecha_Rotura"] = "not-a-date"
+        df_bad.loc[1, "Fecha_Vaciado"] = str(date.today() + timedelta(days=3))
+        df_bad.loc[2, "Fecha_Rotura"] = str(date.today() - timedelta(days=400))
+        df_bad.loc[3, "Edad_Dias"] = 7.0       # dates say 1 day
+
+        anomalies = gp.find_date_anomalies(df_bad)
+        assert list(anomalies.columns) == gp.ANOMALY_COLUMNS
+        by_rule = anomalies.groupby("Regla")["ID_Probeta"].apply(set).to_dict()
+        assert by_rule == {
+            "fecha_invalida":          {"P000"},
+            "vaciado_futuro":          {"P001"},
+            "rotura_antes_de_vaciado": {"P001", "P002"},
+            "edad_inconsistente":      {"P003"},
+        }
+        assert gp.find_date_anomalies(sample_df).empty
+
+    def test_validate_dates_logs_one_line_per_rule(self, sample_df: pd.DataFrame,
+                                                   caplog: pytest.LogCaptureFixture):
+        """Many future-dated rows produce a single aggregated warning, not one per row."""
+        df_bad = sample_df.copy()
+        df_bad["Fecha_Rotura"] = str(date.today() + timedelta(days=10))
+        df_bad["Fecha_Vaciado"] = str(date.today() + timedelta(days=10))
+        df_bad["Edad_Dias"] = 0.0
+        with caplog.at_level("WARNING", logger=gp.log.name):
+            assert gp.validate_dates(df_bad) == len(df_bad)
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 2
+        assert all("fila(s)" in m for m in messages)
+
+    def test_pipeline_saves_anomaly_table(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """run_pipeline() stores the anomaly table in SQLite and, with export_csv, as CSV."""
+        df_bad = sample_df.copy()
+        df_bad.loc[5, "Edad_Dias"] = 3.0
+        csv_path = _write_raw_csv(df_bad, tmp_path / "lote.csv")
+        result = gp.run_pipeline(
+            files=[csv_path], output_dir=tmp_path, db_path=tmp_path / "test.db",
+            skip_pdf=True, export_csv=True, spc=False,
+        )
+        assert result["anomalies"]["Regla"].tolist() == ["edad_inconsistente"]
+        with sqlite3.connect(tmp_path / "test.db") as conn:
+            stored = pd.read_sql("SELECT * FROM Anomalias_Fechas", conn)
+        assert stored["ID_Probeta"].tolist() == ["P005"]
+        assert len(pd.read_csv(tmp_path / "anomalias_fechas.csv")) == 1
+
+
+class TestStatsAccumulator:
+    def test_descriptive_stats_by_estructura(self, sample_df: pd.DataFrame):
+        """compute_descriptive_stats(by=...) matches a plain pandas groupby."""
+        result = gp.compute_descriptive_stats(sample_df, by="Estructura")
+        expected = sample_df.groupby("Estructura")["Resistencia_MPa"].agg(["count", "mean", "std"])
+
+        assert list(result.columns) == ["Estructura", "N", "Media", "Desv", "Min", "Max", "CV_%"]
+        np.testing.assert_array_equal(result["N"], expected["count"])
+        np.testing.assert_allclose(result["Media"], expected["mean"])
+        np.testing.assert_allclose(result["Desv"], expected["std"])
+
+    def test_db_chunks_match_in_memory_stats(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """Streaming Roturas in small chunks gives the same table as the full frame."""
+        db_path = tmp_path / "test.db"
+        gp.persist_to_database(sample_df, db_path)
+
+        by = ["Edad_Dias", "Estructura"]
+        acc = gp.StatsAccumulator.from_chunks(gp.iter_db_chunks(db_path, chunksize=7), by=by)
+        pd.testing.assert_frame_equal(
+            acc.to_frame(), gp.compute_descriptive_stats(sample_df, by=by),
+        )
+
+    def test_parallel_file_accumulation(self, tmp_path: Path):
+        """accumulate_files(workers=N) combines per-file partials exactly."""
+        files = [
+            _write_raw_csv(_make_sample_df(30).assign(Resistencia_MPa=lambda d: d["Resistencia_MPa"] + i),
+                           tmp_path / f"lote_{i}.csv")
+            for i in range(3)
+        ]
+        acc = gp.accumulate_files(files, workers=2)
+        pd.testing.assert_frame_equal(
+            acc.to_frame(), gp.compute_descriptive_stats(gp.load_files(files)),
+        )
+
 
 # ── Test 3: Statistical Analysis ───────────────────────────────────────────────
 
@@ -210,12 +395,55 @@ class TestStatisticalAnalysis:
         assert 0.0 <= result.shapiro_p <= 1.0
         assert 0.0 <= result.levene_p <= 1.0
 
+    @pytest.mark.parametrize("factor", ["Edad_Dias", "Estructura"])
+    def test_numpy_anova_matches_statsmodels(self, sample_df: pd.DataFrame, factor: str):
+        """The group-sum ANOVA engine reproduces the statsmodels OLS results."""
+        df = sample_df.copy()
+        df.loc[4, "Estructura"] = np.nan   # rows without a level are dropped
+        fast = gp.perform_anova(df, factor, engine="numpy")
+        slow = gp.perform_anova(df, factor, engine="statsmodels")
+
+        pd.testing.assert_frame_equal(fast.anova_table, slow.anova_table)
+        assert fast.shapiro_stat == pytest.approx(slow.shapiro_stat)
+        assert fast.levene_stat == pytest.approx(slow.levene_stat)
+        assert fast.is_significant == slow.is_significant
+
     def test_fck_is_numeric(self, sample_df: pd.DataFrame):
         """f'ck characteristic resistance is a valid float."""
         result = gp.compute_inference(sample_df)
         assert isinstance(result.fck_project, float)
         assert result.fck_project > 0
 
+    def test_bootstrap_matches_naive_resampling(self, sample_df: pd.DataFrame):
+        """bootstrap_28d() equals an explicit resample-by-resample loop with the same seed."""
+        boot = gp.bootstrap_28d(sample_df, n_resamples=300, seed=7)
+
+        y = np.sort(sample_df.loc[sample_df["Edad_Dias"] == 28.0, "Resistencia_MPa"].to_numpy())
+        idx = np.random.default_rng(7).integers(0, len(y), size=(300, len(y)))
+        means = np.array([y[row].mean() for row in idx])
+        fcks = np.array([y[row].mean() - 1.645 * y[row].std(ddof=1) for row in idx])
+        rates = np.array([(y[row] >= gp.FCK_REQUIRED).mean() for row in idx])
+
+        np.testing.assert_allclose(boot.mean_ci, np.quantile(means, [0.025, 0.975]))
+        np.testing.assert_allclose(boot.fck_ci, np.quantile(fcks, [0.025, 0.975]))
+        np.testing.assert_allclose(boot.pass_rate_ci, np.quantile(rates, [0.025, 0.975]))
+        assert boot.prob_fck_pass == pytest.approx(np.mean(fcks >= gp.FCK_REQUIRED))
+        assert boot.pass_rate == pytest.approx(np.mean(y >= gp.FCK_REQUIRED))
+
+    def test_bootstrap_is_seeded_and_brackets_point_estimates(self, sample_df: pd.DataFrame,
+                                                             monkeypatch: pytest.MonkeyPatch):
+        """Same seed → same intervals (also across blocks); intervals contain the point estimates."""
+        boot = gp.bootstrap_28d(sample_df, n_resamples=2000, seed=1)
+        monkeypatch.setattr(gp, "_BOOTSTRAP_BLOCK", 70)   # 7 resamples per block
+        assert gp.bootstrap_28d(sample_df, n_resamples=2000, seed=1) == boot
+
+        inference = gp.compute_inference(sample_df)
+        mean_28 = sample_df.loc[sample_df["Edad_Dias"] == 28.0, "Resistencia_MPa"].mean()
+        assert boot.mean_ci[0] < mean_28 < boot.mean_ci[1]
+        assert boot.fck_ci[0] < inference.fck_project < boot.fck_ci[1]
+        with pytest.raises(ValueError, match="Bootstrap"):
+            gp.bootstrap_28d(sample_df[sample_df["Edad_Dias"] < 28.0])
+
 
 # ── Test 4: Regression Model ───────────────────────────────────────────────────
 
@@ -255,6 +483,125 @@ class TestRegressionModel:
         with pytest.raises(RuntimeError, match="no entrenado"):
             model.predict_at_28d(95.0, 7.0)
 
+    def test_predict_many_matches_scalar(self, sample_df: pd.DataFrame):
+        """predict_many() agrees with predict_at_28d() row by row."""
+        model = gp.PredictiveModel()
+        model.train(sample_df)
+        mpa, ages = [60.0, 95.0, 120.0], [1.0, 7.0, 28.0]
+        out = model.predict_many(mpa, ages)
+        expected = [model.predict_at_28d(m, a) for m, a in zip(mpa, ages)]
+        np.testing.assert_allclose(out["MPa_28d"], expected)
+        assert (out["PI_Inf"] < out["MPa_28d"]).all() and (out["MPa_28d"] < out["PI_Sup"]).all()
+        assert out["Estado"].tolist() == [
+            "CUMPLE" if p >= gp.TARGETS[28.0] else "RIESGO" for p in expected
+        ]
+
+    def test_predict_many_interval_matches_statsmodels(self, sample_df: pd.DataFrame):
+        """The interval half-width equals the OLS prediction interval at ln(28) shifted by Δ."""
+        model = gp.PredictiveModel()
+        model.train(sample_df)
+        fit = sm.OLS(sample_df["Resistencia_MPa"], sm.add_constant(np.log(sample_df["Edad_Dias"]))).fit()
+        delta = np.log(28.0) - np.log(7.0)
+        se = np.sqrt(fit.scale * (1 + delta ** 2 / model.sxx_c))
+        out = model.predict_many([90.0], 7.0, level=0.90).iloc[0]
+        half = stats.t.ppf(0.95, fit.df_resid) * se
+        assert out["PI_Sup"] - out["MPa_28d"] == pytest.approx(half)
+        assert model.resid_var == pytest.approx(fit.scale)
+
+    def test_predict_many_from_sums_matches_train(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """A model fitted from SQL group sums gives the same projections."""
+        direct = gp.PredictiveModel()
+        direct.train(sample_df)
+        db_path = tmp_path / "model.db"
+        gp.persist_to_database(sample_df, db_path)
+        from_db = gp.query_model(db_path)
+        assert from_db.slope == pytest.approx(direct.slope)
+        assert from_db.resid_var == pytest.approx(direct.resid_var)
+        frame = sample_df[["Resistencia_MPa", "Edad_Dias"]].head(20)
+        pd.testing.assert_frame_equal(from_db.predict_many(frame), direct.predict_many(frame), rtol=1e-9)
+
+    def test_predict_many_flags_and_invalid_ages(self, sample_df: pd.DataFrame):
+        """Age-target flags use TARGETS; non-positive ages yield NaN and no state."""
+        model = gp.PredictiveModel()
+        model.train(sample_df)
+        frame = pd.DataFrame({"Resistencia_MPa": [50.0, 40.0, 80.0], "Edad_Dias": [1.0, 1.0, 0.0]})
+        out = model.predict_many(frame)
+        assert out["Cumple_Edad"].tolist()[:2] == [True, False]
+        assert pd.isna(out["Cumple_Edad"].iloc[2])
+        assert np.isnan(out["MPa_28d"].iloc[2]) and pd.isna(out["Estado"].iloc[2])
+        with pytest.raises(ValueError, match="age_days"):
+            model.predict_many([90.0])
+
+    def test_predict_file_streams_chunks(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """predict_file() writes the same rows as predict_many() on the whole CSV."""
+        model = gp.PredictiveModel()
+        model.train(sample_df)
+        src, dest = tmp_path / "in.csv", tmp_path / "out.csv"
+        sample_df[["Estructura", "Resistencia_MPa", "Edad_Dias"]].to_csv(src, index=False)
+        assert gp.predict_file(model, src, dest, chunksize=7) == len(sample_df)
+        expected = model.predict_many(src)
+        got = pd.read_csv(dest)
+        np.testing.assert_allclose(got["MPa_28d"], expected["MPa_28d"])
+        assert got["Estado"].tolist() == expected["Estado"].tolist()
+        assert not (tmp_path / "out.csv.tmp").exists()
+
+
+class TestModelBank:
+    def test_group_fits_match_per_group_train(self, sample_df: pd.DataFrame):
+        """Each group's vectorized fit equals a PredictiveModel trained on that group alone."""
+        bank = gp.ModelBank.from_frame(sample_df, "Estructura", min_samples=5)
+        for name, group in sample_df.groupby("Estructura"):
+            model = gp.PredictiveModel()
+            model.train(group)
+            fit = bank.fits.loc[name]
+            assert not fit["Global"]
+            assert fit["slope"] == pytest.approx(model.slope)
+            assert fit["intercept"] == pytest.approx(model.intercept)
+            assert fit["resid_var"] == pytest.approx(model.resid_var)
+            assert bank.model_for(name).slope == pytest.approx(model.slope)
+
+    def test_sparse_and_unknown_groups_use_global(self, sample_df: pd.DataFrame):
+        """Groups under min_samples, single-age groups and unseen keys route to the global model."""
+        df = sample_df.copy()
+        df.loc[df["Edad_Dias"] == 28.0, "Estructura"] = "Solo28"
+        bank = gp.ModelBank.from_frame(df, "Estructura", min_samples=5)
+        assert bank.fits.loc["Solo28", "Global"]
+
+        glob = gp.PredictiveModel()
+        glob.train(df)
+        rows = pd.DataFrame({
+            "Estructura": ["Solo28", "Zapata"], "Resistencia_MPa": [90.0, 90.0], "Edad_Dias": [7.0, 7.0],
+        })
+        out = bank.predict_many(rows)
+        assert out["Modelo_Global"].all()
+        np.testing.assert_allclose(out["MPa_28d"], glob.predict_many(rows)["MPa_28d"])
+        assert gp.ModelBank.from_frame(df, "Estructura", min_samples=50).fits["Global"].all()
+
+    def test_predict_routes_rows_to_group_models(self, sample_df: pd.DataFrame):
+        """predict_many() on a mixed frame matches each group's own model."""
+        bank = gp.ModelBank.from_frame(sample_df, ["Estructura", "Origen_Archivo"], min_samples=5)
+        out = bank.predict_many(sample_df)
+        for name, group in out.groupby("Estructura"):
+            expected = bank.model_for((name, "test_fixture.csv")).predict_many(
+                group[["Resistencia_MPa", "Edad_Dias"]]
+            )
+            np.testing.assert_allclose(group["MPa_28d"], expected["MPa_28d"])
+            np.testing.assert_allclose(group["PI_Sup"], expected["PI_Sup"])
+        with pytest.raises(ValueError, match="Faltan columnas"):
+            bank.predict_many(sample_df.drop(columns="Origen_Archivo"))
+
+    def test_update_and_from_db_match_from_frame(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """Incremental updates and SQL-side group sums give the same bank as one pass."""
+        full = gp.ModelBank.from_frame(sample_df, "Estructura", min_samples=5)
+        online = gp.ModelBank.from_frame(sample_df.iloc[:12], "Estructura", min_samples=5)
+        online.update(sample_df.iloc[12:])
+        pd.testing.assert_frame_equal(online.fits, full.fits)
+
+        db_path = tmp_path / "bank.db"
+        gp.persist_to_database(sample_df, db_path)
+        from_db = gp.ModelBank.from_db(db_path, "Estructura", min_samples=5)
+        pd.testing.assert_frame_equal(from_db.fits, full.fits, check_dtype=False)
+
 
 # ── Test 5: Database Persistence ───────────────────────────────────────────────
 
@@ -289,6 +636,42 @@ class TestDatabasePersistence:
         assert set(db_df.columns) == set(sample_df.columns)
         assert len(db_df) == len(sample_df)
 
+    def test_persist_upserts_by_primary_key(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """A second persist updates existing probetas and keeps earlier ones."""
+        db_path = tmp_path / "test.db"
+        gp.persist_to_database(sample_df, db_path)
+
+        update = sample_df.iloc[:5].copy()
+        update["Resistencia_MPa"] = 1.0
+        extra = sample_df.iloc[:2].assign(ID_Probeta=["N1", "N2"])
+        written = gp.persist_to_database(pd.concat([update, extra]), db_path)
+
+        conn = sqlite3.connect(db_path)
+        db_df = pd.read_sql("SELECT * FROM Roturas", conn)
+        indexes = {r[1] for r in conn.execute("PRAGMA index_list(Roturas)")}
+        journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+
+        assert written == 7
+        assert len(db_df) == len(sample_df) + 2
+        assert (db_df.set_index("ID_Probeta").loc[update["ID_Probeta"], "Resistencia_MPa"] == 1.0).all()
+        assert {"idx_roturas_edad", "idx_roturas_estructura"} <= indexes
+        assert journal == "wal"
+
+    def test_persist_migrates_legacy_table(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """A Roturas table written by DataFrame.to_sql is migrated to the keyed schema."""
+        db_path = tmp_path / "test.db"
+        with sqlite3.connect(db_path) as conn:
+            sample_df.to_sql("Roturas", conn, index=False)
+        gp.persist_to_database(sample_df.iloc[:3], db_path)
+
+        conn = sqlite3.connect(db_path)
+        pk = [r[1] for r in conn.execute("PRAGMA table_info(Roturas)") if r[5]]
+        count = conn.execute("SELECT COUNT(*) FROM Roturas").fetchone()[0]
+        conn.close()
+        assert sorted(pk) == sorted(gp.KEY_COLS)
+        assert count == len(sample_df)
+
 
 # ── Test 6: Pipeline Integration ───────────────────────────────────────────────
 
@@ -309,17 +692,42 @@ class TestPipelineIntegration:
         assert "anova_estructura" in result
         assert "pred_model" in result
 
+    def test_pipeline_bootstrap_reaches_report(self, sample_csv: Path, tmp_path: Path):
+        """run_pipeline(bootstrap=N) attaches the intervals to the inference results."""
+        result = gp.run_pipeline(
+            files=[sample_csv],
+            output_dir=tmp_path,
+            db_path=tmp_path / "test.db",
+            skip_pdf=True,
+            bootstrap=500,
+        )
+        boot = result["inference"].bootstrap
+        assert boot is not None and boot.n_resamples == 500
+        assert "Bootstrap (500 remuestras" in (gp.PROJECT_ROOT / "Reporte_Control_Calidad_Grout.txt").read_text(
+            encoding="utf-8"
+        )
+
     def test_pipeline_creates_master_csv(self, sample_csv: Path, tmp_path: Path):
-        """run_pipeline() writes master_data_grout.csv to output_dir."""
+        """run_pipeline(export_csv=True) writes master_data_grout.csv to output_dir."""
         db_path = tmp_path / "test.db"
         gp.run_pipeline(
             files=[sample_csv],
             output_dir=tmp_path,
             db_path=db_path,
             skip_pdf=True,
+            export_csv=True,
         )
         assert (tmp_path / "master_data_grout.csv").exists()
 
+    def test_pipeline_creates_master_store(self, sample_csv: Path, tmp_path: Path):
+        """run_pipeline() writes the columnar master store (and no CSV by default)."""
+        result = gp.run_pipeline(
+            files=[sample_csv], output_dir=tmp_path, db_path=tmp_path / "test.db", skip_pdf=True,
+        )
+        store = ms.open_master_store(tmp_path / ms.MASTER_STORE_NAME)
+        assert len(store) == len(result["df"])
+        assert not (tmp_path / "master_data_grout.csv").exists()
+
     def test_pipeline_persists_to_sqlite(self, sample_csv: Path, tmp_path: Path):
         """run_pipeline() writes records to the SQLite database."""
         db_path = tmp_path / "test.db"
@@ -345,3 +753,538 @@ class TestPipelineIntegration:
             skip_pdf=True,
         )
         assert result["pred_model"].r2_score > 0.5
+
+
+# ── Test 7: Incremental Mode ───────────────────────────────────────────────────
+
+class TestIncrementalMode:
+    def test_accumulator_merge_matches_descriptive_stats(self, sample_df: pd.DataFrame):
+        """Merging per-chunk moments reproduces compute_descriptive_stats()."""
+        acc = gp.StatsAccumulator.from_frame(sample_df.iloc[:13])
+        acc.merge(gp.StatsAccumulator.from_frame(sample_df.iloc[13:]))
+
+        pd.testing.assert_frame_equal(
+            acc.to_frame(), gp.compute_descriptive_stats(sample_df), check_dtype=False,
+        )
+
+    def test_unchanged_rerun_detects_nothing(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """A second update with the same rows reports no changes and adds no rows."""
+        db_path = tmp_path / "test.db"
+        first = gp.update_incremental(sample_df, db_path)
+        second = gp.update_incremental(sample_df, db_path)
+
+        assert len(first.new_rows) == len(sample_df)
+        assert not second.has_changes
+        assert len(gp.load_history(db_path)) == len(sample_df)
+
+    def test_changed_and_new_rows_update_aggregates(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """Stored moments and model sums match a full recompute after an update."""
+        db_path = tmp_path / "test.db"
+        gp.update_incremental(sample_df, db_path)
+
+        df_next = sample_df.copy()
+        df_next.loc[2, "Resistencia_MPa"] = 10.0   # changed → new minimum at 1 day
+        extra = sample_df.iloc[:3].assign(ID_Probeta=["N1", "N2", "N3"])
+        df_next = pd.concat([df_next, extra], ignore_index=True)
+
+        update = gp.update_incremental(df_next, db_path)
+        assert len(update.changed_rows) == 1
+        assert len(update.new_rows) == 3
+
+        pd.testing.assert_frame_equal(
+            update.accumulator.to_frame(), gp.compute_descriptive_stats(df_next),
+            check_dtype=False,
+        )
+        full = gp.PredictiveModel()
+        full.train(df_next)
+        online = gp.PredictiveModel()
+        online.train_from_sums(update.sums)
+        assert online.slope == pytest.approx(full.slope)
+        assert online.intercept == pytest.approx(full.intercept)
+        assert online.r2_score == pytest.approx(full.r2_score)
+
+    def test_partial_fit_matches_full_train(self, sample_df: pd.DataFrame):
+        """Feeding batches through partial_fit() equals one train() on all rows, and is reversible."""
+        full = gp.PredictiveModel()
+        full.train(sample_df)
+        online = gp.PredictiveModel()
+        for start in range(0, len(sample_df), 7):
+            online.partial_fit(sample_df.iloc[start:start + 7])
+        assert online.n_samples == full.n_samples
+        assert online.slope == pytest.approx(full.slope)
+        assert online.resid_var == pytest.approx(full.resid_var)
+
+        head = gp.PredictiveModel()
+        head.train(sample_df.iloc[:20])
+        online.partial_fit(sample_df.iloc[20:], sign=-1)
+        assert online.intercept == pytest.approx(head.intercept)
+
+    def test_persist_keeps_model_sums_current(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """Full-mode persistence maintains Modelo_Sumas across overwrites and new rows."""
+        db_path = tmp_path / "test.db"
+        gp.persist_to_database(sample_df, db_path)
+
+        df_next = sample_df.iloc[:10].copy()
+        df_next.loc[2, "Resistencia_MPa"] = 10.0
+        extra = sample_df.iloc[:3].assign(ID_Probeta=["N1", "N2", "N3"])
+        gp.persist_to_database(pd.concat([df_next, extra], ignore_index=True), db_path)
+
+        history = gp.load_history(db_path)
+        full = gp.PredictiveModel()
+        full.train(history)
+        stored = gp.load_model(db_path)
+        assert stored.n_samples == len(history) == len(sample_df) + 3
+        assert stored.slope == pytest.approx(full.slope)
+        assert stored.intercept == pytest.approx(full.intercept)
+
+    def test_load_model_without_stored_sums(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """A database without Modelo_Sumas falls back to per-age SQL sums."""
+        db_path = tmp_path / "legacy.db"
+        with sqlite3.connect(db_path) as conn:
+            sample_df.to_sql("Roturas", conn, index=False)
+        full = gp.PredictiveModel()
+        full.train(sample_df)
+        assert gp.load_model(db_path).slope == pytest.approx(full.slope)
+
+    def test_pipeline_incremental_skips_outputs_without_changes(self, sample_csv: Path, tmp_path: Path):
+        """run_pipeline(incremental=True) reuses previous outputs when nothing changed."""
+        db_path = tmp_path / "test.db"
+        kwargs = dict(output_dir=tmp_path, db_path=db_path, skip_pdf=True, incremental=True)
+        first = gp.run_pipeline(files=[sample_csv], **kwargs)
+        second = gp.run_pipeline(files=[sample_csv], **kwargs)
+
+        assert first["anova_edad"] is not None
+        assert second["anova_edad"] is None
+        assert not second["incremental"].has_changes
+        assert second["inference"].fck_project == pytest.approx(first["inference"].fck_project)
+
+    def test_full_and_incremental_runs_share_state(self, sample_csv: Path, tmp_path: Path,
+                                                   caplog: pytest.LogCaptureFixture,
+                                                   monkeypatch: pytest.MonkeyPatch):
+        """A full run keeps the incremental state; full mode analyses the loaded files,
+        incremental mode the history, and an unchanged incremental run never reads it."""
+        db_path = tmp_path / "test.db"
+        kwargs = dict(output_dir=tmp_path, db_path=db_path, skip_pdf=True, spc=False)
+        first = gp.run_pipeline(files=[sample_csv], **kwargs)
+
+        with sqlite3.connect(db_path) as conn:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        assert set(gp.INCREMENTAL_TABLES) <= tables
+
+        def no_history(*args):
+            raise AssertionError("load_history() en una ejecucion sin cambios")
+
+        with monkeypatch.context() as m, caplog.at_level("INFO", logger=gp.log.name):
+            m.setattr(gp, "load_history", no_history)
+            m.setattr(gp, "bootstrap_28d", no_history)
+            again = gp.run_pipeline(files=[sample_csv], incremental=True, bootstrap=100, **kwargs)
+        assert not again["incremental"].has_changes
+        assert "sin probetas nuevas" in caplog.text and "inicializando" not in caplog.text
+        assert again["inference"].fck_project == pytest.approx(first["inference"].fck_project)
+
+        extra = _make_sample_df(6).assign(ID_Probeta=[f"N{i}" for i in range(6)])
+        extra_csv = _write_raw_csv(extra, tmp_path / "extra.csv")
+        full = gp.run_pipeline(files=[extra_csv], **kwargs)
+        assert len(full["df"]) == 6
+        incr = gp.run_pipeline(files=[sample_csv, extra_csv], incremental=True, **kwargs)
+        assert not incr["incremental"].has_changes
+        extra_csv.write_text(extra_csv.read_text().replace("N5", "N6"))
+        incr = gp.run_pipeline(files=[extra_csv], incremental=True, **kwargs)
+        assert len(incr["incremental"].new_rows) == 1
+        assert len(incr["df"]) == len(first["df"]) + 7
+
+# ── Test 8: Stage Scheduler ────────────────────────────────────────────────────
+
+def _burn_cpu(seconds: float) -> None:
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def _sleep_then(value: str, seconds: float, *deps: str) -> str:
+    time.sleep(seconds)
+    return value + "".join(deps)
+
+
+class TestStageScheduler:
+    def _stages(self) -> list:
+        return [
+            gp.PipelineStage("c", partial(_sleep_then, "c", 0.05), ("a", "b")),
+            gp.PipelineStage("a", partial(_sleep_then, "a", 0.20), ("x",)),
+            gp.PipelineStage("b", partial(_sleep_then, "b", 0.05), ("x",)),
+        ]
+
+    @pytest.mark.parametrize("workers,executor", [(1, "thread"), (3, "thread"), (3, "process")])
+    def test_results_and_critical_path(self, workers: int, executor: str):
+        """Independent stages run in parallel; results and critical path match the DAG."""
+        schedule = gp.run_stages(self._stages(), {"x": "!"}, workers=workers, executor=executor)
+
+        assert schedule.results["c"] == "ca!b!"
+        assert schedule.critical_path == ["a", "c"]
+        assert list(schedule.durations) == ["a", "b", "c"]
+        if workers > 1 and executor == "thread":   # process start-up time is not bounded
+            assert schedule.wall_time < sum(schedule.durations.values())
+
+    def test_rejects_cycles_and_unknown_inputs(self):
+        """Cycles and undeclared inputs raise ValueError before anything runs."""
+        cycle = [gp.PipelineStage("a", str, ("b",)), gp.PipelineStage("b", str, ("a",))]
+        with pytest.raises(ValueError):
+            gp.run_stages(cycle)
+        with pytest.raises(ValueError):
+            gp.run_stages([gp.PipelineStage("a", str, ("missing",))])
+
+    def test_chained_stages_never_overlap(self):
+        """Stages chained with _chain_stages run one after another even with spare workers."""
+        stages = [
+            gp.PipelineStage("p1", partial(_sleep_then, "p1", 0.05), ("x",)),
+            gp.PipelineStage("p2", partial(_sleep_then, "p2", 0.05), ("x",)),
+            gp.PipelineStage("free", partial(_sleep_then, "f", 0.05), ("x",)),
+        ]
+        chained = gp._chain_stages(stages, ("p2", "missing", "p1"))
+        assert [s.after for s in chained] == [("p2",), (), ()]
+
+        metrics = gp.run_stages(chained, {"x": "!"}, workers=3).metrics
+        assert metrics["p1"].start >= metrics["p2"].start + metrics["p2"].wall_s - 0.01
+
+    def test_pipeline_parallel_stages_match_serial(self, sample_csv: Path, tmp_path: Path):
+        """run_pipeline(stage_workers=4) returns the same analysis as the serial run."""
+        kwargs = dict(files=[sample_csv], output_dir=tmp_path, db_path=tmp_path / "t.db", skip_pdf=True)
+        serial   = gp.run_pipeline(**kwargs)
+        parallel = gp.run_pipeline(stage_workers=4, **kwargs)
+
+        pd.testing.assert_frame_equal(
+            parallel["anova_edad"].anova_table, serial["anova_edad"].anova_table,
+        )
+        assert parallel["pred_model"].slope == pytest.approx(serial["pred_model"].slope)
+        assert set(parallel["plot_paths"]) == set(serial["plot_paths"])
+        assert parallel["schedule"].critical_path[-1] in parallel["schedule"].durations
+
+
+# ── Test 9: Plot Rendering ─────────────────────────────────────────────────────
+
+class TestPlotRendering:
+    def _analysis(self, df: pd.DataFrame):
+        model = gp.PredictiveModel()
+        model.train(df)
+        return model, gp.perform_anova(df, "Edad_Dias"), gp.perform_anova(df, "Estructura")
+
+    def test_parallel_plots_match_serial_names(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """Process-pool rendering writes the same {name: Path} mapping as serial."""
+        serial_dir, parallel_dir = tmp_path / "serial", tmp_path / "parallel"
+        serial_dir.mkdir(); parallel_dir.mkdir()
+        serial   = gp.generate_plots(sample_df, *self._analysis(sample_df), serial_dir)
+        parallel = gp.generate_plots(sample_df, *self._analysis(sample_df), parallel_dir, workers=3)
+
+        assert set(serial) == set(gp.PLOT_FILES)
+        assert set(parallel) == set(serial)
+        assert all(p.parent == parallel_dir and p.stat().st_size > 0 for p in parallel.values())
+
+    def test_plot_selection(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """Only the requested plots are rendered; unknown names are rejected."""
+        paths = gp.generate_plots(sample_df, *self._analysis(sample_df), tmp_path, plots=["kde"])
+        assert list(paths) == ["kde"]
+        assert sorted(p.name for p in tmp_path.glob("*.png")) == [gp.PLOT_FILES["kde"]]
+        with pytest.raises(ValueError):
+            gp.generate_plots(sample_df, *self._analysis(sample_df), tmp_path, plots=["pie"])
+
+    def test_plot_cache_skips_unchanged_figures(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """A second run with the same data copies PNGs from the cache; changed data re-renders."""
+        cache = gp.PlotCache(tmp_path / "cache")
+        out = tmp_path / "out"
+        out.mkdir()
+        gp.generate_plots(sample_df, *self._analysis(sample_df), out, cache=cache)
+        assert (cache.hits, cache.misses) == (0, len(gp.PLOT_FILES))
+
+        (out / gp.PLOT_FILES["kde"]).unlink()
+        paths = gp.generate_plots(sample_df, *self._analysis(sample_df), out, cache=cache)
+        assert cache.hits == len(gp.PLOT_FILES)
+        assert paths["kde"].exists()
+
+        changed = sample_df.copy()
+        changed.loc[0, "Estructura"] = "Muro"   # only the Estructura boxplot depends on it
+        gp.generate_plots(changed, *self._analysis(changed), out, cache=cache)
+        assert cache.misses == len(gp.PLOT_FILES) + 1
+
+    def test_plot_cache_eviction_by_size_and_age(self, tmp_path: Path):
+        """evict() drops entries older than max_age_s and the LRU ones above max_bytes."""
+        cache = gp.PlotCache(tmp_path / "cache", max_bytes=250, max_age_s=3600)
+        src = tmp_path / "src.png"
+        src.write_bytes(b"x" * 100)
+        for i, age in enumerate([7200, 30, 20, 10]):
+            cache.put(f"k{i}", src)
+            stamp = time.time() - age
+            os.utime(cache.root / f"k{i}.png", (stamp, stamp))
+
+        assert cache.evict() == 2
+        assert sorted(p.name for p in cache.root.iterdir()) == ["k2.png", "k3.png"]
+
+
+# ── Test 10: Benchmark Harness ─────────────────────────────────────────────────
+
+class TestBenchmarkHarness:
+    def test_synthetic_workbooks_round_trip(self, tmp_path: Path):
+        """Generated raw workbooks load back through load_files() unchanged."""
+        df = bench.make_frame(250)
+        files = bench.write_workbooks(df, tmp_path, rows_per_file=100)
+        loaded = gp.load_files(files)
+
+        assert len(files) == 3
+        assert len(loaded) == len(df)
+        np.testing.assert_allclose(loaded["Resistencia_MPa"], df["Resistencia_MPa"])
+
+    def test_run_and_compare(self):
+        """run_benchmarks() reports each stage; compare_results() flags slowdowns."""
+        report = bench.run_benchmarks(sizes=[200], stages=["compute_inference"], repeat=1)
+        (row,) = report["results"]
+        assert row["stage"] == "compute_inference" and row["n"] == 200
+        assert row["seconds"] > 0 and row["peak_mb"] >= 0
+
+        slower = {"results": [dict(row, seconds=row["seconds"] + 1.0)]}
+        assert bench.compare_results(report, report) == []
+        assert len(bench.compare_results(slower, report)) == 1
+
+
+# ── Test 11: Stage Instrumentation ─────────────────────────────────────────────
+
+class TestStageInstrumentation:
+    def test_pipeline_returns_trace(self, sample_csv: Path, tmp_path: Path):
+        """run_pipeline() records every stage with timings and row counts."""
+        result = gp.run_pipeline(
+            files=[sample_csv], output_dir=tmp_path, db_path=tmp_path / "t.db",
+            skip_pdf=True, trace_memory=True,
+        )
+        by_name = {m.name: m for m in result["trace"].stages}
+
+        assert {"load_files", "inference", "anova_edad", "plot_paths", "report_text"} <= set(by_name)
+        assert by_name["load_files"].rows_out == 30
+        assert by_name["anova_edad"].rows_in == 30
+        assert all(m.wall_s >= 0 and m.cpu_s >= 0 for m in by_name.values())
+        assert by_name["anova_edad"].traced_peak_mb is not None
+
+    def test_rss_is_per_stage_and_pool_cpu_counted(self):
+        """RSS is reported per stage (not the process high-water mark) and
+        CPU of ProcessPool workers is attributed to the stage."""
+        trace = gp.PipelineTrace()
+        with trace.stage("alloc"):
+            block = np.ones(64 * 2**20 // 8)  # 64 MB
+        del block
+        with trace.stage("after"):
+            pass
+        with trace.stage("pool"):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                pool.submit(_burn_cpu, 0.3).result()
+        alloc, after, pooled = trace.stages
+        if alloc.rss_mb is None:
+            pytest.skip("RSS no medible en esta plataforma")
+        assert alloc.rss_delta_mb > 32
+        assert abs(after.rss_delta_mb) < 16
+        assert pooled.child_cpu_s >= 0.2
+
+    @pytest.mark.parametrize("fmt", ["json", "chrome"])
+    def test_trace_file_formats(self, sample_csv: Path, tmp_path: Path, fmt: str):
+        """--trace writes a plain JSON trace or a Chrome Trace Event file."""
+        trace_path = tmp_path / f"trace_{fmt}.json"
+        gp.run_pipeline(
+            files=[sample_csv], output_dir=tmp_path, db_path=tmp_path / "t.db",
+            skip_pdf=True, stage_workers=2, trace_path=trace_path, trace_format=fmt,
+        )
+        data = json.loads(trace_path.read_text(encoding="utf-8"))
+        if fmt == "chrome":
+            events = data["traceEvents"]
+            assert all(e["ph"] == "X" and e["ts"] >= 0 for e in events)
+            assert "persist" in {e["name"] for e in events}
+        else:
+            assert "persist" in {m["name"] for m in data["stages"]}
+
+
+# ── Test 12: Database Queries ──────────────────────────────────────────────────
+
+class TestDatabaseQueries:
+    @pytest.fixture
+    def db_path(self, sample_df: pd.DataFrame, tmp_path: Path) -> Path:
+        df = sample_df.copy()
+        df.loc[:14, "Origen_Archivo"] = "otro.xlsx"
+        gp.persist_to_database(df, tmp_path / "test.db")
+        return tmp_path / "test.db"
+
+    def test_query_stats_and_inference_match_pandas(self, sample_df: pd.DataFrame, db_path: Path):
+        """SQL-side aggregates reproduce the in-memory descriptive stats and inference."""
+        by_estructura = gp.query_descriptive_stats(db_path, by="Estructura")
+        pd.testing.assert_frame_equal(
+            by_estructura, gp.compute_descriptive_stats(sample_df, by="Estructura"),
+            check_dtype=False,
+        )
+        fast, full = gp.query_inference(db_path), gp.compute_inference(sample_df)
+        assert fast.fck_project == pytest.approx(full.fck_project)
+        assert fast.p_value_28d == pytest.approx(full.p_value_28d)
+
+    @pytest.mark.parametrize("factor", ["Edad_Dias", "Estructura"])
+    def test_query_anova_matches_perform_anova(self, sample_df: pd.DataFrame, db_path: Path, factor: str):
+        """ANOVA from SQL group sums matches perform_anova()."""
+        pd.testing.assert_frame_equal(
+            gp.query_anova(db_path, factor), gp.perform_anova(sample_df, factor).anova_table,
+        )
+
+    def test_query_filters(self, sample_df: pd.DataFrame, db_path: Path):
+        """Structure, source file and date filters restrict the aggregated rows."""
+        filt = gp.RoturasFilter(estructuras=["Viga"], archivos=["otro.xlsx"])
+        stats_df = gp.query_descriptive_stats(db_path, filt=filt)
+        expected = sample_df.iloc[:15].query("Estructura == 'Viga'")
+        assert stats_df["N"].sum() == len(expected)
+
+        today = date.today()
+        assert gp.query_moments(db_path, filt=gp.RoturasFilter(desde=str(today))).n_total == 0
+        assert gp.query_moments(db_path, filt=gp.RoturasFilter(hasta=str(today))).n_total == len(sample_df)
+
+
+# ── Test 13: Columnar Master Store ─────────────────────────────────────────────
+
+class TestMasterStore:
+    def test_round_trip(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """The store reads back the same frame, with memory-mapped numeric columns."""
+        df = sample_df.copy()
+        df.loc[3, "Estructura"] = np.nan
+        df.loc[4, "Fecha_Rotura"] = np.nan
+        store = ms.open_master_store(ms.write_master_store(df, tmp_path / "m.cols"))
+
+        assert isinstance(store.column("Resistencia_MPa"), np.memmap)
+        assert list(store.column("Estructura").categories) == ["Losa", "Pilar", "Viga"]
+        pd.testing.assert_frame_equal(store.to_frame(), df, check_dtype=False)
+        assert list(store.to_frame(["Edad_Dias"]).columns) == ["Edad_Dias"]
+        assert {c: store.count(c) for c in store.columns} == df.count().to_dict()
+
+    def test_rewrite_replaces_store(self, sample_df: pd.DataFrame, tmp_path: Path):
+        """Writing again replaces the previous store atomically."""
+        path = tmp_path / "m.cols"
+        ms.write_master_store(sample_df, path)
+        ms.write_master_store(sample_df.iloc[:5], path)
+        assert len(ms.open_master_store(path)) == 5
+        assert [p.name for p in tmp_path.iterdir()] == ["m.cols"]
+
+
+# ── Test 14: Statistical Process Control ───────────────────────────────────────
+
+def _make_pour_df(n_days: int = 40, shift_from: int | None = None) -> pd.DataFrame:
+    """Three breaks per pour day for one structure at 28 days; optional -15 MPa shift."""
+    rng = np.random.default_rng(3)
+    days = pd.date_range("2024-01-01", periods=n_days)
+    rows = []
+    for i, day in enumerate(days):
+        shift = -15.0 if shift_from is not None and i >= shift_from else 0.0
+        for j in range(3):
+            rows.append({
+                "ID_Probeta": f"P{i:03d}{j}", "Estructura": "Pilar", "Fecha_Vaciado": day,
+                "Edad_Dias": 28.0, "Resistencia_MPa": rng.normal(118 + shift, 4),
+            })
+    return pd.DataFrame(rows)
+
+
+class TestSPC:
+    def test_incremental_updates_match_single_pass(self, tmp_path: Path):
+        """Feeding pours in batches (with overlapping reruns) equals one pass over all of them."""
+        df = _make_pour_df()
+        batched, single = tmp_path / "batched.db", tmp_path / "single.db"
+        gp.update_spc(batched, df.iloc[:45])
+        gp.update_spc(batched, df.iloc[:90])       # overlap: already charted pours are skipped
+        gp.update_spc(batched, df)
+        assert gp.update_spc(batched, df).empty    # rerun adds nothing
+        gp.update_spc(single, df)
+
+        pd.testing.assert_frame_equal(gp.load_spc_points(batched), gp.load_spc_points(single))
+        assert len(gp.load_spc_points(single)) == 40
+
+    def test_shift_is_flagged_after_baseline(self, tmp_path: Path):
+        """A sustained drop after the baseline trips the X-bar, EWMA and CUSUM charts."""
+        points = gp.update_spc(tmp_path / "spc.db", _make_pour_df(shift_from=30))
+        phase_one = points[points["Fase"] == "I"]
+        assert len(phase_one) == gp.SPC_BASELINE
+        assert not phase_one["Fuera_Control"].any()
+
+        before, after = points.iloc[gp.SPC_BASELINE:30], points.iloc[30:]
+        assert not before["Fuera_CUSUM"].any()
+        assert after["Fuera_X"].any() and after["Fuera_EWMA"].iloc[-1] and after["Fuera_CUSUM"].iloc[-1]
+        sigma = (points["Rango"].iloc[:gp.SPC_BASELINE] / 1.693).mean()
+        assert points["LCS_X"].iloc[-1] == pytest.approx(points["LC_X"].iloc[-1] + 3 * sigma / np.sqrt(3))
+
+    def test_late_pours_are_named_in_warning(self, tmp_path: Path, caplog: pytest.LogCaptureFixture):
+        """Subgroups dated before the last charted pour are skipped with a warning naming them."""
+        df = _make_pour_df()
+        db_path = tmp_path / "spc.db"
+        late = df["Fecha_Vaciado"] == df["Fecha_Vaciado"].iloc[0]
+        gp.update_spc(db_path, df[~late])
+        with caplog.at_level("WARNING", logger=gp.log.name):
+            assert gp.update_spc(db_path, df[late]).empty
+        assert "1 subgrupo(s)" in caplog.text
+        assert "28d/Pilar/2024-01-01 (ultimo 2024-02-09)" in caplog.text
+
+    def test_pipeline_feeds_only_unseen_rows(self, sample_csv: Path, tmp_path: Path,
+                                             caplog: pytest.LogCaptureFixture):
+        """Rerunning the full pipeline does not regroup the history into the charts."""
+        kwargs = dict(output_dir=tmp_path, db_path=tmp_path / "test.db", skip_pdf=True)
+        gp.run_pipeline(files=[sample_csv], **kwargs)
+        with caplog.at_level("WARNING", logger=gp.log.name):
+            again = gp.run_pipeline(files=[sample_csv], **kwargs)
+        assert again["spc"].new_points == 0
+        assert "se omiten" not in caplog.text
+
+    def test_pipeline_updates_charts(self, sample_csv: Path, tmp_path: Path):
+        """run_pipeline() records SPC points and returns the summary; spc=False skips it."""
+        result = gp.run_pipeline(
+            files=[sample_csv], output_dir=tmp_path, db_path=tmp_path / "test.db", skip_pdf=True,
+        )
+        assert result["spc"].new_points == len(result["spc"].table)  # one pour per chart
+        assert set(result["spc"].table["Edad_Dias"]) == {1.0, 7.0, 28.0}
+        assert not result["spc"].chart_paths
+
+        off = gp.run_pipeline(
+            files=[sample_csv], output_dir=tmp_path, db_path=tmp_path / "off.db", skip_pdf=True, spc=False,
+        )
+        assert off["spc"] is None
+
+
+# ── Test 15: PDF Reports ───────────────────────────────────────────────────────
+
+class TestPdfReport:
+    def test_table_repeats_header_on_each_page(self, tmp_path: Path):
+        """data_table() paginates a long table and redraws the header on every page."""
+        pytest.importorskip("fpdf")
+        pdf = gp._pdf_template()()
+        pdf.compress = False
+        pdf.add_page()
+        rows = ([str(i), "Pilar", "3", "0", "0", "0", "0", "2024-01-01"] for i in range(150))
+        pdf.data_table(gp.SPC_COLUMNS, gp.SPC_WIDTHS, rows, row_h=6, font_size=8)
+        data = bytes(pdf.output())
+
+        assert pdf.page_no() > 2
+        assert data.count(b"(Ultimo vaciado)") == pdf.page_no()
+
+    def test_embedded_images_are_downsampled_and_cached(self, tmp_path: Path):
+        """Plots are shrunk to PDF_IMAGE_MAX_PX with a palette; a rewritten PNG is reprocessed."""
+        from PIL import Image
+
+        src = tmp_path / "big.png"
+        Image.new("RGB", (3000, 1500), "white").save(src)
+        first = Image.open(gp._pdf_image(src))
+        assert first.size == (gp.PDF_IMAGE_MAX_PX, gp.PDF_IMAGE_MAX_PX // 2)
+        assert first.mode == "P"
+
+        hits = gp._compressed_png.cache_info().hits
+        gp._pdf_image(src)
+        assert gp._compressed_png.cache_info().hits == hits + 1
+
+        Image.new("RGB", (800, 400), "white").save(src)
+        os.utime(src, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert Image.open(gp._pdf_image(src)).size == (800, 400)
+
+    def test_structure_reports(self, tmp_path: Path):
+        """One text + PDF report per structure with enough breaks; small structures are skipped."""
+        pytest.importorskip("fpdf")
+        df = _make_sample_df(60)
+        df = df[~((df["Estructura"] == "Losa") & (df.index > 30))]   # Losa: 10 breaks, below min_samples
+        paths = gp.generate_structure_reports(df, tmp_path, workers=2, min_samples=12)
+
+        assert sorted(paths) == ["Pilar", "Viga"]
+        assert all(p.suffix == ".pdf" and p.stat().st_size > 0 for p in paths.values())
+        text = (tmp_path / "Reporte_Pilar.txt").read_text(encoding="utf-8")
+        assert "Estructura: Pilar" in text
+        assert "4. MODELO PREDICTIVO LOGARITMICO" in text and "Factor: Estructura" not in text
@@ -0,0 +1,758 @@
+"""
+test_scrapers.py — Pytest suite for the price/news scrapers
+==============================================================
+Blue Tech | Scrapers de materiales
+
+Tests cover (offline: stub transports, HTML fixtures and fake sessions):
+  - Async fetch engine (token bucket, per-host limits, run_sources)
+  - HTTP response cache (sources.http_cache)
+  - Store scrapers (ScraperLogic parsers, scrape_tiendas, crawl_tiendas)
+  - Store crawler (scope, visited set, max_pages, frontier bound)
+  - Incremental storage (DatabaseManager.batch_writer)
+  - HTML parsing layer (sources.html_parsing, Numbeo table parser)
+
+Run:
+  pytest tests/python/test_scrapers.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# ── Path setup ────────────────────────────────────────────────────────────────
+REPO_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import crawler  # noqa: E402
+import scraper_runner  # noqa: E402
+from database_manager import DatabaseManager  # noqa: E402
+from sources import html_parsing, http_cache  # noqa: E402
+from sources.base_scraper import ScraperSource  # noqa: E402
+from sources.fetch_engine import (  # noqa: E402
+    AsyncHttpClient,
+    HostLimit,
+    TokenBucket,
+    create_session,
+    run_sources,
+)
+from sources.http_cache import CacheMiss, CachingAdapter, HttpCache  # noqa: E402
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def isolated_http_cache(tmp_path, monkeypatch):
+    """Keeps the shared HTTP cache of every session out of the repo's data/."""
+    monkeypatch.setenv("HTTP_CACHE_DIR", str(tmp_path / "http_cache"))
+    http_cache.shared_cache.cache_clear()
+    yield
+    http_cache.shared_cache.cache_clear()
+
+
+class StubTransport:
+    """
+    Replaces HTTPAdapter.send: answers from `pages` ({url: (status, headers,
+    body)}) and records the headers of every request that hits the network.
+    """
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+        self.calls: list[tuple[str, dict]] = []
+
+    def __call__(self, adapter, request, stream=False, **kwargs):
+        self.calls.append((request.url, dict(request.headers)))
+        status, headers, body = self.pages[request.url]
+        if callable(status):
+            status, headers, body = status(request)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    stub = StubTransport({})
+    # A plain function so it binds as a method of every adapter instance
+    monkeypatch.setattr(
+        HTTPAdapter, "send", lambda adapter, request, **kw: stub(adapter, request, **kw)
+    )
+    return stub
+
+
+def _session(cache: HttpCache) -> requests.Session:
+    return create_session(cache=cache, retries=0)
+
+
+class FakeSession:
+    """
+    Stand-in for requests.Session: every request sleeps `delay` seconds and
+    the peak number of simultaneous requests per host is recorded.
+    """
+
+    def __init__(self, delay: float = 0.05, pages: dict | None = None, strict=False):
+        self.delay = delay
+        self.pages = pages or {}
+        self.strict = strict  # unknown URLs answer 404
+        self.calls: list[str] = []
+        self.active: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+        self.closed = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers=None, timeout=None, **kwargs):
+        host = url.split("/")[2]
+        with self._lock:
+            self.calls.append(url)
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        time.sleep(self.delay)
+        with self._lock:
+            self.active[host] -= 1
+        response = requests.Response()
+        response.status_code = 200 if url in self.pages or not self.strict else 404
+        response._content = self.pages.get(url, b"<html></html>")
+        response._content_consumed = True
+        response.url = url
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        self.closed += 1
+
+
+# ── Async fetch engine ────────────────────────────────────────────────────────
+
+class _UrlSource(ScraperSource):
+    def __init__(self, urls, fail=False):
+        super().__init__("Test", "USD")
+        self.urls = urls
+        self.fail = fail
+
+    def fetch_prices(self):
+        raise NotImplementedError
+
+    async def fetch_prices_async(self, client):
+        if self.fail:
+            raise ValueError("fuente rota")
+        responses = await asyncio.gather(*(client.get(u) for u in self.urls))
+        return [r.status_code for r in responses]
+
+
+class TestFetchEngine:
+    def test_token_bucket_paces_requests(self):
+        async def take(n):
+            bucket = TokenBucket(rate=20, capacity=1)
+            start = time.monotonic()
+            for _ in range(n):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        # The first token is free, the next 4 wait 1/20 s each
+        assert asyncio.run(take(5)) >= 0.19
+
+    def test_token_bucket_rejects_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0, capacity=1)
+
+    def test_per_host_concurrency(self):
+        session = FakeSession(delay=0.05)
+        client = AsyncHttpClient(
+            default_limit=HostLimit(concurrency=2, rate=1000, burst=1000),
+            host_limits={"lento.test": HostLimit(concurrency=1, rate=1000, burst=1000)},
+            session=session,
+        )
+
+        async def main():
+            urls = [f"http://rapido.test/{i}" for i in range(6)]
+            urls += [f"http://lento.test/{i}" for i in range(3)]
+            await asyncio.gather(*(client.get(u) for u in urls))
+
+        try:
+            asyncio.run(main())
+        finally:
+            client.close()
+        assert session.peak == {"rapido.test": 2, "lento.test": 1}
+
+    def test_cache_answers_skip_host_pacing(self, tmp_path, transport):
+        url = "http://lento.test/p"
+        transport.pages[url] = (200, {"Content-Type": "text/html"}, b"ok")
+        slow = HostLimit(concurrency=1, rate=0.5, burst=1)  # one token every 2 s
+
+        async def timed(client, urls):
+            start = time.monotonic()
+            results = await asyncio.gather(*(client.get(u) for u in urls), return_exceptions=True)
+            return time.monotonic() - start, results
+
+        client = AsyncHttpClient(default_limit=slow, session=_session(HttpCache(tmp_path, ttl=60)))
+        try:
+            asyncio.run(client.get(url))  # network: takes the only token
+            elapsed, results = asyncio.run(timed(client, [url] * 3))
+        finally:
+            client.close()
+        assert elapsed < 0.5 and len(transport.calls) == 1
+        assert all(r.content == b"ok" for r in results)
+
+        replay = HttpCache(tmp_path, mode="replay")
+        client = AsyncHttpClient(default_limit=slow, session=_session(replay))
+        try:
+            elapsed, results = asyncio.run(timed(client, [url, "http://lento.test/a", "http://lento.test/b"]))
+        finally:
+            client.close()
+        assert elapsed < 0.5 and len(transport.calls) == 1
+        assert results[0].content == b"ok"
+        assert all(isinstance(r, CacheMiss) for r in results[1:])
+
+    def test_run_sources_keeps_order_and_isolates_failures(self):
+        session = FakeSession(delay=0.01)
+        sources = [
+            _UrlSource(["http://a.test/1", "http://a.test/2"]),
+            _UrlSource([], fail=True),
+            _UrlSource(["http://b.test/1"]),
+        ]
+        results = run_sources(sources, session=session)
+        assert [r.ok for r in results] == [True, False, True]
+        assert results[0].raw == [200, 200] and results[2].raw == [200]
+        assert isinstance(results[1].error, ValueError)
+        assert session.closed == 1  # own client: closed exactly once
+
+    def test_run_sources_registers_declared_host_limit(self):
+        session = FakeSession(delay=0.02)
+
+        class Polite(_UrlSource):
+            HOST = "lento.test"
+            HOST_LIMIT = HostLimit(concurrency=1, rate=1000, burst=1000)
+
+        sources = [Polite([f"http://lento.test/{i}" for i in range(4)])]
+        run_sources(sources, session=session, default_limit=HostLimit(4, 1000, 1000))
+        assert session.peak["lento.test"] == 1
+
+    def test_host_limit_cannot_change_after_first_request(self):
+        client = AsyncHttpClient(session=FakeSession(delay=0))
+        try:
+            asyncio.run(client.get("http://a.test/"))
+            with pytest.raises(RuntimeError):
+                client.set_host_limit("a.test", HostLimit(concurrency=1))
+        finally:
+            client.close()
+
+    def test_numbeo_uses_its_host_limit(self):
+        from sources.numbeo_global import NumbeoGlobalScraper
+
+        scraper = NumbeoGlobalScraper()
+        session = FakeSession(delay=0, pages={scraper.url: b"<table id='t2'></table>"})
+        client = AsyncHttpClient(session=session)
+        try:
+            html = asyncio.run(scraper.fetch_prices_async(client))
+        finally:
+            client.close()
+        assert "t2" in html
+        assert client.host_limits[scraper.HOST] == scraper.HOST_LIMIT
+
+
+# ── HTTP cache ────────────────────────────────────────────────────────────────
+
+class TestHttpCache:
+    URL = "http://tienda.test/escolar"
+
+    def test_fresh_entry_served_without_network(self, tmp_path, transport):
+        transport.pages[self.URL] = (200, {"Content-Type": "text/html"}, b"<p>v1</p>")
+        session = _session(HttpCache(tmp_path, ttl=60))
+        first = session.get(self.URL)
+        second = session.get(self.URL)
+        assert len(transport.calls) == 1
+        assert second.from_cache and second.content == first.content == b"<p>v1</p>"
+
+    @pytest.mark.parametrize(
+        "validator, conditional",
+        [
+            ({"etag": '"v1"'}, ("If-None-Match", '"v1"')),
+            ({"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+             ("If-Modified-Since", "Wed, 21 Oct 2015 07:28:00 GMT")),
+        ],
+    )
+    def test_revalidation_304_reuses_body(self, tmp_path, transport, validator, conditional):
+        # Validator header names are matched case-insensitively
+        def answer(request):
+            if conditional[0] in request.headers:
+                return 304, {"ETag": '"v1"'}, b""
+            return 200, validator, b"<p>body</p>"
+
+        transport.pages[self.URL] = (answer, None, None)
+        cache = HttpCache(tmp_path, ttl=0)
+        session = _session(cache)
+        session.get(self.URL)
+        response = session.get(self.URL)
+        assert transport.calls[-1][1][conditional[0]] == conditional[1]
+        assert response.status_code == 200 and response.from_cache
+        assert response.content == b"<p>body</p>"
+        # touch() keeps one key per header, whatever case the server used
+        stored = [k for k in cache.get(self.URL)["headers"] if k.lower() == "etag"]
+        assert len(stored) <= 1
+
+    def test_lru_eviction_by_size(self, tmp_path, transport):
+        bodies = {f"http://t.test/{c}": bytes(range(256)) * 4 for c in "abc"}
+        for url, body in bodies.items():
+            transport.pages[url] = (200, {}, body)
+        cache = HttpCache(tmp_path, ttl=60)
+        session = _session(cache)
+        session.get("http://t.test/a")
+        entry_size = cache.size()
+        cache.max_bytes = 2 * entry_size
+        session.get("http://t.test/b")
+        session.get("http://t.test/a")  # hit: /a becomes the most recent
+        session.get("http://t.test/c")
+        assert cache.get("http://t.test/b") is None
+        assert cache.get("http://t.test/a") is not None
+        assert cache.get("http://t.test/c") is not None
+        assert cache.size() <= cache.max_bytes
+
+    def test_replay_mode(self, tmp_path, transport):
+        transport.pages[self.URL] = (200, {}, b"cached")
+        _session(HttpCache(tmp_path, ttl=0)).get(self.URL)
+        calls = len(transport.calls)
+        replay = _session(HttpCache(tmp_path, mode="replay"))
+        assert replay.get(self.URL).content == b"cached"
+        with pytest.raises(CacheMiss):
+            replay.get("http://tienda.test/otra")
+        assert len(transport.calls) == calls
+        # Scrapers catch RequestException: a miss behaves like being offline
+        assert issubclass(CacheMiss, requests.exceptions.RequestException)
+
+    @pytest.mark.parametrize("cache_control", ["no-store", "private, max-age=60"])
+    def test_no_store_not_cached(self, tmp_path, transport, cache_control):
+        transport.pages[self.URL] = (200, {"cache-control": cache_control}, b"x")
+        cache = HttpCache(tmp_path, ttl=60)
+        session = _session(cache)
+        session.get(self.URL)
+        session.get(self.URL)
+        assert len(transport.calls) == 2
+        assert cache.get(self.URL) is None
+
+    def test_server_cache_control_limits_freshness(self, tmp_path, transport):
+        transport.pages[self.URL] = (200, {"Cache-Control": "no-cache"}, b"x")
+        transport.pages["http://t.test/m"] = (200, {"Cache-Control": "max-age=0"}, b"y")
+        session = _session(HttpCache(tmp_path, ttl=3600))
+        for url in (self.URL, "http://t.test/m"):
+            session.get(url)
+            session.get(url)
+        assert len(transport.calls) == 4
+
+    def test_non_cacheable_status_not_stored(self, tmp_path, transport):
+        transport.pages[self.URL] = (503, {}, b"busy")
+        cache = HttpCache(tmp_path, ttl=60)
+        _session(cache).get(self.URL)
+        assert cache.get(self.URL) is None
+
+    def test_off_mode_creates_no_database(self, tmp_path, monkeypatch, transport):
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setenv("HTTP_CACHE_MODE", "off")
+        monkeypatch.setenv("HTTP_CACHE_DIR", str(cache_dir))
+        session = create_session()
+        assert not cache_dir.exists()
+        assert not isinstance(session.get_adapter("http://x.test"), CachingAdapter)
+
+    def test_use_cache_false_mounts_plain_adapter(self, tmp_path):
+        session = create_session(cache=HttpCache(tmp_path), use_cache=False)
+        assert not isinstance(session.get_adapter("https://x.test"), CachingAdapter)
+
+
+# ── Store crawler ─────────────────────────────────────────────────────────────
+
+def _listing(n_items: int, links=(), name: str = "p") -> bytes:
+    """Category page with `n_items` products and the given hrefs."""
+    items = "".join(f'<li class="product"><h2>{name}-{i}</h2></li>' for i in range(n_items))
+    anchors = "".join(f'<a class="next" href="{href}">sig</a>' for href in links)
+    return f"<html><body><ul>{items}</ul>{anchors}</body></html>".encode()
+
+
+def _parse_items(soup) -> list[dict]:
+    return [{"Material": h2.get_text()} for h2 in soup.select("li.product h2")]
+
+
+class _Site:
+    """Fake fetch: serves `pages` and records every fetched URL."""
+
+    def __init__(self, pages: dict, broken=()):
+        self.pages = pages
+        self.broken = set(broken)
+        self.fetched: list[str] = []
+
+    def __call__(self, url: str) -> bytes:
+        self.fetched.append(url)
+        if url in self.broken:
+            raise requests.HTTPError("500 Server Error")
+        return self.pages[url]
+
+
+BASE = "http://tienda.test/escolar"
+
+
+def _target(site: _Site, **kwargs) -> crawler.CrawlTarget:
+    return crawler.CrawlTarget("Test", BASE, fetch=site, parse=_parse_items, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def unpaced_crawl(monkeypatch):
+    """Fake sites need no politeness delay; pacing has its own test."""
+    monkeypatch.setattr(crawler, "HOST_LIMIT", HostLimit(concurrency=4, rate=1000, burst=1000))
+
+
+class _SlowSite(_Site):
+    """_Site that records start times and the peak number of parallel fetches."""
+
+    def __init__(self, pages: dict, delay: float = 0.05):
+        super().__init__(pages)
+        self.delay = delay
+        self.starts: list[float] = []
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, url: str) -> bytes:
+        with self.lock:
+            self.starts.append(time.monotonic())
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return super().__call__(url)
+
+
+class TestStoreCrawler:
+    @pytest.mark.parametrize(
+        "url, expected",
+        [
+            (BASE, True),
+            (BASE + "/", True),
+            (BASE + "?page=2", True),
+            (BASE + ".html?p=3", True),
+            (BASE + "/cuadernos", True),
+            ("http://TIENDA.test/escolar/lapices", True),
+            ("http://tienda.test/escolares-ofertas", False),
+            ("http://tienda.test/escolar-old/", False),
+            ("http://otra.test/escolar", False),
+            ("http://tienda.test/hogar", False),
+        ],
+    )
+    def test_scope(self, url, expected):
+        assert crawler.in_scope(url, _target(_Site({}))) is expected
+
+    def test_scope_from_page_with_extension(self):
+        target = crawler.CrawlTarget("T", "http://t.test/escolar.html", None, None)
+        assert crawler.in_scope("http://t.test/escolar.html?p=2", target)
+        assert crawler.in_scope("http://t.test/escolar/mochilas.html", target)
+        assert not crawler.in_scope("http://t.test/escolares.html", target)
+
+    def test_follows_pagination_once_per_url(self):
+        # Pages link back and forth (and with fragments): each one is fetched once
+        site = _Site({
+            BASE: _listing(2, [BASE + "?page=2", BASE + "#top"]),
+            BASE + "?page=2": _listing(2, [BASE, BASE + "?page=3", "/hogar"]),
+            BASE + "?page=3": _listing(1, [BASE + "?page=2"]),
+        })
+        batches = []
+        items = crawler.StoreCrawler(lambda m: None).crawl([_target(site)], batches.append)
+        assert items == {"Test": 5}
+        assert sorted(site.fetched) == sorted([BASE, BASE + "?page=2", BASE + "?page=3"])
+        assert sum(len(b) for b in batches) == 5
+
+    def test_max_pages(self):
+        chain = {f"{BASE}?page={i}": _listing(1, [f"{BASE}?page={i + 1}"]) for i in range(1, 10)}
+        chain[BASE] = _listing(1, [f"{BASE}?page=1"])
+        site = _Site(chain)
+        crawler.StoreCrawler(lambda m: None).crawl([_target(site, max_pages=3)], lambda b: None)
+        assert len(site.fetched) == 3
+
+    def test_failed_pages_do_not_use_the_budget(self):
+        links = [BASE + "?page=2", BASE + "?page=3", BASE + "?page=4"]
+        site = _Site(
+            {BASE: _listing(1, links), **{u: _listing(1) for u in links}},
+            broken={BASE + "?page=2"},
+        )
+        logs = []
+        items = crawler.StoreCrawler(logs.append, workers=1).crawl(
+            [_target(site, max_pages=3)], lambda b: None
+        )
+        assert len(site.fetched) == 4
+        assert items == {"Test": 3}
+        assert any("Error en Test" in m for m in logs)
+
+    def test_frontier_is_bounded(self):
+        links = [f"{BASE}?page={i}" for i in range(2, 7)]
+        site = _Site({BASE: _listing(1, links), **{u: _listing(1) for u in links}})
+        logs = []
+        crawler.StoreCrawler(logs.append, workers=1, frontier_size=2).crawl(
+            [_target(site)], lambda b: None
+        )
+        assert len(site.fetched) == 3
+        assert any("3 enlace(s) descartados" in m for m in logs)
+
+    def test_host_limit_paces_one_store(self):
+        links = [f"{BASE}?page={i}" for i in range(2, 7)]
+        site = _SlowSite({BASE: _listing(1, links), **{u: _listing(1) for u in links}}, delay=0.005)
+        other = _SlowSite({"http://otra.test/escolar": _listing(1)})
+        limit = HostLimit(concurrency=1, rate=20, burst=1)
+        crawler.StoreCrawler(
+            lambda m: None, workers=4, host_limits={"TIENDA.test": limit},
+        ).crawl(
+            [_target(site), crawler.CrawlTarget("Otra", "http://otra.test/escolar", other, _parse_items)],
+            lambda b: None,
+        )
+        assert len(site.fetched) == 6 and site.peak == 1
+        gaps = [b - a for a, b in zip(site.starts, site.starts[1:])]
+        assert min(gaps) >= 0.045  # 1/rate, within timer resolution
+        assert other.fetched == ["http://otra.test/escolar"]
+
+    def test_follow_selector_for_subcategories(self):
+        page = (
+            '<html><body><ul class="cats"><a href="/escolar/cuadernos">c</a>'
+            '<a href="/hogar">h</a></ul></body></html>'
+        ).encode()
+        site = _Site({BASE: page, BASE + "/cuadernos": _listing(2)})
+        items = crawler.StoreCrawler(lambda m: None).crawl(
+            [_target(site, follow=".cats a")], lambda b: None
+        )
+        assert items == {"Test": 2}
+        assert site.fetched == [BASE, BASE + "/cuadernos"]
+
+
+# ── Store scrapers ────────────────────────────────────────────────────────────
+
+def _tailoy(prices, next_href=None) -> bytes:
+    items = "".join(
+        f'<li class="item product product-item"><a class="product-item-link">Cuaderno {p}</a>'
+        f'<span data-price-type="finalPrice"><span class="price">Bs {p}</span></span></li>'
+        for p in prices
+    )
+    nxt = f'<a class="action next" href="{next_href}">Siguiente</a>' if next_href else ""
+    return f"<html><body><ol>{items}</ol><div class='pages'>{nxt}</div></body></html>".encode()
+
+
+def _libreria_brasil(prices, next_href=None) -> bytes:
+    items = "".join(
+        f'<li class="product type-product"><h2 class="woocommerce-loop-product__title">'
+        f'Lapiz {p}</h2><span class="price">{p}&nbsp;Bs.</span></li>'
+        for p in prices
+    )
+    nxt = f'<a class="next page-numbers" href="{next_href}">→</a>' if next_href else ""
+    return f"<html><body><ul class='products'>{items}</ul>{nxt}</body></html>".encode()
+
+
+def _materiales_bo(prices, next_href=None) -> bytes:
+    items = "".join(
+        f'<div class="main_box"><div class="desc"><h5><a>Mochila {p}</a></h5></div>'
+        f'<div class="price">Desde <span class="money">Bs {p}</span></div></div>'
+        for p in prices
+    )
+    nxt = f'<a rel="next" href="{next_href}">»</a>' if next_href else ""
+    return f"<html><body>{items}{nxt}</body></html>".encode()
+
+
+def _store_pages() -> dict:
+    t, lb, mb = (scraper_runner.TIENDAS[n].url for n in scraper_runner.TIENDAS)
+    return {
+        t: _tailoy(["12.50", "3.00"], next_href="?p=2"),
+        t + "?p=2": _tailoy(["7.25"]),
+        lb: _libreria_brasil(["12,50"], next_href="page/2/"),
+        lb + "page/2/": _libreria_brasil(["8,00", "1.250,00"]),
+        mb: _materiales_bo(["34,90"]),
+    }
+
+
+@pytest.fixture
+def logic(db) -> scraper_runner.ScraperLogic:
+    logic = scraper_runner.ScraperLogic(lambda msg: None)
+    logic.session = FakeSession(delay=0, pages=_store_pages(), strict=True)
+    logic.db = db
+    return logic
+
+
+def _prices(data, fuente):
+    return sorted(d["Precio_BS"] for d in data if d["Fuente"] == fuente)
+
+
+class TestScraperLogic:
+    def test_product_selector_derived_from_listado(self):
+        for nombre, tienda in scraper_runner.TIENDAS.items():
+            assert scraper_runner.SELECTORES[nombre]["producto"].pattern == tienda.listado
+
+    def test_scrape_tiendas_first_page_of_each_store(self, logic):
+        data, conteos = logic.scrape_tiendas()
+        assert conteos == {"Tailoy": 2, "Libreria Brasil": 1, "Materiales BO": 1}
+        assert _prices(data, "Tailoy") == [3.0, 12.5]
+        assert _prices(data, "Libreria Brasil") == [12.5]
+        assert _prices(data, "Materiales BO") == [34.9]
+        assert all(d["Material"] for d in data)
+
+    def test_scrape_tiendas_subset_and_failures(self, logic):
+        logic.session.pages.pop(scraper_runner.TIENDAS["Tailoy"].url)
+        data, conteos = logic.scrape_tiendas(["Tailoy", "Materiales BO"])
+        assert conteos == {"Tailoy": 0, "Materiales BO": 1}
+        assert {d["Fuente"] for d in data} == {"Materiales BO"}
+        assert logic.scrape_tiendas([]) == ([], {})
+
+    def test_single_page_scrape_uses_listing_subtree(self, logic):
+        url = scraper_runner.TIENDAS["Libreria Brasil"].url + "page/2/"
+        data = logic.scrape_libreria_brasil(url)
+        assert [d["Precio_BS"] for d in data] == [8.0, 1250.0]
+
+    def test_crawl_tiendas_saves_every_page(self, logic, db):
+        conteos, (ok, msg) = logic.crawl_tiendas()
+        assert conteos == {"Tailoy": 3, "Libreria Brasil": 3, "Materiales BO": 1}
+        assert ok and "7 registros" in msg
+        master = pd.read_csv(db.csv_filename)
+        assert sorted(master.loc[master["Fuente"] == "Libreria Brasil", "Precio_BS"]) == [
+            8.0, 12.5, 1250.0,
+        ]
+
+    def test_session_retries_transient_errors(self):
+        retry = scraper_runner.create_session().get_adapter("https://x.test").max_retries
+        assert retry.total == 3 and 503 in retry.status_forcelist
+        assert "POST" not in retry.allowed_methods
+
+
+# ── Incremental storage ───────────────────────────────────────────────────────
+
+def _products(n: int, start: int = 0) -> list[dict]:
+    return [
+        {"Fuente": "Test", "Material": f"Lapiz {i}", "Precio_BS": 1.5 + i, "Fecha_Consulta": "2026-01-05"}
+        for i in range(start, start + n)
+    ]
+
+
+@pytest.fixture
+def db(tmp_path) -> DatabaseManager:
+    return DatabaseManager(str(tmp_path / "maestro.xlsx"), str(tmp_path / "maestro.csv"))
+
+
+class TestBatchWriter:
+    def test_batches_staged_then_merged_on_close(self, db):
+        writer = db.batch_writer()
+        writer.write(_products(2))
+        writer.write([])
+        writer.write(_products(3, start=2))
+        staged = pd.read_csv(writer.staging_filename)
+        assert len(staged) == 5 and not Path(db.csv_filename).exists()
+
+        ok, msg = writer.close()
+        assert ok and "5 registros" in msg
+        assert not Path(writer.staging_filename).exists()
+        master = pd.read_csv(db.csv_filename, keep_default_na=False)
+        assert master["Material"].tolist() == [f"Lapiz {i}" for i in range(5)]
+        assert master["Precio"].tolist() == master["Precio_BS"].tolist()
+        assert set(master["Moneda"]) == {"BOB"}
+        assert set(master["Unidad"]) == {"N/A"}
+        assert len(pd.read_excel(db.filename)) == 5
+
+    def test_appends_to_existing_master(self, db):
+        db.save_data(_products(2))
+        with db.batch_writer() as writer:
+            writer.write(_products(3, start=10))
+        assert writer.result[0]
+        assert len(pd.read_csv(db.csv_filename)) == 5
+        assert len(pd.read_excel(db.filename)) == 5
+
+    def test_merges_written_batches_on_error(self, db):
+        with pytest.raises(RuntimeError):
+            with db.batch_writer() as writer:
+                writer.write(_products(2))
+                raise RuntimeError("scraper caido")
+        assert len(pd.read_csv(db.csv_filename)) == 2
+
+    def test_nothing_written(self, db):
+        with db.batch_writer() as writer:
+            pass
+        assert writer.result[0] is False
+        assert not Path(db.csv_filename).exists()
+        assert not Path(writer.staging_filename).exists()
+
+    def test_concurrent_writers_use_separate_staging(self, db):
+        first, second = db.batch_writer(), db.batch_writer()
+        assert first.staging_filename != second.staging_filename
+        assert Path(first.staging_filename).parent == Path(db.csv_filename).parent
+        first.write(_products(2))
+        second.write(_products(1, start=10))
+        first.write(_products(1, start=2))
+        assert first.close()[0] and second.close()[0]
+        assert sorted(pd.read_csv(db.csv_filename)["Material"]) == sorted(
+            [f"Lapiz {i}" for i in (0, 1, 2, 10)]
+        )
+
+
+# ── HTML parsing layer ────────────────────────────────────────────────────────
+
+PAGE = (
+    "<html><head><meta property='og:title' content='Titulo'></head><body>"
+    "<nav><a href='/x'>menu</a><li class='menu product-ish'>no</li></nav>"
+    "<ul><li class='item product type-product'><h2>A</h2></li>"
+    "<li class='product'><h2>B</h2></li><div class='product'>C</div></ul>"
+    "<table id='t2'><tr><td>1</td></tr></table><table id='t3'></table>"
+    "</body></html>"
+)
+
+
+class TestHtmlParsing:
+    def test_prefers_lxml_when_installed(self):
+        pytest.importorskip("lxml")
+        assert html_parsing.PARSER == "lxml"
+
+    def test_css_compiled_once(self):
+        assert html_parsing.css("li.product") is html_parsing.css("li.product")
+
+    def test_strainer_matches_class_tokens(self):
+        # "product" must match inside multi-class values but not "product-ish"
+        soup = html_parsing.make_soup(PAGE, only="li.product")
+        assert [li.h2.get_text() for li in soup.find_all("li", recursive=False)] == ["A", "B"]
+        assert soup.find("nav") is None and soup.find("div") is None
+
+    @pytest.mark.parametrize(
+        "selector, expected",
+        [(".product", ["A", "B", "C"]), ("table#t2", ["1"]), ("#t3", [""])],
+    )
+    def test_strainer_simple_selectors(self, selector, expected):
+        soup = html_parsing.make_soup(PAGE, only=selector)
+        assert [tag.get_text() for tag in soup.contents] == expected
+
+    def test_strainer_tag_only(self):
+        soup = html_parsing.make_soup(PAGE, only="meta")
+        assert soup.find("meta", property="og:title")["content"] == "Titulo"
+
+    @pytest.mark.parametrize("selector", ["ul li", "li.a.b", "a[href]", "li > h2", "#a#b"])
+    def test_strainer_rejects_complex_selectors(self, selector):
+        with pytest.raises(ValueError):
+            html_parsing.strainer(selector)
+
+    def test_restricted_and_full_parse_agree(self):
+        sel = html_parsing.css("li.product h2")
+        full = [h.get_text() for h in html_parsing.make_soup(PAGE).select(sel)]
+        only = [h.get_text() for h in html_parsing.make_soup(PAGE, only="li.product").select(sel)]
+        assert full == only == ["A", "B"]
+
+    def test_numbeo_table_parser(self):
+        from sources.numbeo_global import NumbeoGlobalScraper
+
+        html = (
+            "<html><body><div>ads</div><table id='t2'><tbody>"
+            "<tr><td>1</td><td>Bolivia</td><td>1,234.50</td></tr>"
+            "<tr><td>2</td><td>Peru</td><td>987.00</td></tr>"
+            "</tbody></table></body></html>"
+        )
+        rows = NumbeoGlobalScraper().format_data(html)
+        assert [(r["country"], r["price"]) for r in rows] == [("Bolivia", 1234.5), ("Peru", 987.0)]
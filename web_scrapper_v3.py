@@ -1,10 +1,11 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
 
 from urllib.parse import urljoin
 
+from sources.fetch_engine import create_session
+from sources.html_parsing import css, make_soup
+
 # Configuración de fuentes (Mapa de selectores)
 # Nota: Los selectores CSS deben verificarse periódicamente ya que los sitios cambian
 # Configuración de fuentes (Mapa de selectores)
@@ -261,14 +262,19 @@ def scrapear_noticias():
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     }
     data_global = []
+    # Sesión con caché HTTP en disco: las portadas que no cambiaron desde la
+    # última corrida se revalidan con ETag/Last-Modified en vez de bajarse
+    # completas (HTTP_CACHE_MODE=replay permite re-parsear sin conexión)
+    session = create_session(headers=headers)
 
     for fuente in FUENTES:
         try:
-            response = requests.get(fuente["url"], headers=headers, timeout=10)
-            soup = BeautifulSoup(response.text, "html.parser")
+            response = session.get(fuente["url"], timeout=10)
+            # Árbol completo: el enlace puede estar en un ancestro del titular
+            soup = make_soup(response.text)
 
-            # Buscamos los primeros 5 titulares
-            titulares = soup.select(fuente["selector"])[:5]
+            # Buscamos los primeros 5 titulares (el selector se compila una vez)
+            titulares = soup.select(css(fuente["selector"]), limit=5)
 
             if not titulares:
                 # Si no se encuentran titulares, lo consideramos un error de scraping (selector inválido o cambio en web)
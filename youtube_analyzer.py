@@ -3,11 +3,13 @@ import re
 import sys
 import time
 import requests
-from bs4 import BeautifulSoup
 from youtube_transcript_api import YouTubeTranscriptApi
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+from sources.fetch_engine import create_session
+from sources.html_parsing import make_soup
+
 # Load environment variables (API Key)
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -37,8 +39,11 @@ def get_video_metadata(url):
     to avoid heavy dependencies like pytube (which breaks often).
     """
     try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
+        # Cached session: re-analyzing a video does not refetch its page
+        with create_session(headers={}) as session:
+            response = session.get(url, timeout=10)
+        # Only <meta> tags are needed, skip building the rest of the page
+        soup = make_soup(response.text, only="meta")
 
         # Title is usually in the <title> tag, or meta tags
         title_tag = soup.find("meta", property="og:title")